@@ -4,12 +4,33 @@ MongoDB Database Initialization Script
 Initialize MongoDB databases and collections for resource and reservation services
 """
 
-import pymongo
 from pymongo import MongoClient
 from datetime import datetime, UTC
+import importlib.util
 import sys
 import os
 
+# Service sources, for the indexes each one declares in app/indexes.py
+SERVICES_DIR = os.getenv(
+    'SERVICES_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'services')
+)
+
+def create_service_indexes(database, service):
+    """Create the indexes a service declares in its app/indexes.py
+
+    Dropping a collection drops its indexes too, and the service only
+    creates them again when it restarts.
+    """
+    path = os.path.join(SERVICES_DIR, service, 'app', 'indexes.py')
+    spec = importlib.util.spec_from_file_location(f"{service.replace('-', '_')}_indexes", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    for collection_name, models in module.INDEXES.items():
+        names = database[collection_name].create_indexes(models)
+        print(f"{database.name}.{collection_name} indexes: {', '.join(names)}")
+
 def init_mongodb():
     """Initialize MongoDB databases and collections"""
 
@@ -29,14 +50,6 @@ def init_mongodb():
         # Create collections
         resources_collection = resource_db['resources']
 
-        # Create indexes for resources
-        resources_collection.create_index([('name', pymongo.TEXT)])
-        resources_collection.create_index([('resource_type', pymongo.ASCENDING)])
-        resources_collection.create_index([('location', pymongo.ASCENDING)])
-        resources_collection.create_index([('status', pymongo.ASCENDING)])
-        resources_collection.create_index([('building', pymongo.ASCENDING)])
-        resources_collection.create_index([('capacity', pymongo.ASCENDING)])
-
         # Clear existing resources and add sample data
         resources_collection.drop()
 
@@ -215,6 +228,10 @@ def init_mongodb():
         result = resources_collection.insert_many(sample_resources)
         print(f"Inserted {len(result.inserted_ids)} resources into resourcedb")
 
+        # Recreate the indexes resource-service declares, including the
+        # weighted text index search needs
+        create_service_indexes(resource_db, 'resource-service')
+
         # Initialize Reservation Database
         reservation_db = client['reservationdb']
         print("Initializing reservationdb...")
@@ -222,15 +239,13 @@ def init_mongodb():
         # Create collections
         reservations_collection = reservation_db['reservations']
 
-        # Create indexes for reservations
-        reservations_collection.create_index([('user_id', pymongo.ASCENDING)])
-        reservations_collection.create_index([('resource_id', pymongo.ASCENDING)])
-        reservations_collection.create_index([('date', pymongo.ASCENDING)])
-        reservations_collection.create_index([('status', pymongo.ASCENDING)])
-        reservations_collection.create_index([('created_at', pymongo.DESCENDING)])
-
-        # Clear existing reservations (keep it empty for fresh start)
+        # Clear existing reservations (keep it empty for fresh start), and
+        # the slot ledger, whose claims would otherwise block their slots
         reservations_collection.drop()
+        reservation_db['reservation_slots'].drop()
+
+        # Recreate the indexes reservation-service declares
+        create_service_indexes(reservation_db, 'reservation-service')
 
         print("MongoDB databases initialized successfully!")
         print("resourcedb: 8 sample resources added")
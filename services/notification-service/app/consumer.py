@@ -1,75 +1,146 @@
 import aio_pika
 import json
 import asyncio
+import time
+from prometheus_client import Gauge, Histogram
 from app.config import get_settings
 from app.schemas import NotificationEvent
 from app.services import NotificationService
 
 settings = get_settings()
 
+# Per-worker consumer metrics
+WORKER_IN_FLIGHT = Gauge(
+    'notification_worker_in_flight',
+    'Messages currently being processed',
+    ['worker']
+)
+WORKER_PROCESSING_LATENCY = Histogram(
+    'notification_worker_processing_seconds',
+    'Time spent processing a message',
+    ['worker']
+)
+WORKER_ACK_LATENCY = Histogram(
+    'notification_worker_ack_seconds',
+    'Time spent acknowledging a message',
+    ['worker']
+)
+
 
 class NotificationConsumer:
     """Consumer for notification events from RabbitMQ"""
     
     connection = None
-    channel = None
-    queue = None
+    channels = []
+    workers = []
     
     @classmethod
     async def connect(cls):
-        """Connect to RabbitMQ and start consuming"""
+        """Connect to RabbitMQ and start the worker pool"""
         try:
             cls.connection = await aio_pika.connect_robust(settings.RABBITMQ_URL)
-            cls.channel = await cls.connection.channel()
-            
-            # Set QoS
-            await cls.channel.set_qos(prefetch_count=10)
-            
-            # Declare queue
-            cls.queue = await cls.channel.declare_queue(
-                settings.NOTIFICATION_QUEUE,
-                durable=True
-            )
             
-            print(f"Connected to RabbitMQ, listening on queue: {settings.NOTIFICATION_QUEUE}")
+            # Keep every worker busy with one message in hand and a few queued
+            prefetch_count = settings.CONSUMER_WORKERS_PER_CHANNEL * settings.CONSUMER_PREFETCH_PER_WORKER
             
-            # Start consuming
-            await cls.queue.consume(cls.process_message)
+            for channel_number in range(settings.CONSUMER_CHANNELS):
+                channel = await cls.connection.channel()
+                await channel.set_qos(prefetch_count=prefetch_count)
+                
+                # Declare queue
+                queue = await channel.declare_queue(
+                    settings.NOTIFICATION_QUEUE,
+                    durable=True
+                )
+                
+                # Deliveries are handed to the channel's workers; the broker
+                # stops delivering once prefetch_count messages are unacked.
+                work_queue = asyncio.Queue()
+                await queue.consume(work_queue.put)
+                cls.channels.append(channel)
+                
+                for worker_number in range(settings.CONSUMER_WORKERS_PER_CHANNEL):
+                    name = f"{channel_number}-{worker_number}"
+                    cls.workers.append(asyncio.create_task(cls._work(name, work_queue)))
             
+            print(
+                f"Connected to RabbitMQ, listening on queue: {settings.NOTIFICATION_QUEUE} "
+                f"({settings.CONSUMER_CHANNELS} channels x {settings.CONSUMER_WORKERS_PER_CHANNEL} workers, "
+                f"prefetch {prefetch_count})"
+            )
+        
         except Exception as e:
             print(f"Failed to connect to RabbitMQ: {e}")
+            # Drop a half-built pool so a retry starts from scratch
+            await cls.disconnect()
             raise
     
     @classmethod
     async def disconnect(cls):
-        """Disconnect from RabbitMQ"""
+        """Stop workers and disconnect from RabbitMQ"""
+        for worker in cls.workers:
+            worker.cancel()
+        await asyncio.gather(*cls.workers, return_exceptions=True)
+        cls.workers = []
+        cls.channels = []
         if cls.connection:
             await cls.connection.close()
+            cls.connection = None
             print("Disconnected from RabbitMQ")
     
     @classmethod
-    async def process_message(cls, message: aio_pika.IncomingMessage):
-        """Process incoming message"""
-        async with message.process():
+    async def ping(cls):
+        """Raise unless connected to RabbitMQ with workers consuming"""
+        if not cls.connection or cls.connection.is_closed or not cls.workers:
+            raise ConnectionError("not consuming from RabbitMQ")
+    
+    @classmethod
+    async def _work(cls, name: str, work_queue: asyncio.Queue):
+        """Worker loop processing deliveries of one channel"""
+        while True:
+            message = await work_queue.get()
             try:
-                # Parse message body
-                body = json.loads(message.body.decode())
-                event = NotificationEvent(**body)
-                
-                print(f"Received notification event: {event.event_type}")
-                
-                # Process the notification
-                success = await NotificationService.process_notification(event)
-                
-                if success:
-                    print(f"Successfully processed: {event.event_type}")
-                else:
-                    print(f"Failed to process: {event.event_type}")
-                    
-            except json.JSONDecodeError as e:
-                print(f"Invalid JSON in message: {e}")
-            except Exception as e:
-                print(f"Error processing message: {e}")
+                await cls.process_message(message, worker=name)
+            finally:
+                work_queue.task_done()
+    
+    @classmethod
+    async def process_message(cls, message: aio_pika.IncomingMessage, worker: str = "0-0"):
+        """Process incoming message"""
+        in_flight = WORKER_IN_FLIGHT.labels(worker=worker)
+        in_flight.inc()
+        start_time = time.perf_counter()
+        try:
+            # Parse message body
+            body = json.loads(message.body.decode())
+            event = NotificationEvent(**body)
+            
+            print(f"Received notification event: {event.event_type}")
+            
+            # Process the notification
+            success = await NotificationService.process_notification(event)
+            
+            if success:
+                print(f"Successfully processed: {event.event_type}")
+            else:
+                print(f"Failed to process: {event.event_type}")
+        
+        except json.JSONDecodeError as e:
+            print(f"Invalid JSON in message: {e}")
+        except Exception as e:
+            print(f"Error processing message: {e}")
+        finally:
+            WORKER_PROCESSING_LATENCY.labels(worker=worker).observe(
+                time.perf_counter() - start_time
+            )
+            in_flight.dec()
+        
+        ack_start = time.perf_counter()
+        try:
+            await message.ack()
+        except Exception as e:
+            print(f"Failed to ack message: {e}")
+        WORKER_ACK_LATENCY.labels(worker=worker).observe(time.perf_counter() - ack_start)
 
 
 async def start_consumer():
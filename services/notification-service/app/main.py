@@ -1,11 +1,14 @@
 import asyncio
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from prometheus_client import Counter, generate_latest, CONTENT_TYPE_LATEST
-from fastapi.responses import Response
+from fastapi.responses import JSONResponse, Response
 from app.config import get_settings
+from app.metrics import MetricsMiddleware
 from app.consumer import NotificationConsumer
+from app.readiness import readiness
+from app.smtp_pool import smtp_pool
 
 settings = get_settings()
 
@@ -25,17 +28,21 @@ async def lifespan(app: FastAPI):
     
     # Start consumer in background
     consumer_task = asyncio.create_task(start_consumer_with_retry())
+    readiness.register("rabbitmq", NotificationConsumer.ping)
+    readiness.start()
     
     yield
     
     # Shutdown
     print("Shutting down Notification Service...")
+    await readiness.stop()
     consumer_task.cancel()
     try:
         await consumer_task
     except asyncio.CancelledError:
         pass
     await NotificationConsumer.disconnect()
+    await smtp_pool.close()
 
 
 async def start_consumer_with_retry():
@@ -74,6 +81,10 @@ app.add_middleware(
 )
 
 
+# Metrics middleware (pure ASGI, outermost so it also times CORS handling)
+app.add_middleware(MetricsMiddleware)
+
+
 # Health check endpoints
 @app.get("/health")
 async def health_check():
@@ -83,8 +94,12 @@ async def health_check():
 
 @app.get("/ready")
 async def readiness_check():
-    """Readiness check endpoint for Kubernetes"""
-    return {"status": "ready", "service": "notification-service"}
+    """Readiness check endpoint for Kubernetes, from cached dependency checks and current load"""
+    ready, details = readiness.status()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "service": "notification-service", **details}
+    )
 
 
 @app.get("/metrics")
@@ -0,0 +1,141 @@
+# Readiness state shared by every service; keep the copies identical.
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from prometheus_client import Gauge
+from app.config import get_settings
+from app.metrics import requests_in_flight
+
+settings = get_settings()
+
+# How often the event loop lag is sampled
+LAG_SAMPLE_INTERVAL_SECONDS = 0.25
+
+DEPENDENCY_UP = Gauge(
+    'readiness_dependency_up',
+    'Whether the last background check of a dependency passed',
+    ['dependency']
+)
+EVENT_LOOP_LAG = Gauge(
+    'event_loop_lag_seconds',
+    'How late the last event loop lag sample woke up'
+)
+READY = Gauge(
+    'readiness_ready',
+    'Whether the last /ready probe reported the service ready'
+)
+
+PENDING = "pending"
+OK = "ok"
+
+
+class ReadinessMonitor:
+    """
+    Decides readiness from cached dependency checks and current load.
+    
+    Dependencies are pinged by a background task every check_interval
+    seconds, so a probe never waits on the network and frequent probes do
+    not add load to the databases. A failing critical dependency, an event
+    loop lagging more than max_loop_lag or more than max_in_flight requests
+    being served make the service not ready, so Kubernetes stops routing
+    new traffic to it until it recovers. Non-critical dependencies (those
+    the service can work without, e.g. behind an outbox) are only reported.
+    """
+    
+    def __init__(
+        self,
+        check_interval: float,
+        check_timeout: float,
+        max_loop_lag: float,
+        max_in_flight: int
+    ):
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.max_loop_lag = max_loop_lag
+        self.max_in_flight = max_in_flight
+        self._checks: Dict[str, Tuple[Callable[[], Awaitable], bool]] = {}
+        # Dependency name -> OK, PENDING or the error of its last check
+        self.results: Dict[str, str] = {}
+        self.loop_lag = 0.0
+        self._tasks = []
+    
+    def register(self, name: str, check: Callable[[], Awaitable], critical: bool = True) -> None:
+        """Add a check coroutine function that raises while the dependency is unusable"""
+        self._checks[name] = (check, critical)
+        self.results[name] = PENDING
+    
+    async def check_dependencies(self) -> None:
+        """Run every check once, concurrently, and cache the outcomes"""
+        names = list(self._checks)
+        outcomes = await asyncio.gather(
+            *(self._run_check(self._checks[name][0]) for name in names)
+        )
+        for name, error in zip(names, outcomes):
+            self.results[name] = error or OK
+            DEPENDENCY_UP.labels(dependency=name).set(0 if error else 1)
+    
+    async def _run_check(self, check: Callable[[], Awaitable]) -> Optional[str]:
+        try:
+            await asyncio.wait_for(check(), timeout=self.check_timeout)
+        except asyncio.TimeoutError:
+            return f"timed out after {self.check_timeout}s"
+        except Exception as e:
+            return str(e) or type(e).__name__
+        return None
+    
+    def status(self) -> Tuple[bool, dict]:
+        """Whether the service is ready, with the details behind it; no I/O"""
+        reasons = [
+            f"{name}: {self.results[name]}"
+            for name, (_, critical) in self._checks.items()
+            if critical and self.results[name] != OK
+        ]
+        if self.loop_lag > self.max_loop_lag:
+            reasons.append(f"event loop lag {self.loop_lag:.3f}s")
+        in_flight = requests_in_flight()
+        if in_flight > self.max_in_flight:
+            reasons.append(f"{in_flight:.0f} requests in flight")
+        
+        ready = not reasons
+        READY.set(1 if ready else 0)
+        return ready, {
+            "checks": dict(self.results),
+            "event_loop_lag_seconds": round(self.loop_lag, 4),
+            "requests_in_flight": int(in_flight),
+            "reasons": reasons
+        }
+    
+    def start(self) -> None:
+        """Start the background checks and the loop lag sampler"""
+        self._tasks = [
+            asyncio.create_task(self._check_loop()),
+            asyncio.create_task(self._lag_loop())
+        ]
+    
+    async def stop(self) -> None:
+        """Stop the background tasks"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    async def _check_loop(self) -> None:
+        while True:
+            await self.check_dependencies()
+            await asyncio.sleep(self.check_interval)
+    
+    async def _lag_loop(self) -> None:
+        # A sleep wakes up late by however long other callbacks held the loop
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(LAG_SAMPLE_INTERVAL_SECONDS)
+            self.loop_lag = max(0.0, time.perf_counter() - start - LAG_SAMPLE_INTERVAL_SECONDS)
+            EVENT_LOOP_LAG.set(self.loop_lag)
+
+
+readiness = ReadinessMonitor(
+    check_interval=settings.READY_CHECK_INTERVAL_SECONDS,
+    check_timeout=settings.READY_CHECK_TIMEOUT_SECONDS,
+    max_loop_lag=settings.READY_MAX_LOOP_LAG_SECONDS,
+    max_in_flight=settings.READY_MAX_IN_FLIGHT
+)
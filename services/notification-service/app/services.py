@@ -1,9 +1,9 @@
-import aiosmtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from app.config import get_settings
 from app.schemas import NotificationEvent, EmailMessage
 from app.templates import template_renderer
+from app.smtp_pool import smtp_pool
 
 settings = get_settings()
 
@@ -32,15 +32,8 @@ class EmailService:
             msg.attach(text_part)
             msg.attach(html_part)
             
-            # Send email
-            await aiosmtplib.send(
-                msg,
-                hostname=settings.SMTP_HOST,
-                port=settings.SMTP_PORT,
-                username=settings.SMTP_USER,
-                password=settings.SMTP_PASSWORD,
-                start_tls=True
-            )
+            # Send email over a pooled connection
+            await smtp_pool.send(msg)
             print(f"Email sent to: {message.to_email}")
             return True
         except Exception as e:
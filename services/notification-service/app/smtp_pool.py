@@ -0,0 +1,124 @@
+import asyncio
+import time
+from email.message import Message
+from typing import List
+import aiosmtplib
+from app.config import get_settings
+
+settings = get_settings()
+
+# Errors after which a connection is discarded and the send retried once
+CONNECTION_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPTimeoutError,
+    ConnectionError,
+)
+
+
+class PooledConnection:
+    """An authenticated SMTP connection with usage bookkeeping"""
+    
+    __slots__ = ("smtp", "messages_sent", "last_used")
+    
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """
+    Pool of long-lived, authenticated SMTP connections.
+    
+    Connect, STARTTLS and AUTH happen once per connection instead of once per
+    email. Idle connections are health checked with NOOP before reuse,
+    broken ones are replaced transparently, connections are recycled after
+    SMTP_MAX_MESSAGES_PER_CONNECTION messages and at most SMTP_POOL_SIZE
+    sends run concurrently.
+    """
+    
+    def __init__(self, size: int, max_messages: int, health_check_idle_seconds: float):
+        self.size = size
+        self.max_messages = max_messages
+        self.health_check_idle_seconds = health_check_idle_seconds
+        self._idle: List[PooledConnection] = []
+        self._semaphore = asyncio.Semaphore(size)
+    
+    async def send(self, message: Message) -> None:
+        """Send a message over a pooled connection"""
+        async with self._semaphore:
+            connection = await self._acquire()
+            try:
+                await connection.smtp.send_message(message)
+            except CONNECTION_ERRORS:
+                # The server dropped us (idle timeout, restart): retry once fresh
+                await self._discard(connection)
+                connection = await self._connect()
+                try:
+                    await connection.smtp.send_message(message)
+                except Exception:
+                    await self._discard(connection)
+                    raise
+            except Exception:
+                await self._discard(connection)
+                raise
+            await self._release(connection)
+    
+    async def close(self) -> None:
+        """Close all idle connections"""
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await self._discard(connection)
+    
+    async def _acquire(self) -> PooledConnection:
+        while self._idle:
+            connection = self._idle.pop()
+            if await self._is_healthy(connection):
+                return connection
+            await self._discard(connection)
+        return await self._connect()
+    
+    async def _release(self, connection: PooledConnection) -> None:
+        connection.messages_sent += 1
+        connection.last_used = time.monotonic()
+        if connection.messages_sent >= self.max_messages:
+            await self._discard(connection)
+        else:
+            self._idle.append(connection)
+    
+    async def _is_healthy(self, connection: PooledConnection) -> bool:
+        if not connection.smtp.is_connected:
+            return False
+        if time.monotonic() - connection.last_used < self.health_check_idle_seconds:
+            return True
+        try:
+            await connection.smtp.noop()
+            return True
+        except Exception:
+            return False
+    
+    async def _connect(self) -> PooledConnection:
+        smtp = aiosmtplib.SMTP(
+            hostname=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            username=settings.SMTP_USER or None,
+            password=settings.SMTP_PASSWORD or None,
+            start_tls=settings.SMTP_START_TLS,
+            timeout=settings.SMTP_TIMEOUT_SECONDS
+        )
+        await smtp.connect()
+        return PooledConnection(smtp)
+    
+    async def _discard(self, connection: PooledConnection) -> None:
+        try:
+            if connection.smtp.is_connected:
+                await connection.smtp.quit()
+        except Exception:
+            connection.smtp.close()
+
+
+smtp_pool = SMTPConnectionPool(
+    size=settings.SMTP_POOL_SIZE,
+    max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+    health_check_idle_seconds=settings.SMTP_HEALTH_CHECK_IDLE_SECONDS
+)
@@ -189,29 +189,42 @@ This is an automated message from the Reservation System.
 }
 
 
+class CompiledTemplate:
+    """Email template compiled once and reused for every render"""
+    
+    __slots__ = ("subject", "html", "text")
+    
+    def __init__(self, env: Environment, template: dict):
+        self.subject = template["subject"].format_map
+        self.html = env.from_string(template["html"])
+        self.text = env.from_string(template["text"])
+
+
 class TemplateRenderer:
     """Render email templates"""
     
     def __init__(self):
         self.env = Environment(loader=BaseLoader())
+        # Parse and compile every template once instead of per notification
+        self.templates = {
+            event_type: CompiledTemplate(self.env, template)
+            for event_type, template in TEMPLATES.items()
+        }
     
     def render(self, event_type: str, context: dict) -> tuple:
         """Render template for event type"""
-        if event_type not in TEMPLATES:
-            event_type = "reservation_created"  # fallback
-        
-        template = TEMPLATES[event_type]
+        template = self.templates.get(event_type)
+        if template is None:
+            template = self.templates["reservation_created"]  # fallback
         
         # Render subject
-        subject = template["subject"].format(**context)
+        subject = template.subject(context)
         
         # Render HTML body
-        html_template = self.env.from_string(template["html"])
-        html_body = html_template.render(**context)
+        html_body = template.html.render(**context)
         
         # Render text body
-        text_template = self.env.from_string(template["text"])
-        text_body = text_template.render(**context)
+        text_body = template.text.render(**context)
         
         return subject, html_body, text_body
 
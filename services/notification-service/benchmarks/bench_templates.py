@@ -0,0 +1,66 @@
+"""
+Template rendering micro-benchmark
+
+Compares renders/sec of compiling the Jinja source on every render (the
+previous TemplateRenderer behaviour) with the precompiled templates.
+
+Usage (from services/notification-service):
+    python -m benchmarks.bench_templates [--seconds 2]
+"""
+
+import argparse
+import time
+from jinja2 import Environment, BaseLoader
+from app.templates import TEMPLATES, template_renderer
+
+EVENT_TYPES = ["reservation_created", "reservation_cancelled", "reservation_reminder"]
+
+CONTEXT = {
+    "username": "jdoe",
+    "resource_name": "Study Room 1",
+    "date": "2024-01-15",
+    "start_time": "09:00",
+    "end_time": "10:00",
+    "reservation_id": "65a4f0c2e4b0a1b2c3d4e5f6",
+    "reason": "Schedule change"
+}
+
+env = Environment(loader=BaseLoader())
+
+
+def render_uncompiled(event_type: str, context: dict) -> tuple:
+    """Render by compiling the template source each time"""
+    template = TEMPLATES[event_type]
+    subject = template["subject"].format(**context)
+    html_body = env.from_string(template["html"]).render(**context)
+    text_body = env.from_string(template["text"]).render(**context)
+    return subject, html_body, text_body
+
+
+def measure(render, event_type: str, seconds: float) -> float:
+    """Return renders per second over roughly `seconds`"""
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(50):
+            render(event_type, CONTEXT)
+        count += 50
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=2.0, help="duration per measurement")
+    args = parser.parse_args()
+    
+    print(f"{'event type':<24}{'before/s':>12}{'after/s':>12}{'speedup':>10}")
+    for event_type in EVENT_TYPES:
+        assert render_uncompiled(event_type, CONTEXT) == template_renderer.render(event_type, CONTEXT)
+        before = measure(render_uncompiled, event_type, args.seconds)
+        after = measure(template_renderer.render, event_type, args.seconds)
+        print(f"{event_type:<24}{before:>12.0f}{after:>12.0f}{after / before:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,11 +17,14 @@ class TestHealthEndpoints:
         assert data["service"] == "notification-service"
     
     def test_readiness_check(self):
-        """Test readiness endpoint returns ready status"""
+        """Test readiness endpoint returns ready status with the details behind it"""
         response = client.get("/ready")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "ready"
+        assert data["reasons"] == []
+        assert "event_loop_lag_seconds" in data
+        assert "requests_in_flight" in data
     
     def test_root_endpoint(self):
         """Test root endpoint returns service info"""
@@ -31,3 +34,38 @@ class TestHealthEndpoints:
         assert "service" in data
         assert "version" in data
         assert data["status"] == "running"
+
+
+class TestTemplateRenderer:
+    """Test precompiled email templates"""
+    
+    def test_render_reservation_cancelled(self):
+        """Test subject and bodies are rendered from the context"""
+        from app.templates import template_renderer
+        
+        subject, html_body, text_body = template_renderer.render("reservation_cancelled", {
+            "username": "jdoe",
+            "resource_name": "Study Room 1",
+            "date": "2024-01-15",
+            "start_time": "09:00",
+            "end_time": "10:00",
+            "reservation_id": "abc",
+            "reason": "Schedule change"
+        })
+        assert subject == "Reservation Cancelled - Study Room 1"
+        assert "Schedule change" in html_body
+        assert "jdoe" in text_body
+    
+    def test_unknown_event_falls_back(self):
+        """Test unknown event types use the confirmation template"""
+        from app.templates import template_renderer
+        
+        subject, _, _ = template_renderer.render("unknown", {
+            "username": "jdoe",
+            "resource_name": "Desk",
+            "date": "2024-01-15",
+            "start_time": "09:00",
+            "end_time": "10:00",
+            "reservation_id": "abc"
+        })
+        assert subject == "Reservation Confirmed - Desk"
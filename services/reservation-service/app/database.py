@@ -1,5 +1,9 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
 from app.config import get_settings
+from app.mongo_monitoring import CommandMetrics, PoolMetrics
+from app.indexes import reconcile_indexes
+from app.timestamps import backfill_time_fields
 
 settings = get_settings()
 
@@ -7,21 +11,47 @@ settings = get_settings()
 class Database:
     client: AsyncIOMotorClient = None
     db = None
+    # db with MONGODB_LIST_READ_PREFERENCE, for list endpoints
+    list_db = None
 
 
 db = Database()
 
 
+def create_client() -> AsyncIOMotorClient:
+    """Motor client with the configured pool, compression and driver metrics"""
+    options = {
+        "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+        "maxIdleTimeMS": int(settings.MONGODB_MAX_IDLE_SECONDS * 1000),
+        "event_listeners": [PoolMetrics(settings.MONGODB_MAX_POOL_SIZE)],
+    }
+    if settings.MONGODB_WAIT_QUEUE_TIMEOUT_SECONDS > 0:
+        options["waitQueueTimeoutMS"] = int(settings.MONGODB_WAIT_QUEUE_TIMEOUT_SECONDS * 1000)
+    if settings.MONGODB_COMPRESSORS:
+        options["compressors"] = settings.MONGODB_COMPRESSORS
+    if settings.MONGODB_COMMAND_METRICS:
+        options["event_listeners"].append(CommandMetrics())
+    return AsyncIOMotorClient(settings.MONGODB_URL, **options)
+
+
 async def connect_to_mongo():
     """Connect to MongoDB"""
-    db.client = AsyncIOMotorClient(settings.MONGODB_URL)
+    db.client = create_client()
     db.db = db.client[settings.MONGODB_DB]
+    db.list_db = db.db.with_options(read_preference=make_read_preference(
+        read_pref_mode_from_name(settings.MONGODB_LIST_READ_PREFERENCE), None
+    ))
     
-    # Create indexes
-    await db.db.reservations.create_index("user_id")
-    await db.db.reservations.create_index("resource_id")
-    await db.db.reservations.create_index("status")
-    await db.db.reservations.create_index([("date", 1), ("start_time", 1)])
+    # Create missing indexes, report undeclared and unused ones
+    await reconcile_indexes(db.db)
+    
+    # Documents written before start_ts/end_ts existed are invisible to
+    # overlap checks until backfilled; this is one index lookup once done
+    if settings.BACKFILL_TIME_FIELDS_ON_STARTUP:
+        backfilled = await backfill_time_fields(db.db.reservations)
+        if backfilled:
+            print(f"Backfilled start_ts/end_ts on {backfilled} reservations")
     
     print(f"Connected to MongoDB: {settings.MONGODB_DB}")
 
@@ -33,6 +63,18 @@ async def close_mongo_connection():
         print("Closed MongoDB connection")
 
 
+async def ping_mongo():
+    """Raise unless MongoDB answers a ping"""
+    if db.client is None:
+        raise ConnectionError("not connected to MongoDB")
+    await db.client.admin.command("ping")
+
+
 def get_database():
     """Get database instance"""
     return db.db
+
+
+def get_list_database():
+    """Get the database instance list endpoints read from"""
+    return db.list_db if db.list_db is not None else db.db
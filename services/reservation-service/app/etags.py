@@ -0,0 +1,72 @@
+import hashlib
+import secrets
+import time
+from typing import Dict, Optional
+from fastapi import Request, Response
+from app.config import get_settings
+
+settings = get_settings()
+
+# Tells this process's version counters apart from another replica's
+BOOT_ID = secrets.token_hex(4)
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag derived from parts"""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match names etag (weak comparison) or is *"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tag = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == tag for candidate in header.split(","))
+
+
+def cache_headers(etag: Optional[str], cache_control: Optional[str]) -> Dict[str, str]:
+    """ETag and Cache-Control headers of a read response, each when available"""
+    headers = {"ETag": etag} if etag else {}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return headers
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    """Empty 304 response carrying the validators"""
+    return Response(status_code=304, headers=headers)
+
+
+class VersionCounters:
+    """
+    In-process version counters behind the ETags of derived reads.
+    
+    Writes through this service bump the counters of what they touched
+    (the collection and the affected resource), so an unchanged counter
+    means the response can be answered with 304 without querying or
+    serializing. Writes by other replicas are not seen here, so tags also
+    roll over every window_seconds, bounding how long a stale response can
+    be confirmed as current. Reads that can afford one indexed lookup,
+    such as availability, derive their tags from shared data instead.
+    """
+    
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._versions: Dict[str, int] = {}
+    
+    def bump(self, key: str) -> None:
+        """Record a write affecting key"""
+        self._versions[key] = self._versions.get(key, 0) + 1
+    
+    def etag(self, *keys: str, scope: str = "") -> str:
+        """ETag covering the current versions of keys, for one caller scope"""
+        window = int(time.time() // self.window_seconds) if self.window_seconds > 0 else 0
+        versions = [f"{key}:{self._versions.get(key, 0)}" for key in keys]
+        return make_etag(BOOT_ID, window, scope, *versions)
+
+
+etag_versions = VersionCounters(window_seconds=settings.ETAG_WINDOW_SECONDS)
@@ -0,0 +1,99 @@
+from typing import Dict, List
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+# Indexes per collection, each declared next to the queries it serves and
+# ordered equality, sort, range so that every ReservationService query is
+# answered by an index scan without an in-memory sort.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "reservations": [
+        # Overlap checks, interval index loads and the availability grid:
+        # {resource_id, status: {$in}} + start_ts/end_ts ranges
+        IndexModel([
+            ("resource_id", ASCENDING), ("status", ASCENDING),
+            ("start_ts", ASCENDING), ("end_ts", ASCENDING)
+        ]),
+        # Startup backfill probe for documents still missing start_ts
+        IndexModel([("start_ts", ASCENDING)]),
+        # Reservations of a resource sorted by (date, start_time, _id)
+        IndexModel([
+            ("resource_id", ASCENDING), ("date", ASCENDING),
+            ("start_time", ASCENDING), ("_id", ASCENDING)
+        ]),
+        # A user's reservations sorted by (date, start_time, _id), with or
+        # without an upcoming-only date range; also serves their counts
+        IndexModel([
+            ("user_id", ASCENDING), ("date", ASCENDING),
+            ("start_time", ASCENDING), ("_id", ASCENDING)
+        ]),
+        # The same filtered by status
+        IndexModel([
+            ("user_id", ASCENDING), ("status", ASCENDING), ("date", ASCENDING),
+            ("start_time", ASCENDING), ("_id", ASCENDING)
+        ]),
+        # Admin listing sorted by (date desc, start_time, _id), optionally by date
+        IndexModel([
+            ("date", DESCENDING), ("start_time", ASCENDING), ("_id", ASCENDING)
+        ]),
+        # The same filtered by status
+        IndexModel([
+            ("status", ASCENDING), ("date", DESCENDING),
+            ("start_time", ASCENDING), ("_id", ASCENDING)
+        ]),
+    ],
+    "reservation_slots": [
+        # One slot ledger document per resource and day
+        IndexModel([("resource_id", ASCENDING), ("date", ASCENDING)], unique=True),
+        # Sweeper lookup of pending claims; settled intervals carry no claimed_at
+        IndexModel(
+            [("intervals.claimed_at", ASCENDING)],
+            partialFilterExpression={"intervals.claimed_at": {"$exists": True}}
+        ),
+    ],
+    "outbox": [
+        # Relay polls for unleased events in insertion order
+        IndexModel([("lease_until", ASCENDING), ("_id", ASCENDING)]),
+    ],
+}
+
+
+async def reconcile_indexes(database) -> Dict[str, dict]:
+    """
+    Create missing declared indexes and report undeclared or unused ones.
+    
+    Nothing is dropped automatically: `$indexStats` counters reset on
+    server restart, so an index is only reported as unused for review.
+    Returns {collection: {"created": [...], "undeclared": [...], "unused": [...]}}.
+    """
+    report = {}
+    for collection_name, models in INDEXES.items():
+        collection = database[collection_name]
+        declared = {model.document["name"] for model in models}
+        existing = await collection.index_information()
+        
+        missing = [model for model in models if model.document["name"] not in existing]
+        if missing:
+            await collection.create_indexes(missing)
+        
+        created = [model.document["name"] for model in missing]
+        undeclared, unused = [], []
+        try:
+            async for stats in collection.aggregate([{"$indexStats": {}}]):
+                name = stats["name"]
+                if name == "_id_":
+                    continue
+                if name not in declared:
+                    undeclared.append(name)
+                if stats["accesses"]["ops"] == 0 and name not in created:
+                    unused.append(name)
+        except Exception as e:
+            print(f"Index usage stats unavailable for {collection_name}: {e}")
+        
+        report[collection_name] = {
+            "created": created,
+            "undeclared": sorted(undeclared),
+            "unused": sorted(unused)
+        }
+        for key, names in report[collection_name].items():
+            if names:
+                print(f"Indexes {key} on {collection_name}: {', '.join(names)}")
+    return report
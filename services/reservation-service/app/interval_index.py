@@ -0,0 +1,208 @@
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# Statuses that occupy a time slot
+ACTIVE_STATUSES = ["pending", "confirmed"]
+
+
+def time_to_minutes(value: str) -> int:
+    """Convert an "HH:MM" string to minutes since midnight"""
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def minutes_to_time(value: int) -> str:
+    """Convert minutes since midnight to an "HH:MM" string"""
+    return f"{value // 60:02d}:{value % 60:02d}"
+
+
+class DayIntervals:
+    """Sorted, non-overlapping reservation intervals of one resource on one date"""
+    
+    __slots__ = ("starts", "ends", "ids", "loaded_at")
+    
+    def __init__(self, loaded_at: float):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.ids: List[str] = []
+        self.loaded_at = loaded_at
+    
+    def overlaps(self, start: int, end: int, exclude_id: Optional[str] = None) -> bool:
+        """Check whether [start, end) overlaps any stored interval"""
+        # Intervals are disjoint, so ends are sorted as well: only intervals
+        # starting before `end` can overlap, and walking back from the last
+        # of them stops at the first one that ends before `start`.
+        i = bisect_left(self.starts, end) - 1
+        while i >= 0 and self.ends[i] > start:
+            if self.ids[i] != exclude_id:
+                return True
+            i -= 1
+        return False
+    
+    def insert(self, reservation_id: str, start: int, end: int) -> bool:
+        """Insert an interval, returning False if it would break disjointness"""
+        if self.overlaps(start, end, exclude_id=reservation_id):
+            return False
+        i = bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.ids.insert(i, reservation_id)
+        return True
+    
+    def remove(self, reservation_id: str) -> None:
+        """Remove an interval by reservation ID"""
+        if reservation_id in self.ids:
+            i = self.ids.index(reservation_id)
+            del self.starts[i], self.ends[i], self.ids[i]
+
+
+class IntervalIndex:
+    """
+    Per (resource_id, date) interval index answering overlap checks in
+    O(log n) without a database round trip.
+    
+    Entries are loaded lazily from MongoDB, kept coherent by write-through
+    from the reservation service, expire after INTERVAL_INDEX_TTL_SECONDS
+    and are bounded by INTERVAL_INDEX_MAX_ENTRIES (least recently used
+    entries are evicted first).
+    
+    Each process keeps its own index. Unless INTERVAL_INDEX_CHANGE_STREAM
+    is on, bookings made through other replicas are only seen once an entry
+    expires, so an "available" answer can be stale for up to the TTL. Its
+    answers are therefore only a fast pre-check: every booking is decided
+    by the atomic SlotLedger claim, which reads MongoDB.
+    """
+    
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], DayIntervals]" = OrderedDict()
+        self._locations: Dict[str, Tuple[str, str]] = {}
+        self._version = 0
+    
+    @property
+    def version(self) -> int:
+        """Counter bumped on every mutation, used to detect racing loads"""
+        return self._version
+    
+    def get(self, resource_id: str, date: str) -> Optional[DayIntervals]:
+        """Return a fresh entry or None when cold, expired or invalidated"""
+        key = (resource_id, date)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.loaded_at > self.ttl_seconds:
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+    
+    def populate(
+        self,
+        resource_id: str,
+        date: str,
+        reservations: Iterable[dict],
+        version: int
+    ) -> Optional[DayIntervals]:
+        """
+        Build an entry from reservation documents loaded from the database.
+        
+        The entry is only cached when no write happened since `version` was
+        read, so a load racing a write can never resurrect stale data. Returns
+        None when the documents overlap each other (legacy data), in which
+        case callers should fall back to the database query.
+        """
+        entry = DayIntervals(time.monotonic())
+        for reservation in reservations:
+            if not entry.insert(
+                str(reservation["_id"]),
+                time_to_minutes(reservation["start_time"]),
+                time_to_minutes(reservation["end_time"])
+            ):
+                return None
+        
+        if version == self._version:
+            key = (resource_id, date)
+            self._drop(key)
+            self._entries[key] = entry
+            for reservation_id in entry.ids:
+                self._locations[reservation_id] = key
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+        return entry
+    
+    def add(self, reservation_id: str, resource_id: str, date: str, start_time: str, end_time: str) -> None:
+        """Write-through for a reservation that now occupies a slot"""
+        self._version += 1
+        self.remove(reservation_id)
+        key = (resource_id, date)
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        if entry.insert(reservation_id, time_to_minutes(start_time), time_to_minutes(end_time)):
+            self._locations[reservation_id] = key
+        else:
+            # Should not happen after a successful availability check; let the
+            # next lookup reload from the database instead of guessing.
+            self._drop(key)
+    
+    def remove(self, reservation_id: str) -> None:
+        """Write-through for a reservation that no longer occupies a slot"""
+        self._version += 1
+        key = self._locations.pop(reservation_id, None)
+        if key is not None and key in self._entries:
+            self._entries[key].remove(reservation_id)
+    
+    def invalidate(self, resource_id: str, date: Optional[str] = None) -> None:
+        """Drop one entry, or every entry of a resource when date is None"""
+        self._version += 1
+        if date is not None:
+            self._drop((resource_id, date))
+            return
+        for key in [k for k in self._entries if k[0] == resource_id]:
+            self._drop(key)
+    
+    def clear(self) -> None:
+        """Drop all entries"""
+        self._version += 1
+        self._entries.clear()
+        self._locations.clear()
+    
+    def _drop(self, key: Tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            for reservation_id in entry.ids:
+                self._locations.pop(reservation_id, None)
+
+
+interval_index = IntervalIndex(
+    ttl_seconds=settings.INTERVAL_INDEX_TTL_SECONDS,
+    max_entries=settings.INTERVAL_INDEX_MAX_ENTRIES
+)
+
+
+async def watch_reservation_changes(collection) -> None:
+    """
+    Invalidate index entries from a MongoDB change stream.
+    
+    Keeps the index coherent with writes made by other replicas. Requires
+    MongoDB to run as a replica set; on a standalone server the stream
+    fails to open and the index relies on write-through plus TTL.
+    """
+    try:
+        async with collection.watch(full_document="updateLookup") as stream:
+            print("Watching reservation changes for interval index")
+            async for change in stream:
+                document = change.get("fullDocument")
+                if document:
+                    interval_index.invalidate(document["resource_id"])
+                else:
+                    interval_index.remove(str(change["documentKey"]["_id"]))
+    except Exception as e:
+        print(f"Reservation change stream unavailable: {e}")
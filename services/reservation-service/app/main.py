@@ -1,41 +1,60 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
-from fastapi.responses import Response
-import time
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from fastapi.responses import JSONResponse, Response
+import asyncio
 from app.config import get_settings
-from app.database import connect_to_mongo, close_mongo_connection
+from app.metrics import MetricsMiddleware
+from app.stages import ServerTimingMiddleware, configure_tracing, shutdown_tracing
+from app.database import connect_to_mongo, close_mongo_connection, get_database, ping_mongo
+from app.interval_index import watch_reservation_changes
 from app.queue import MessageQueue
+from app.outbox import Outbox
+from app.slots import SlotLedger
+from app.resource_client import ResourceClient
+from app.readiness import readiness
 from app.routes import router
 
 settings = get_settings()
 
-# Prometheus metrics
-REQUEST_COUNT = Counter(
-    'http_requests_total',
-    'Total HTTP requests',
-    ['method', 'endpoint', 'status']
-)
-REQUEST_LATENCY = Histogram(
-    'http_request_duration_seconds',
-    'HTTP request latency',
-    ['method', 'endpoint']
-)
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     print("Starting Reservation Service...")
+    configure_tracing()
     await connect_to_mongo()
     await MessageQueue.connect()
+    await ResourceClient.connect()
+    await Outbox.start()
+    await SlotLedger.start()
+    watcher_task = None
+    if settings.INTERVAL_INDEX_ENABLED and settings.INTERVAL_INDEX_CHANGE_STREAM:
+        watcher_task = asyncio.create_task(
+            watch_reservation_changes(get_database().reservations)
+        )
+    readiness.register("mongodb", ping_mongo)
+    # Bookings only need the broker through the outbox, which buffers events
+    readiness.register("rabbitmq", MessageQueue.ping, critical=False)
+    readiness.start()
     yield
     # Shutdown
     print("Shutting down Reservation Service...")
+    await readiness.stop()
+    if watcher_task:
+        watcher_task.cancel()
+        try:
+            await watcher_task
+        except asyncio.CancelledError:
+            pass
+    await SlotLedger.stop()
+    await Outbox.stop()
+    await ResourceClient.disconnect()
     await MessageQueue.disconnect()
     await close_mongo_connection()
+    shutdown_tracing()
 
 
 app = FastAPI(
@@ -55,24 +74,10 @@ app.add_middleware(
 )
 
 
-# Metrics middleware
-@app.middleware("http")
-async def metrics_middleware(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    duration = time.time() - start_time
-    
-    REQUEST_COUNT.labels(
-        method=request.method,
-        endpoint=request.url.path,
-        status=response.status_code
-    ).inc()
-    REQUEST_LATENCY.labels(
-        method=request.method,
-        endpoint=request.url.path
-    ).observe(duration)
-    
-    return response
+# Metrics middleware (pure ASGI, outermost so it also times CORS handling)
+if settings.SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 
 # Include routes
@@ -88,8 +93,12 @@ async def health_check():
 
 @app.get("/ready")
 async def readiness_check():
-    """Readiness check endpoint for Kubernetes"""
-    return {"status": "ready", "service": "reservation-service"}
+    """Readiness check endpoint for Kubernetes, from cached dependency checks and current load"""
+    ready, details = readiness.status()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "service": "reservation-service", **details}
+    )
 
 
 @app.get("/metrics")
@@ -0,0 +1,137 @@
+# HTTP request metrics shared by every service; keep the copies identical.
+import time
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from prometheus_client import Counter, Gauge, Histogram
+
+# Label for requests no route matched (404s, scanners), so unknown paths
+# cannot create new time series
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Latency SLO thresholds are bucket edges so "share of requests under the
+# SLO" is exact: 200ms for reads, 500ms for writes, 1s for login (bcrypt)
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+REQUEST_COUNT = Counter(
+    'http_requests_total',
+    'Total HTTP requests',
+    ['method', 'endpoint', 'status']
+)
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'HTTP request latency',
+    ['method', 'endpoint'],
+    buckets=LATENCY_BUCKETS
+)
+TIME_TO_FIRST_BYTE = Histogram(
+    'http_time_to_first_byte_seconds',
+    'Time until the first response body chunk was sent',
+    ['method', 'endpoint'],
+    buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight',
+    'HTTP requests currently being served'
+)
+REQUEST_SIZE = Histogram(
+    'http_request_size_bytes',
+    'HTTP request body size',
+    ['method', 'endpoint'],
+    buckets=SIZE_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes',
+    'HTTP response body size',
+    ['method', 'endpoint'],
+    buckets=SIZE_BUCKETS
+)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Path template of the route that served a request, e.g.
+    /api/v1/reservations/{reservation_id}, or UNMATCHED_ROUTE.
+    
+    FastAPI records the matched route in the scope; routes it does not
+    wrap (docs, openapi.json) are matched against the router again.
+    """
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    app = scope.get("app")
+    for candidate in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = candidate.matches(scope)
+        if match == Match.FULL:
+            return getattr(candidate, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+def requests_in_flight() -> float:
+    """Requests the MetricsMiddleware is currently serving"""
+    return REQUESTS_IN_FLIGHT.collect()[0].samples[0].value
+
+
+def _content_length(scope: Scope) -> int:
+    for name, value in scope.get("headers", ()):
+        if name == b"content-length":
+            return int(value) if value.isdigit() else 0
+    return 0
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request metrics.
+    
+    Unlike @app.middleware("http") (BaseHTTPMiddleware) it runs the app in
+    the same task and passes messages straight through instead of piping
+    the response through a memory stream, so it adds little per-request
+    overhead and streaming responses are not buffered.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter()
+        status_code = 500
+        request_size = response_size = 0
+        first_byte = None
+        
+        async def receive_counted() -> Message:
+            nonlocal request_size
+            message = await receive()
+            if message["type"] == "http.request":
+                request_size += len(message.get("body", b""))
+            return message
+        
+        async def send_counted(message: Message) -> None:
+            nonlocal status_code, response_size, first_byte
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                if first_byte is None:
+                    first_byte = time.perf_counter() - start
+                response_size += len(message.get("body", b""))
+            await send(message)
+        
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive_counted, send_counted)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            duration = time.perf_counter() - start
+            method, endpoint = scope["method"], route_template(scope)
+            REQUEST_COUNT.labels(method=method, endpoint=endpoint, status=status_code).inc()
+            REQUEST_LATENCY.labels(method=method, endpoint=endpoint).observe(duration)
+            if first_byte is not None:
+                TIME_TO_FIRST_BYTE.labels(method=method, endpoint=endpoint).observe(first_byte)
+            # Bodies the app never read are sized by their Content-Length
+            REQUEST_SIZE.labels(method=method, endpoint=endpoint).observe(
+                request_size or _content_length(scope)
+            )
+            RESPONSE_SIZE.labels(method=method, endpoint=endpoint).observe(response_size)
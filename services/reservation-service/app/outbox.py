@@ -0,0 +1,152 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Tuple
+from prometheus_client import Counter
+from app.config import get_settings
+from app.database import get_database
+from app.queue import MessageQueue
+from app.schemas import NotificationEvent
+
+settings = get_settings()
+
+OUTBOX_EVENTS = Counter(
+    'outbox_events_total',
+    'Notification events handled by the outbox',
+    ['result']
+)
+
+
+class Outbox:
+    """
+    Transactional outbox for notification events.
+    
+    Events are written to MongoDB next to the reservation write, so the
+    request path never waits on RabbitMQ. A background relay leases pending
+    events in batches, publishes them with publisher confirms under a
+    bounded number of in-flight messages and deletes them only once the
+    broker confirmed. Leases expire, so events held by a crashed replica
+    are picked up again, and nothing is dropped while the broker is down.
+    """
+    
+    COLLECTION = "outbox"
+    
+    _task: asyncio.Task = None
+    _wakeup: asyncio.Event = None
+    
+    @staticmethod
+    async def enqueue(event: NotificationEvent) -> None:
+        """Store an event for asynchronous publishing"""
+        db = get_database()
+        now = datetime.utcnow()
+        await db[Outbox.COLLECTION].insert_one({
+            "event": event.model_dump(),
+            "created_at": now,
+            "lease_until": now,
+            "lease_owner": None,
+            "attempts": 0
+        })
+        if Outbox._wakeup:
+            Outbox._wakeup.set()
+    
+    @classmethod
+    async def start(cls):
+        """Start the background relay"""
+        cls._wakeup = asyncio.Event()
+        cls._task = asyncio.create_task(cls._run())
+        print("Outbox relay started")
+    
+    @classmethod
+    async def stop(cls):
+        """Stop the background relay"""
+        if cls._task:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+            print("Outbox relay stopped")
+    
+    @classmethod
+    async def _run(cls):
+        backoff = settings.OUTBOX_POLL_INTERVAL_SECONDS
+        while True:
+            try:
+                if not MessageQueue.channel:
+                    await MessageQueue.connect()
+                published, failed = await cls.relay_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Outbox relay error: {e}")
+                published, failed = 0, 1
+            
+            if failed:
+                # Broker trouble: back off exponentially, events stay stored
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, settings.OUTBOX_MAX_BACKOFF_SECONDS)
+                continue
+            backoff = settings.OUTBOX_POLL_INTERVAL_SECONDS
+            if published >= settings.OUTBOX_BATCH_SIZE:
+                # Full batch, more is probably waiting
+                continue
+            
+            cls._wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    cls._wakeup.wait(), timeout=settings.OUTBOX_POLL_INTERVAL_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+    
+    @classmethod
+    async def relay_batch(cls) -> Tuple[int, int]:
+        """Lease, publish and acknowledge one batch, returning (published, failed)"""
+        db = get_database()
+        collection = db[cls.COLLECTION]
+        now = datetime.utcnow()
+        
+        candidates = await collection.find(
+            {"lease_until": {"$lte": now}}, {"_id": 1}
+        ).sort("_id", 1).limit(settings.OUTBOX_BATCH_SIZE).to_list(length=None)
+        if not candidates:
+            return 0, 0
+        
+        # Other replicas may race for the same events; only those this
+        # batch's lease token ends up on are published here.
+        ids = [doc["_id"] for doc in candidates]
+        lease_token = uuid.uuid4().hex
+        await collection.update_many(
+            {"_id": {"$in": ids}, "lease_until": {"$lte": now}},
+            {"$set": {
+                "lease_until": now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS),
+                "lease_owner": lease_token
+            }}
+        )
+        leased = await collection.find(
+            {"_id": {"$in": ids}, "lease_owner": lease_token}
+        ).sort("_id", 1).to_list(length=None)
+        
+        semaphore = asyncio.Semaphore(settings.OUTBOX_MAX_IN_FLIGHT)
+        
+        async def publish(doc: dict) -> bool:
+            async with semaphore:
+                return await MessageQueue.publish_notification(
+                    NotificationEvent(**doc["event"])
+                )
+        
+        results = await asyncio.gather(*(publish(doc) for doc in leased))
+        confirmed: List = [doc["_id"] for doc, ok in zip(leased, results) if ok]
+        failed: List = [doc["_id"] for doc, ok in zip(leased, results) if not ok]
+        
+        if confirmed:
+            await collection.delete_many({"_id": {"$in": confirmed}})
+            OUTBOX_EVENTS.labels(result="published").inc(len(confirmed))
+        if failed:
+            # Keep the lease as a retry delay and count the attempt
+            await collection.update_many(
+                {"_id": {"$in": failed}}, {"$inc": {"attempts": 1}}
+            )
+            OUTBOX_EVENTS.labels(result="failed").inc(len(failed))
+        return len(confirmed), len(failed)
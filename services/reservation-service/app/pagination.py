@@ -0,0 +1,64 @@
+import base64
+import binascii
+import json
+from typing import List, Optional, Tuple
+from bson import ObjectId
+
+# A sort specification as passed to Motor's cursor.sort(); must end with _id
+Sort = List[Tuple[str, int]]
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(values: list) -> str:
+    """Encode the sort key values of the last returned document as an opaque cursor"""
+    payload = json.dumps([str(v) if isinstance(v, ObjectId) else v for v in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: Sort) -> list:
+    """Decode a cursor back into sort key values for `sort`"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError("Malformed cursor")
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise InvalidCursorError("Cursor does not match this listing")
+    
+    decoded = []
+    for (field, _), value in zip(sort, values):
+        if field == "_id":
+            if not isinstance(value, str) or not ObjectId.is_valid(value):
+                raise InvalidCursorError("Malformed cursor")
+            value = ObjectId(value)
+        decoded.append(value)
+    return decoded
+
+
+def keyset_query(query: dict, sort: Sort, values: list) -> dict:
+    """
+    Restrict `query` to documents sorting strictly after `values`.
+    
+    Builds the lexicographic comparison (a > x) or (a == x and b > y) ...
+    which MongoDB answers with index bounds instead of skipping documents.
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {sort[j][0]: values[j] for j in range(i)}
+        clause[field] = {"$gt" if direction == 1 else "$lt": values[i]}
+        clauses.append(clause)
+    
+    if "$or" in query:
+        return {"$and": [query, {"$or": clauses}]}
+    return {**query, "$or": clauses}
+
+
+def next_cursor(items: List[dict], limit: int, sort: Sort) -> Optional[str]:
+    """Cursor for the page after serialized `items`, or None on a short page"""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor([last["id"] if field == "_id" else last[field] for field, _ in sort])
@@ -15,7 +15,7 @@ class MessageQueue:
         """Connect to RabbitMQ"""
         try:
             cls.connection = await aio_pika.connect_robust(settings.RABBITMQ_URL)
-            cls.channel = await cls.connection.channel()
+            cls.channel = await cls.connection.channel(publisher_confirms=True)
             
             # Declare the notifications queue
             await cls.channel.declare_queue(
@@ -33,9 +33,15 @@ class MessageQueue:
             await cls.connection.close()
             print("Disconnected from RabbitMQ")
     
+    @classmethod
+    async def ping(cls):
+        """Raise unless the RabbitMQ connection is open"""
+        if not cls.connection or cls.connection.is_closed:
+            raise ConnectionError("not connected to RabbitMQ")
+    
     @classmethod
     async def publish_notification(cls, event: NotificationEvent):
-        """Publish notification event to queue"""
+        """Publish notification event to queue, True once the broker confirmed it"""
         if not cls.channel:
             print("Warning: RabbitMQ not connected, notification not sent")
             return False
@@ -0,0 +1,94 @@
+import time
+from typing import Optional
+import httpx
+from prometheus_client import Counter, Histogram
+from app.cache import TTLCache
+from app.config import get_settings
+
+settings = get_settings()
+
+RESOURCE_CACHE_REQUESTS = Counter(
+    'resource_cache_requests_total',
+    'Resource info cache lookups',
+    ['result']
+)
+RESOURCE_SERVICE_LATENCY = Histogram(
+    'resource_service_request_duration_seconds',
+    'Latency of resource-service calls',
+    ['status']
+)
+
+
+class ResourceClient:
+    """Pooled HTTP client for resource-service with a resource info cache"""
+    
+    client: httpx.AsyncClient = None
+    cache = TTLCache(
+        ttl_seconds=settings.RESOURCE_CACHE_TTL_SECONDS,
+        max_entries=settings.RESOURCE_CACHE_MAX_ENTRIES
+    )
+    
+    @classmethod
+    async def connect(cls):
+        """Create the shared client, reusing keep-alive connections across requests"""
+        cls.client = httpx.AsyncClient(
+            base_url=settings.RESOURCE_SERVICE_URL,
+            http2=settings.RESOURCE_CLIENT_HTTP2,
+            timeout=settings.RESOURCE_CLIENT_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=settings.RESOURCE_CLIENT_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.RESOURCE_CLIENT_MAX_KEEPALIVE,
+                keepalive_expiry=settings.RESOURCE_CLIENT_KEEPALIVE_EXPIRY_SECONDS
+            )
+        )
+        print(f"Resource client ready: {settings.RESOURCE_SERVICE_URL}")
+    
+    @classmethod
+    async def disconnect(cls):
+        """Close the shared client"""
+        if cls.client:
+            await cls.client.aclose()
+            cls.client = None
+            print("Closed resource client")
+    
+    @classmethod
+    async def get_resource(cls, resource_id: str, token: str) -> Optional[dict]:
+        """Fetch a resource document, served from cache when fresh"""
+        resource = cls.cache.get(resource_id)
+        if resource is not None:
+            RESOURCE_CACHE_REQUESTS.labels(result="hit").inc()
+            return resource
+        RESOURCE_CACHE_REQUESTS.labels(result="miss").inc()
+        
+        if cls.client is None:
+            await cls.connect()
+        
+        start_time = time.perf_counter()
+        try:
+            response = await cls.client.get(
+                f"/api/v1/resources/{resource_id}",
+                headers={"Authorization": f"Bearer {token}"}
+            )
+        except Exception as e:
+            RESOURCE_SERVICE_LATENCY.labels(status="error").observe(
+                time.perf_counter() - start_time
+            )
+            print(f"Failed to fetch resource info: {e}")
+            return None
+        RESOURCE_SERVICE_LATENCY.labels(status=response.status_code).observe(
+            time.perf_counter() - start_time
+        )
+        
+        if response.status_code != 200:
+            return None
+        resource = response.json()
+        cls.cache.set(resource_id, resource)
+        return resource
+    
+    @classmethod
+    def invalidate(cls, resource_id: Optional[str] = None):
+        """Drop one cached resource, or the whole cache when resource_id is None"""
+        if resource_id is None:
+            cls.cache.clear()
+        else:
+            cls.cache.delete(resource_id)
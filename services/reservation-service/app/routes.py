@@ -1,17 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from typing import Optional
+from typing import Dict, List, Optional
+from datetime import datetime
 from app.schemas import (
     ReservationCreate, ReservationUpdate, ReservationResponse,
     ReservationListResponse, ReservationStatus, CancelReservation,
-    MessageResponse, ResourceAvailabilityResponse, TimeSlotAvailability
+    MessageResponse, ResourceAvailabilityResponse, TimeSlotAvailability,
+    AvailabilityGridResponse
 )
 from app.services import ReservationService
+from app.slots import SlotConflictError, SlotLedger
+from app.pagination import InvalidCursorError, next_cursor
+from app.serialization import InvalidFieldsError, RowEncoder, json_response
+from app.etags import cache_headers, etag_matches, etag_versions, make_etag, not_modified
+from app.stages import stage
+from app.resource_client import ResourceClient
+from app.interval_index import ACTIVE_STATUSES, time_to_minutes
 from app.auth import get_current_user, get_current_admin_user, TokenData
+from app.config import get_settings
 
+settings = get_settings()
 router = APIRouter()
 security = HTTPBearer()
 
+# List routes encode rows directly instead of validating a model per row
+RESERVATION_ROWS = RowEncoder(ReservationResponse)
+FIELDS_DESCRIPTION = "Comma-separated reservation fields to return; id is always included"
+
+
+def _bad_request(error: ValueError) -> HTTPException:
+    # Built here because list routes shadow `status` with a query parameter
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+
+
+def _cache_headers(etag: str, route: str) -> Dict[str, str]:
+    return cache_headers(etag, settings.CACHE_CONTROL.get(route))
+
 
 # ==================== User Reservation Routes ====================
 
@@ -22,13 +46,14 @@ async def create_reservation(
     current_user: TokenData = Depends(get_current_user)
 ):
     """Create a new reservation"""
-    # Check availability
-    is_available = await ReservationService.check_availability(
-        reservation_data.resource_id,
-        reservation_data.date,
-        reservation_data.start_time,
-        reservation_data.end_time
-    )
+    # Fast rejection from the interval index; the slot claim below is authoritative
+    with stage("check_availability"):
+        is_available = await ReservationService.check_availability(
+            reservation_data.resource_id,
+            reservation_data.date,
+            reservation_data.start_time,
+            reservation_data.end_time
+        )
     
     if not is_available:
         raise HTTPException(
@@ -36,42 +61,72 @@ async def create_reservation(
             detail="Time slot is not available"
         )
     
-    reservation = await ReservationService.create_reservation(
-        reservation_data,
-        user_id=current_user.user_id,
-        username=current_user.username,
-        token=credentials.credentials
-    )
+    try:
+        reservation = await ReservationService.create_reservation(
+            reservation_data,
+            user_id=current_user.user_id,
+            username=current_user.username,
+            token=credentials.credentials
+        )
+    except SlotConflictError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Time slot is not available"
+        )
     return reservation
 
 
 @router.get("/reservations/my", response_model=ReservationListResponse)
 async def get_my_reservations(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; replaces skip"),
     status: Optional[ReservationStatus] = None,
     upcoming_only: bool = False,
+    include_total: bool = Query(True, description="Set false to skip computing total"),
+    exact_total: bool = Query(False, description="Compute total exactly, with the page in one query"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     current_user: TokenData = Depends(get_current_user)
 ):
     """Get current user's reservations"""
+    etag = etag_versions.etag(ReservationService.COLLECTION, scope=str(current_user.user_id))
+    headers = _cache_headers(etag, "get_my_reservations")
+    if etag_matches(request, etag):
+        return not_modified(headers)
+    
     status_value = status.value if status else None
-    reservations = await ReservationService.get_user_reservations(
-        user_id=current_user.user_id,
-        skip=skip,
-        limit=limit,
-        status=status_value,
-        upcoming_only=upcoming_only
-    )
-    total = await ReservationService.get_user_reservations_count(
-        user_id=current_user.user_id,
-        status=status_value
-    )
-    return ReservationListResponse(reservations=reservations, total=total)
+    try:
+        selected = RESERVATION_ROWS.select(fields)
+        reservations, total = await ReservationService.get_user_reservations(
+            user_id=current_user.user_id,
+            skip=skip,
+            limit=limit,
+            status=status_value,
+            upcoming_only=upcoming_only,
+            cursor=cursor,
+            exact_total=include_total and exact_total,
+            projection=RESERVATION_ROWS.projection(selected, ReservationService.SORT)
+        )
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise _bad_request(e)
+    if include_total and total is None:
+        total = await ReservationService.get_user_reservations_count(
+            user_id=current_user.user_id,
+            status=status_value
+        )
+    return json_response({
+        "reservations": RESERVATION_ROWS.rows(reservations, selected),
+        "total": total,
+        "next_cursor": next_cursor(reservations, limit, ReservationService.SORT)
+    }, headers)
 
 
 @router.get("/reservations/{reservation_id}", response_model=ReservationResponse)
 async def get_reservation(
     reservation_id: str,
+    request: Request,
+    response: Response,
     current_user: TokenData = Depends(get_current_user)
 ):
     """Get reservation by ID"""
@@ -89,6 +144,11 @@ async def get_reservation(
             detail="Not authorized to view this reservation"
         )
     
+    etag = make_etag(reservation["id"], reservation.get("updated_at") or reservation["created_at"])
+    headers = _cache_headers(etag, "get_reservation")
+    if etag_matches(request, etag):
+        return not_modified(headers)
+    response.headers.update(headers)
     return reservation
 
 
@@ -137,7 +197,13 @@ async def update_reservation(
                 detail="New time slot is not available"
             )
     
-    updated = await ReservationService.update_reservation(reservation_id, update_data)
+    try:
+        updated = await ReservationService.update_reservation(reservation_id, update_data)
+    except SlotConflictError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="New time slot is not available"
+        )
     return updated
 
 
@@ -175,19 +241,94 @@ async def cancel_reservation(
 
 # ==================== Availability Routes ====================
 
+@router.get("/availability", response_model=AvailabilityGridResponse)
+async def get_availability_grid(
+    request: Request,
+    response: Response,
+    resource_ids: List[str] = Query(..., description="Resource IDs, repeat the parameter for each"),
+    start_date: str = Query(..., description="First date in YYYY-MM-DD format"),
+    end_date: str = Query(..., description="Last date in YYYY-MM-DD format"),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Get availability bitmaps for several resources over a date range"""
+    try:
+        days = (
+            datetime.strptime(end_date, "%Y-%m-%d") - datetime.strptime(start_date, "%Y-%m-%d")
+        ).days + 1
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Dates must be in YYYY-MM-DD format"
+        )
+    if days < 1 or days > settings.AVAILABILITY_GRID_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range must cover 1 to {settings.AVAILABILITY_GRID_MAX_DAYS} days"
+        )
+    
+    resource_ids = list(dict.fromkeys(resource_ids))
+    if len(resource_ids) > settings.AVAILABILITY_GRID_MAX_RESOURCES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.AVAILABILITY_GRID_MAX_RESOURCES} resources per request"
+        )
+    
+    # Bookings come from the shared ledger versions; schedules are cached per
+    # process, so that part of the tag stays per process and time-bounded
+    versions = await SlotLedger.versions(resource_ids, start_date, end_date)
+    etag = make_etag(
+        etag_versions.etag(*resource_ids, scope=f"{start_date}:{end_date}"),
+        *sorted(versions.items())
+    )
+    headers = _cache_headers(etag, "get_availability_grid")
+    if etag_matches(request, etag):
+        return not_modified(headers)
+    response.headers.update(headers)
+    
+    resources = await ReservationService.get_availability_grid(
+        resource_ids, start_date, end_date, token=credentials.credentials
+    )
+    if any(resource.get("error") for resource in resources):
+        # Do not let clients revalidate an incomplete grid once the resource service recovers
+        del response.headers["ETag"]
+    return AvailabilityGridResponse(
+        start_date=start_date,
+        end_date=end_date,
+        resources=resources
+    )
+
+
 @router.get("/availability/{resource_id}", response_model=ResourceAvailabilityResponse)
 async def get_resource_availability(
     resource_id: str,
+    request: Request,
+    response: Response,
     date: str = Query(..., description="Date in YYYY-MM-DD format"),
     current_user: TokenData = Depends(get_current_user)
 ):
     """Get availability slots for a resource on a specific date"""
+    # Slots depend only on the day's bookings, which every replica's writes
+    # record in the shared ledger version
+    versions = await SlotLedger.versions([resource_id], date, date)
+    etag = make_etag(resource_id, date, versions.get((resource_id, date), 0))
+    headers = _cache_headers(etag, "get_resource_availability")
+    if etag_matches(request, etag):
+        return not_modified(headers)
+    response.headers.update(headers)
+    
     # Get existing reservations for this resource on this date
     reservations = await ReservationService.get_resource_reservations(
         resource_id=resource_id,
         date=date
     )
     
+    booked = [
+        (time_to_minutes(r["start_time"]), time_to_minutes(r["end_time"]))
+        for r in reservations
+        if r["status"] in ACTIVE_STATUSES
+    ]
+    
     # Generate time slots (example: 08:00 to 22:00, 1-hour slots)
     slots = []
     for hour in range(8, 22):
@@ -196,9 +337,8 @@ async def get_resource_availability(
         
         # Check if slot is booked
         is_booked = any(
-            r["status"] in ["pending", "confirmed"] and
-            r["start_time"] <= start and r["end_time"] > start
-            for r in reservations
+            booked_start <= hour * 60 < booked_end
+            for booked_start, booked_end in booked
         )
         
         slots.append(TimeSlotAvailability(
@@ -218,39 +358,89 @@ async def get_resource_availability(
 
 @router.get("/reservations", response_model=ReservationListResponse)
 async def get_all_reservations(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; replaces skip"),
     status: Optional[ReservationStatus] = None,
     date: Optional[str] = None,
+    include_total: bool = Query(True, description="Set false to skip computing total"),
+    exact_total: bool = Query(False, description="Compute total exactly, with the page in one query"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     current_user: TokenData = Depends(get_current_admin_user)
 ):
     """Get all reservations (admin only)"""
+    etag = etag_versions.etag(ReservationService.COLLECTION)
+    headers = _cache_headers(etag, "get_all_reservations")
+    if etag_matches(request, etag):
+        return not_modified(headers)
+    
     status_value = status.value if status else None
-    reservations = await ReservationService.get_all_reservations(
-        skip=skip, limit=limit, status=status_value, date=date
-    )
-    total = await ReservationService.get_all_reservations_count(
-        status=status_value, date=date
-    )
-    return ReservationListResponse(reservations=reservations, total=total)
+    try:
+        selected = RESERVATION_ROWS.select(fields)
+        reservations, total = await ReservationService.get_all_reservations(
+            skip=skip, limit=limit, status=status_value, date=date, cursor=cursor,
+            exact_total=include_total and exact_total,
+            projection=RESERVATION_ROWS.projection(selected, ReservationService.ADMIN_SORT)
+        )
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise _bad_request(e)
+    if include_total and total is None:
+        total = await ReservationService.get_all_reservations_count(
+            status=status_value, date=date
+        )
+    return json_response({
+        "reservations": RESERVATION_ROWS.rows(reservations, selected),
+        "total": total,
+        "next_cursor": next_cursor(reservations, limit, ReservationService.ADMIN_SORT)
+    }, headers)
 
 
 @router.get("/reservations/resource/{resource_id}", response_model=ReservationListResponse)
 async def get_resource_reservations(
     resource_id: str,
+    request: Request,
     date: Optional[str] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; replaces skip"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     current_user: TokenData = Depends(get_current_user)
 ):
     """Get reservations for a specific resource"""
-    reservations = await ReservationService.get_resource_reservations(
-        resource_id=resource_id,
-        date=date,
-        skip=skip,
-        limit=limit
-    )
-    return ReservationListResponse(reservations=reservations, total=len(reservations))
+    etag = etag_versions.etag(resource_id)
+    headers = _cache_headers(etag, "get_resource_reservations")
+    if etag_matches(request, etag):
+        return not_modified(headers)
+    
+    try:
+        selected = RESERVATION_ROWS.select(fields)
+        reservations = await ReservationService.get_resource_reservations(
+            resource_id=resource_id,
+            date=date,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            projection=RESERVATION_ROWS.projection(selected, ReservationService.SORT)
+        )
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise _bad_request(e)
+    return json_response({
+        "reservations": RESERVATION_ROWS.rows(reservations, selected),
+        "total": len(reservations),
+        "next_cursor": next_cursor(reservations, limit, ReservationService.SORT)
+    }, headers)
+
+
+@router.delete("/cache/resources/{resource_id}", response_model=MessageResponse)
+async def invalidate_resource_cache(
+    resource_id: str,
+    current_user: TokenData = Depends(get_current_admin_user)
+):
+    """Drop a cached resource after it changed in resource-service (admin only)"""
+    ResourceClient.invalidate(resource_id)
+    etag_versions.bump(resource_id)
+    return MessageResponse(message="Resource cache invalidated")
 
 
 @router.post("/reservations/{reservation_id}/complete", response_model=ReservationResponse)
@@ -54,7 +54,8 @@ class ReservationResponse(BaseModel):
 
 class ReservationListResponse(BaseModel):
     reservations: List[ReservationResponse]
-    total: int
+    total: Optional[int] = None  # None when requested with include_total=false
+    next_cursor: Optional[str] = None
 
 
 class TimeSlotAvailability(BaseModel):
@@ -69,6 +70,26 @@ class ResourceAvailabilityResponse(BaseModel):
     slots: List[TimeSlotAvailability]
 
 
+class ResourceDayAvailability(BaseModel):
+    date: str
+    bitmap: str  # One character per slot: "1" available, "0" booked; empty when closed
+
+
+class ResourceAvailabilityGrid(BaseModel):
+    resource_id: str
+    opening_time: Optional[str] = None
+    closing_time: Optional[str] = None
+    slot_duration_minutes: Optional[int] = None
+    days: List[ResourceDayAvailability]
+    error: Optional[str] = None  # Set, with no days, when the schedule could not be fetched
+
+
+class AvailabilityGridResponse(BaseModel):
+    start_date: str
+    end_date: str
+    resources: List[ResourceAvailabilityGrid]
+
+
 class CancelReservation(BaseModel):
     reason: Optional[str] = None
 
@@ -1,21 +1,38 @@
-from typing import List, Optional
-from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
 from bson import ObjectId
-import httpx
-from app.database import get_database
+import asyncio
+from app.database import get_database, get_list_database
 from app.schemas import (
     ReservationCreate, ReservationUpdate, ReservationStatus, NotificationEvent
 )
 from app.config import get_settings
-from app.queue import MessageQueue
+from app.outbox import Outbox
+from app.resource_client import ResourceClient
+from app.interval_index import interval_index, time_to_minutes, ACTIVE_STATUSES
+from app.slots import SlotLedger, SlotConflictError
+from app.pagination import decode_cursor, keyset_query
+from app.counts import count_cache, find_with_total
+from app.etags import etag_versions
+from app.stages import stage
+from app.timestamps import day_range, day_start, time_fields
 
 settings = get_settings()
 
+# Slot length used when a resource's own is not a positive number of minutes
+DEFAULT_SLOT_DURATION_MINUTES = 60
+
+# Grid entry error for resources whose schedule could not be fetched
+RESOURCE_UNAVAILABLE = "Resource not found or resource service unavailable"
+
 
 class ReservationService:
     """Service class for reservation operations"""
     
     COLLECTION = "reservations"
+    # Listing orders; _id breaks ties so keyset cursors are unambiguous
+    SORT = [("date", 1), ("start_time", 1), ("_id", 1)]
+    ADMIN_SORT = [("date", -1), ("start_time", 1), ("_id", 1)]
     
     @staticmethod
     def _serialize_reservation(reservation: dict) -> dict:
@@ -24,21 +41,54 @@ class ReservationService:
             reservation["id"] = str(reservation.pop("_id"))
         return reservation
     
+    @staticmethod
+    async def _written(*reservations: Optional[dict]) -> None:
+        """Invalidate cached totals and read ETags after writing reservations (None when missed)"""
+        count_cache.invalidate(ReservationService.COLLECTION)
+        etag_versions.bump(ReservationService.COLLECTION)
+        days = {(r["resource_id"], r["date"]) for r in reservations if r}
+        for resource_id in {resource_id for resource_id, _ in days}:
+            etag_versions.bump(resource_id)
+        for resource_id, date in days:
+            await SlotLedger.touch(resource_id, date)
+    
+    @staticmethod
+    async def _find_page(
+        query: dict,
+        sort: List[Tuple[str, int]],
+        skip: int,
+        limit: int,
+        cursor: Optional[str],
+        exact_total: bool = False,
+        projection: Optional[dict] = None
+    ) -> Tuple[List[dict], Optional[int]]:
+        """
+        Fetch one page of raw documents, limited to `projection` when given.
+        
+        With a cursor the page starts right after the document it encodes
+        (keyset pagination, constant cost per page) and `skip` is ignored;
+        without one the classic skip/limit is used. With exact_total the
+        page and the exact total of query come from one $facet aggregation,
+        otherwise the total is None.
+        """
+        collection = get_list_database()[ReservationService.COLLECTION]
+        page_query, after = query, None
+        if cursor:
+            values = decode_cursor(cursor, sort)
+            page_query = keyset_query(query, sort, values)
+            after = keyset_query({}, sort, values)
+            skip = 0
+        
+        if exact_total:
+            return await find_with_total(collection, query, sort, skip, limit, after, projection)
+        
+        documents = collection.find(page_query, projection).sort(sort).skip(skip).limit(limit)
+        return await documents.to_list(length=limit), None
+    
     @staticmethod
     async def get_resource_info(resource_id: str, token: str) -> Optional[dict]:
         """Fetch resource info from resource service"""
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{settings.RESOURCE_SERVICE_URL}/api/v1/resources/{resource_id}",
-                    headers={"Authorization": f"Bearer {token}"},
-                    timeout=5.0
-                )
-                if response.status_code == 200:
-                    return response.json()
-        except Exception as e:
-            print(f"Failed to fetch resource info: {e}")
-        return None
+        return await ResourceClient.get_resource(resource_id, token)
     
     @staticmethod
     async def check_availability(
@@ -48,30 +98,30 @@ class ReservationService:
         end_time: str,
         exclude_reservation_id: Optional[str] = None
     ) -> bool:
-        """Check if time slot is available for the resource"""
+        """
+        Check if time slot is available for the resource.
+        
+        Served from the per-process interval index when enabled, so the
+        answer may miss bookings made through other replicas; callers only
+        use it to reject early and rely on SlotLedger.claim to book.
+        """
+        if settings.INTERVAL_INDEX_ENABLED:
+            is_available = await ReservationService._check_availability_indexed(
+                resource_id, date, start_time, end_time, exclude_reservation_id
+            )
+            if is_available is not None:
+                return is_available
+        
         db = get_database()
         
+        # Half-open intervals overlap when each starts before the other ends;
+        # bookings never cross midnight, so only the same day can overlap
+        requested = time_fields(date, start_time, end_time)
         query = {
             "resource_id": resource_id,
-            "date": date,
-            "status": {"$in": ["pending", "confirmed"]},
-            "$or": [
-                # New slot starts during existing slot
-                {"$and": [
-                    {"start_time": {"$lte": start_time}},
-                    {"end_time": {"$gt": start_time}}
-                ]},
-                # New slot ends during existing slot
-                {"$and": [
-                    {"start_time": {"$lt": end_time}},
-                    {"end_time": {"$gte": end_time}}
-                ]},
-                # New slot contains existing slot
-                {"$and": [
-                    {"start_time": {"$gte": start_time}},
-                    {"end_time": {"$lte": end_time}}
-                ]}
-            ]
+            "status": {"$in": ACTIVE_STATUSES},
+            "start_ts": {"$gte": day_start(date), "$lt": requested["end_ts"]},
+            "end_ts": {"$gt": requested["start_ts"]}
         }
         
         if exclude_reservation_id and ObjectId.is_valid(exclude_reservation_id):
@@ -80,6 +130,153 @@ class ReservationService:
         conflict = await db[ReservationService.COLLECTION].find_one(query)
         return conflict is None
     
+    @staticmethod
+    async def _check_availability_indexed(
+        resource_id: str,
+        date: str,
+        start_time: str,
+        end_time: str,
+        exclude_reservation_id: Optional[str] = None
+    ) -> Optional[bool]:
+        """Answer an availability check from the interval index, None if it cannot"""
+        entry = interval_index.get(resource_id, date)
+        if entry is None:
+            # Cold entry: load the whole day once, later checks stay in memory
+            db = get_database()
+            version = interval_index.version
+            first_minute, last_minute = day_range(date, date)
+            cursor = db[ReservationService.COLLECTION].find(
+                {
+                    "resource_id": resource_id,
+                    "status": {"$in": ACTIVE_STATUSES},
+                    "start_ts": {"$gte": first_minute, "$lt": last_minute}
+                },
+                {"start_time": 1, "end_time": 1}
+            )
+            reservations = await cursor.to_list(length=None)
+            entry = interval_index.populate(resource_id, date, reservations, version)
+            if entry is None:
+                return None
+        
+        return not entry.overlaps(
+            time_to_minutes(start_time),
+            time_to_minutes(end_time),
+            exclude_id=exclude_reservation_id
+        )
+    
+    @staticmethod
+    def _availability_bitmap(
+        opening: int,
+        closing: int,
+        slot_duration: int,
+        intervals: List[Tuple[int, int]]
+    ) -> str:
+        """Sweep slots and reservation intervals (in minutes) in one pass"""
+        if slot_duration <= 0:
+            # A zero or negative duration would never advance the sweep
+            slot_duration = DEFAULT_SLOT_DURATION_MINUTES
+        intervals = sorted(intervals)
+        bitmap = []
+        i = 0
+        max_end = -1
+        slot_start = opening
+        while slot_start + slot_duration <= closing:
+            slot_end = slot_start + slot_duration
+            # Fold in every interval starting before this slot ends; the slot
+            # is booked if any of them reaches past the slot start.
+            while i < len(intervals) and intervals[i][0] < slot_end:
+                max_end = max(max_end, intervals[i][1])
+                i += 1
+            bitmap.append("0" if max_end > slot_start else "1")
+            slot_start = slot_end
+        return "".join(bitmap)
+    
+    @staticmethod
+    async def get_availability_grid(
+        resource_ids: List[str],
+        start_date: str,
+        end_date: str,
+        token: str
+    ) -> List[dict]:
+        """
+        Build availability bitmaps for several resources over a date range.
+        
+        Resources whose schedule cannot be fetched (unknown id or resource
+        service down) get an entry with `error` set and no days, rather
+        than slots that could not be booked.
+        """
+        db = get_database()
+        
+        resources = await asyncio.gather(*(
+            ReservationService.get_resource_info(resource_id, token)
+            for resource_id in resource_ids
+        ))
+        
+        first_minute, last_minute = day_range(start_date, end_date)
+        pipeline = [
+            {"$match": {
+                "resource_id": {"$in": resource_ids},
+                "status": {"$in": ACTIVE_STATUSES},
+                "start_ts": {"$gte": first_minute, "$lt": last_minute}
+            }},
+            {"$group": {
+                "_id": {"resource_id": "$resource_id", "date": "$date"},
+                "intervals": {"$push": {"start": "$start_time", "end": "$end_time"}}
+            }}
+        ]
+        booked: Dict[Tuple[str, str], List[Tuple[int, int]]] = {}
+        async for group in db[ReservationService.COLLECTION].aggregate(pipeline):
+            booked[(group["_id"]["resource_id"], group["_id"]["date"])] = [
+                (time_to_minutes(r["start"]), time_to_minutes(r["end"]))
+                for r in group["intervals"]
+            ]
+        
+        first_day = datetime.strptime(start_date, "%Y-%m-%d").date()
+        last_day = datetime.strptime(end_date, "%Y-%m-%d").date()
+        days = [
+            first_day + timedelta(days=offset)
+            for offset in range((last_day - first_day).days + 1)
+        ]
+        
+        grid = []
+        for resource_id, resource in zip(resource_ids, resources):
+            if resource is None:
+                grid.append({
+                    "resource_id": resource_id,
+                    "opening_time": None,
+                    "closing_time": None,
+                    "slot_duration_minutes": None,
+                    "days": [],
+                    "error": RESOURCE_UNAVAILABLE
+                })
+                continue
+            hours = resource["available_hours"]
+            opening = time_to_minutes(hours["start_time"])
+            closing = time_to_minutes(hours["end_time"])
+            slot_duration = resource["slot_duration_minutes"]
+            if slot_duration <= 0:
+                slot_duration = DEFAULT_SLOT_DURATION_MINUTES
+            open_days = set(resource["available_days"])
+            
+            resource_days = []
+            for day in days:
+                date = day.isoformat()
+                bitmap = ""
+                if day.weekday() in open_days:
+                    bitmap = ReservationService._availability_bitmap(
+                        opening, closing, slot_duration, booked.get((resource_id, date), [])
+                    )
+                resource_days.append({"date": date, "bitmap": bitmap})
+            
+            grid.append({
+                "resource_id": resource_id,
+                "opening_time": hours["start_time"],
+                "closing_time": hours["end_time"],
+                "slot_duration_minutes": slot_duration,
+                "days": resource_days
+            })
+        return grid
+    
     @staticmethod
     async def create_reservation(
         reservation_data: ReservationCreate,
@@ -87,17 +284,32 @@ class ReservationService:
         username: str,
         token: str
     ) -> dict:
-        """Create a new reservation"""
+        """Create a new reservation, raising SlotConflictError if the slot is taken"""
         db = get_database()
         
         # Verify resource exists
-        resource = await ReservationService.get_resource_info(
-            reservation_data.resource_id, token
-        )
+        with stage("get_resource_info"):
+            resource = await ReservationService.get_resource_info(
+                reservation_data.resource_id, token
+            )
         resource_name = resource.get("name") if resource else "Unknown Resource"
         
+        # Claim the slot atomically before the reservation becomes visible
+        reservation_id = ObjectId()
+        with stage("claim_slot"):
+            claimed = await SlotLedger.claim(
+                reservation_data.resource_id,
+                reservation_data.date,
+                reservation_data.start_time,
+                reservation_data.end_time,
+                str(reservation_id)
+            )
+        if not claimed:
+            raise SlotConflictError()
+        
         # Create reservation document
         reservation_dict = {
+            "_id": reservation_id,
             "user_id": user_id,
             "username": username,
             "resource_id": reservation_data.resource_id,
@@ -105,6 +317,9 @@ class ReservationService:
             "date": reservation_data.date,
             "start_time": reservation_data.start_time,
             "end_time": reservation_data.end_time,
+            **time_fields(
+                reservation_data.date, reservation_data.start_time, reservation_data.end_time
+            ),
             "purpose": reservation_data.purpose,
             "notes": reservation_data.notes,
             "status": ReservationStatus.CONFIRMED.value,
@@ -114,20 +329,36 @@ class ReservationService:
             "cancellation_reason": None
         }
         
-        result = await db[ReservationService.COLLECTION].insert_one(reservation_dict)
-        reservation_dict["_id"] = result.inserted_id
+        try:
+            with stage("insert_one"):
+                result = await db[ReservationService.COLLECTION].insert_one(reservation_dict)
+        except BaseException:
+            # Also on cancellation; a crash is left to the ledger sweeper
+            await SlotLedger.release(
+                reservation_data.resource_id, reservation_data.date, str(reservation_id)
+            )
+            raise
+        await ReservationService._written(reservation_dict)
+        interval_index.add(
+            str(result.inserted_id),
+            reservation_data.resource_id,
+            reservation_data.date,
+            reservation_data.start_time,
+            reservation_data.end_time
+        )
         
         # Send notification
-        await MessageQueue.publish_notification(NotificationEvent(
-            event_type="reservation_created",
-            user_id=user_id,
-            username=username,
-            reservation_id=str(result.inserted_id),
-            resource_name=resource_name,
-            date=reservation_data.date,
-            start_time=reservation_data.start_time,
-            end_time=reservation_data.end_time
-        ))
+        with stage("enqueue_notification"):
+            await Outbox.enqueue(NotificationEvent(
+                event_type="reservation_created",
+                user_id=user_id,
+                username=username,
+                reservation_id=str(result.inserted_id),
+                resource_name=resource_name,
+                date=reservation_data.date,
+                start_time=reservation_data.start_time,
+                end_time=reservation_data.end_time
+            ))
         
         return ReservationService._serialize_reservation(reservation_dict)
     
@@ -148,10 +379,17 @@ class ReservationService:
         skip: int = 0,
         limit: int = 100,
         status: Optional[str] = None,
-        upcoming_only: bool = False
-    ) -> List[dict]:
-        """Get reservations for a specific user"""
-        db = get_database()
+        upcoming_only: bool = False,
+        cursor: Optional[str] = None,
+        exact_total: bool = False,
+        projection: Optional[dict] = None
+    ) -> Tuple[List[dict], Optional[int]]:
+        """
+        Get reservations for a specific user, after `cursor` when given.
+        
+        Returns the page and, with exact_total, the exact total (else None).
+        `projection` limits the fields fetched.
+        """
         query = {"user_id": user_id}
         
         if status:
@@ -161,44 +399,41 @@ class ReservationService:
             today = datetime.utcnow().strftime("%Y-%m-%d")
             query["date"] = {"$gte": today}
         
-        cursor = db[ReservationService.COLLECTION].find(query).sort(
-            [("date", 1), ("start_time", 1)]
-        ).skip(skip).limit(limit)
-        
-        reservations = await cursor.to_list(length=limit)
-        return [ReservationService._serialize_reservation(r) for r in reservations]
+        reservations, total = await ReservationService._find_page(
+            query, ReservationService.SORT, skip, limit, cursor, exact_total, projection
+        )
+        return [ReservationService._serialize_reservation(r) for r in reservations], total
     
     @staticmethod
     async def get_user_reservations_count(
         user_id: int,
         status: Optional[str] = None
     ) -> int:
-        """Get count of user's reservations"""
+        """Get count of user's reservations (cached briefly)"""
         db = get_database()
         query = {"user_id": user_id}
         if status:
             query["status"] = status
-        return await db[ReservationService.COLLECTION].count_documents(query)
+        return await count_cache.count(db[ReservationService.COLLECTION], query)
     
     @staticmethod
     async def get_resource_reservations(
         resource_id: str,
         date: Optional[str] = None,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        projection: Optional[dict] = None
     ) -> List[dict]:
-        """Get reservations for a specific resource"""
-        db = get_database()
+        """Get reservations for a specific resource, after `cursor` when given"""
         query = {"resource_id": resource_id}
         
         if date:
             query["date"] = date
         
-        cursor = db[ReservationService.COLLECTION].find(query).sort(
-            [("date", 1), ("start_time", 1)]
-        ).skip(skip).limit(limit)
-        
-        reservations = await cursor.to_list(length=limit)
+        reservations, _ = await ReservationService._find_page(
+            query, ReservationService.SORT, skip, limit, cursor, projection=projection
+        )
         return [ReservationService._serialize_reservation(r) for r in reservations]
     
     @staticmethod
@@ -206,10 +441,17 @@ class ReservationService:
         skip: int = 0,
         limit: int = 100,
         status: Optional[str] = None,
-        date: Optional[str] = None
-    ) -> List[dict]:
-        """Get all reservations (admin)"""
-        db = get_database()
+        date: Optional[str] = None,
+        cursor: Optional[str] = None,
+        exact_total: bool = False,
+        projection: Optional[dict] = None
+    ) -> Tuple[List[dict], Optional[int]]:
+        """
+        Get all reservations (admin), after `cursor` when given.
+        
+        Returns the page and, with exact_total, the exact total (else None).
+        `projection` limits the fields fetched.
+        """
         query = {}
         
         if status:
@@ -217,33 +459,31 @@ class ReservationService:
         if date:
             query["date"] = date
         
-        cursor = db[ReservationService.COLLECTION].find(query).sort(
-            [("date", -1), ("start_time", 1)]
-        ).skip(skip).limit(limit)
-        
-        reservations = await cursor.to_list(length=limit)
-        return [ReservationService._serialize_reservation(r) for r in reservations]
+        reservations, total = await ReservationService._find_page(
+            query, ReservationService.ADMIN_SORT, skip, limit, cursor, exact_total, projection
+        )
+        return [ReservationService._serialize_reservation(r) for r in reservations], total
     
     @staticmethod
     async def get_all_reservations_count(
         status: Optional[str] = None,
         date: Optional[str] = None
     ) -> int:
-        """Get count of all reservations"""
+        """Get count of all reservations (cached briefly, estimated when unfiltered)"""
         db = get_database()
         query = {}
         if status:
             query["status"] = status
         if date:
             query["date"] = date
-        return await db[ReservationService.COLLECTION].count_documents(query)
+        return await count_cache.count(db[ReservationService.COLLECTION], query)
     
     @staticmethod
     async def update_reservation(
         reservation_id: str,
         update_data: ReservationUpdate
     ) -> Optional[dict]:
-        """Update a reservation"""
+        """Update a reservation, raising SlotConflictError if a new time slot is taken"""
         db = get_database()
         if not ObjectId.is_valid(reservation_id):
             return None
@@ -252,13 +492,55 @@ class ReservationService:
         if not update_dict:
             return await ReservationService.get_reservation_by_id(reservation_id)
         
+        current, claimed = None, False
+        if {"date", "start_time", "end_time"} & update_dict.keys():
+            current = await db[ReservationService.COLLECTION].find_one(
+                {"_id": ObjectId(reservation_id)}
+            )
+            if not current:
+                return None
+            date = update_dict.get("date", current["date"])
+            start_time = update_dict.get("start_time", current["start_time"])
+            end_time = update_dict.get("end_time", current["end_time"])
+            if current["status"] in ACTIVE_STATUSES:
+                # Claiming on the same day atomically replaces the old interval
+                claimed = await SlotLedger.claim(
+                    current["resource_id"], date, start_time, end_time, reservation_id
+                )
+                if not claimed:
+                    raise SlotConflictError()
+            update_dict.update(time_fields(date, start_time, end_time))
+        
         update_dict["updated_at"] = datetime.utcnow()
         
-        result = await db[ReservationService.COLLECTION].find_one_and_update(
-            {"_id": ObjectId(reservation_id)},
-            {"$set": update_dict},
-            return_document=True
-        )
+        try:
+            result = await db[ReservationService.COLLECTION].find_one_and_update(
+                {"_id": ObjectId(reservation_id)},
+                {"$set": update_dict},
+                return_document=True
+            )
+        except BaseException:
+            if claimed:
+                # The document kept its old time: restore its interval on the
+                # claimed day (or drop the claim if it moved days)
+                await SlotLedger.resync(current["resource_id"], date, reservation_id)
+            raise
+        await ReservationService._written(current, result)
+        if current and result and current["date"] != result["date"]:
+            await SlotLedger.release(current["resource_id"], current["date"], reservation_id)
+        elif current and not result:
+            # Reservation vanished concurrently, give the new claim back
+            await SlotLedger.release(
+                current["resource_id"], update_dict.get("date", current["date"]), reservation_id
+            )
+        if result and result["status"] in ACTIVE_STATUSES:
+            interval_index.add(
+                reservation_id,
+                result["resource_id"],
+                result["date"],
+                result["start_time"],
+                result["end_time"]
+            )
         return ReservationService._serialize_reservation(result) if result else None
     
     @staticmethod
@@ -283,10 +565,14 @@ class ReservationService:
             {"$set": update_data},
             return_document=True
         )
+        await ReservationService._written(result)
         
         if result:
+            interval_index.remove(reservation_id)
+            await SlotLedger.release(result["resource_id"], result["date"], reservation_id)
+            
             # Send cancellation notification
-            await MessageQueue.publish_notification(NotificationEvent(
+            await Outbox.enqueue(NotificationEvent(
                 event_type="reservation_cancelled",
                 user_id=result["user_id"],
                 username=result["username"],
@@ -315,6 +601,10 @@ class ReservationService:
             }},
             return_document=True
         )
+        await ReservationService._written(result)
+        if result:
+            interval_index.remove(reservation_id)
+            await SlotLedger.release(result["resource_id"], result["date"], reservation_id)
         return ReservationService._serialize_reservation(result) if result else None
     
     @staticmethod
@@ -332,4 +622,8 @@ class ReservationService:
             }},
             return_document=True
         )
+        await ReservationService._written(result)
+        if result:
+            interval_index.remove(reservation_id)
+            await SlotLedger.release(result["resource_id"], result["date"], reservation_id)
         return ReservationService._serialize_reservation(result) if result else None
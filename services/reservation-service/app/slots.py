@@ -0,0 +1,261 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from bson import ObjectId
+from prometheus_client import Counter
+from pymongo.errors import DuplicateKeyError
+from app.config import get_settings
+from app.database import get_database, get_list_database
+from app.interval_index import ACTIVE_STATUSES, time_to_minutes
+
+settings = get_settings()
+
+SLOT_CLAIMS_RESYNCED = Counter(
+    'slot_ledger_resynced_claims_total',
+    'Pending slot claims checked against their reservation by the sweeper'
+)
+
+
+class SlotConflictError(Exception):
+    """Raised when a time slot is already claimed by another reservation"""
+
+
+class SlotLedger:
+    """
+    Atomic slot claiming for reservations.
+    
+    Each (resource_id, date) pair owns one ledger document listing the
+    claimed intervals in minutes. A claim is a single conditional upsert:
+    the filter only matches when no other reservation's interval overlaps,
+    so concurrent writers on the same resource and day are serialized by
+    MongoDB's document-level atomicity instead of an external lock. When the
+    filter does not match, the upsert collides with the unique index on
+    (resource_id, date) and the claim fails.
+    
+    A day's ledger document is seeded from the active reservations already
+    booked on it when first created, so bookings made before the ledger
+    existed block overlapping claims too.
+    
+    A claim is pending (it carries `claimed_at`) until the sweeper has
+    matched it against the reservation document. Claims whose reservation
+    write never happened, because the request failed, was cancelled or the
+    process died in between, are dropped after SLOT_CLAIM_GRACE_SECONDS
+    instead of blocking the slot forever.
+    
+    Every reservation write also bumps the `version` of the days it
+    touched, which availability ETags are derived from on all replicas.
+    """
+    
+    COLLECTION = "reservation_slots"
+    RESERVATIONS = "reservations"
+    
+    _task: asyncio.Task = None
+    
+    @staticmethod
+    def intervals(reservations) -> list:
+        """Ledger intervals of reservation documents"""
+        return [
+            {
+                "start": time_to_minutes(reservation["start_time"]),
+                "end": time_to_minutes(reservation["end_time"]),
+                "reservation_id": str(reservation["_id"])
+            }
+            for reservation in reservations
+        ]
+    
+    @staticmethod
+    async def seed(resource_id: str, date: str) -> None:
+        """Create the day's ledger document from existing bookings unless it exists"""
+        db = get_database()
+        ledger = db[SlotLedger.COLLECTION]
+        if await ledger.find_one({"resource_id": resource_id, "date": date}, {"_id": 1}):
+            return
+        
+        reservations = await db[SlotLedger.RESERVATIONS].find(
+            {"resource_id": resource_id, "date": date, "status": {"$in": ACTIVE_STATUSES}},
+            {"start_time": 1, "end_time": 1}
+        ).to_list(length=None)
+        # Bookings made through the ledger create the document before they
+        # are inserted, so a concurrent seed loses to it on the unique index
+        # and never misses them
+        try:
+            await ledger.insert_one({
+                "resource_id": resource_id,
+                "date": date,
+                "intervals": SlotLedger.intervals(reservations)
+            })
+        except DuplicateKeyError:
+            pass
+    
+    @staticmethod
+    async def claim(
+        resource_id: str,
+        date: str,
+        start_time: str,
+        end_time: str,
+        reservation_id: str
+    ) -> bool:
+        """Claim [start_time, end_time) for a reservation, replacing its previous claim on that day"""
+        await SlotLedger.seed(resource_id, date)
+        db = get_database()
+        start = time_to_minutes(start_time)
+        end = time_to_minutes(end_time)
+        query = {
+            "resource_id": resource_id,
+            "date": date,
+            "intervals": {"$not": {"$elemMatch": {
+                "start": {"$lt": end},
+                "end": {"$gt": start},
+                "reservation_id": {"$ne": reservation_id}
+            }}}
+        }
+        update = [{"$set": {"intervals": {"$concatArrays": [
+            {"$filter": {
+                "input": {"$ifNull": ["$intervals", []]},
+                "cond": {"$ne": ["$$this.reservation_id", reservation_id]}
+            }},
+            [{"start": start, "end": end, "reservation_id": reservation_id, "claimed_at": datetime.utcnow()}]
+        ]}}}]
+        
+        # Two first claims of an empty day can race on the upsert insert; the
+        # retry then sees the existing document and decides on its contents.
+        for _ in range(2):
+            try:
+                await db[SlotLedger.COLLECTION].update_one(query, update, upsert=True)
+                return True
+            except DuplicateKeyError:
+                continue
+        return False
+    
+    @staticmethod
+    async def release(resource_id: str, date: str, reservation_id: str) -> None:
+        """Release the interval claimed by a reservation"""
+        db = get_database()
+        await db[SlotLedger.COLLECTION].update_one(
+            {"resource_id": resource_id, "date": date},
+            {"$pull": {"intervals": {"reservation_id": reservation_id}}}
+        )
+    
+    @staticmethod
+    async def touch(resource_id: str, date: str) -> None:
+        """Bump the day's version after a reservation on it was written"""
+        # Seed first, so the day never gets a document without its bookings
+        await SlotLedger.seed(resource_id, date)
+        await get_database()[SlotLedger.COLLECTION].update_one(
+            {"resource_id": resource_id, "date": date},
+            {"$inc": {"version": 1}}
+        )
+    
+    @staticmethod
+    async def versions(
+        resource_ids: List[str],
+        first_date: str,
+        last_date: str
+    ) -> Dict[Tuple[str, str], int]:
+        """
+        Versions of the resources' days from first_date through last_date.
+        
+        Days without a ledger document have had no write since the ledger
+        existed and are left out. Read with the listing read preference, so
+        a lagging secondary returns a version older than the reservations
+        served with it rather than a newer one.
+        """
+        ledgers = get_list_database()[SlotLedger.COLLECTION].find(
+            {"resource_id": {"$in": resource_ids}, "date": {"$gte": first_date, "$lte": last_date}},
+            {"_id": 0, "resource_id": 1, "date": 1, "version": 1}
+        )
+        return {
+            (ledger["resource_id"], ledger["date"]): ledger.get("version", 0)
+            async for ledger in ledgers
+        }
+    
+    @staticmethod
+    async def resync(
+        resource_id: str,
+        date: str,
+        reservation_id: str,
+        claimed_at: Optional[datetime] = None
+    ) -> None:
+        """
+        Make a reservation's interval on a day match its document.
+        
+        The interval of an active reservation of that resource on that day
+        is kept, as a settled claim; any other claim by it is dropped. With
+        claimed_at, nothing changes unless that pending claim is still in
+        place, so a newer claim by the same reservation is left alone.
+        """
+        db = get_database()
+        reservation = None
+        if ObjectId.is_valid(reservation_id):
+            reservation = await db[SlotLedger.RESERVATIONS].find_one(
+                {
+                    "_id": ObjectId(reservation_id),
+                    "resource_id": resource_id,
+                    "date": date,
+                    "status": {"$in": ACTIVE_STATUSES}
+                },
+                {"start_time": 1, "end_time": 1}
+            )
+        keep = SlotLedger.intervals([reservation]) if reservation else []
+        
+        query = {"resource_id": resource_id, "date": date}
+        if claimed_at is not None:
+            query["intervals"] = {"$elemMatch": {"reservation_id": reservation_id, "claimed_at": claimed_at}}
+        await db[SlotLedger.COLLECTION].update_one(query, [{"$set": {"intervals": {"$concatArrays": [
+            {"$filter": {
+                "input": {"$ifNull": ["$intervals", []]},
+                "cond": {"$ne": ["$$this.reservation_id", reservation_id]}
+            }},
+            {"$literal": keep}
+        ]}}}])
+    
+    @staticmethod
+    async def sweep(grace_seconds: float) -> int:
+        """Resync every claim pending for longer than grace_seconds, returning how many"""
+        db = get_database()
+        cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+        ledgers = db[SlotLedger.COLLECTION].find(
+            {"intervals.claimed_at": {"$lt": cutoff}},
+            {"resource_id": 1, "date": 1, "intervals": 1}
+        )
+        resynced = 0
+        async for ledger in ledgers:
+            for interval in ledger["intervals"]:
+                claimed_at = interval.get("claimed_at")
+                if claimed_at is None or claimed_at >= cutoff:
+                    continue
+                await SlotLedger.resync(
+                    ledger["resource_id"], ledger["date"], interval["reservation_id"], claimed_at
+                )
+                resynced += 1
+        SLOT_CLAIMS_RESYNCED.inc(resynced)
+        return resynced
+    
+    @classmethod
+    async def start(cls):
+        """Start the background sweeper"""
+        cls._task = asyncio.create_task(cls._run())
+        print("Slot ledger sweeper started")
+    
+    @classmethod
+    async def stop(cls):
+        """Stop the background sweeper"""
+        if cls._task:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+            print("Slot ledger sweeper stopped")
+    
+    @classmethod
+    async def _run(cls):
+        while True:
+            try:
+                await cls.sweep(settings.SLOT_CLAIM_GRACE_SECONDS)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Slot ledger sweep error: {e}")
+            await asyncio.sleep(settings.SLOT_SWEEP_INTERVAL_SECONDS)
@@ -0,0 +1,129 @@
+import time
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+from prometheus_client import Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import get_settings
+from app.metrics import LATENCY_BUCKETS
+
+settings = get_settings()
+
+STAGE_LATENCY = Histogram(
+    'reservation_stage_duration_seconds',
+    'Duration of each stage of a request, e.g. of the booking path',
+    ['stage'],
+    buckets=LATENCY_BUCKETS
+)
+
+# (stage, seconds) recorded during the current request when Server-Timing is on
+_recorded: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("stages", default=None)
+
+# OpenTelemetry tracer once configure_tracing() found an exporter endpoint
+_tracer = None
+_provider = None
+
+
+class stage:
+    """
+    Time a block as one named stage:
+        
+        with stage("insert_one"):
+            await collection.insert_one(document)
+    
+    The duration always goes to STAGE_LATENCY. It is also listed in the
+    Server-Timing header when SERVER_TIMING_ENABLED and exported as an
+    OpenTelemetry span when tracing is configured; both cost nothing
+    otherwise.
+    """
+    
+    __slots__ = ("name", "start", "span")
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.span = None
+    
+    def __enter__(self) -> "stage":
+        if _tracer is not None:
+            self.span = _tracer.start_as_current_span(self.name)
+            self.span.__enter__()
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        duration = time.perf_counter() - self.start
+        STAGE_LATENCY.labels(stage=self.name).observe(duration)
+        recorded = _recorded.get()
+        if recorded is not None:
+            recorded.append((self.name, duration))
+        if self.span is not None:
+            self.span.__exit__(*exc_info)
+
+
+def server_timing(recorded: List[Tuple[str, float]]) -> str:
+    """Server-Timing header value, durations in milliseconds"""
+    return ", ".join(f"{name};dur={duration * 1000:.1f}" for name, duration in recorded)
+
+
+class ServerTimingMiddleware:
+    """Pure ASGI middleware adding the stages timed during a request as Server-Timing"""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        recorded: List[Tuple[str, float]] = []
+        token = _recorded.set(recorded)
+        
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start" and recorded:
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(recorded).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _recorded.reset(token)
+
+
+def configure_tracing() -> None:
+    """
+    Export stages as OpenTelemetry spans when OTEL_EXPORTER_OTLP_ENDPOINT is set.
+    
+    Needs the optional opentelemetry-sdk and
+    opentelemetry-exporter-otlp-proto-http packages; without them, or
+    without an endpoint, stages are only recorded in Prometheus.
+    """
+    global _tracer, _provider
+    if not settings.OTEL_EXPORTER_OTLP_ENDPOINT:
+        return
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError as e:
+        print(f"OpenTelemetry export disabled, packages missing: {e}")
+        return
+    
+    _provider = TracerProvider(resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME}))
+    _provider.add_span_processor(
+        BatchSpanProcessor(OTLPSpanExporter(endpoint=settings.OTEL_EXPORTER_OTLP_ENDPOINT))
+    )
+    trace.set_tracer_provider(_provider)
+    _tracer = trace.get_tracer(__name__)
+    print(f"Exporting stage spans to {settings.OTEL_EXPORTER_OTLP_ENDPOINT}")
+
+
+def shutdown_tracing() -> None:
+    """Flush and stop the span exporter, if any"""
+    global _tracer, _provider
+    if _provider is not None:
+        _provider.shutdown()
+    _tracer = _provider = None
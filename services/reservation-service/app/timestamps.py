@@ -0,0 +1,94 @@
+import asyncio
+from datetime import date as date_type
+from typing import Dict, Tuple
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.config import get_settings
+from app.interval_index import time_to_minutes
+
+settings = get_settings()
+
+MINUTES_PER_DAY = 24 * 60
+EPOCH = date_type(1970, 1, 1)
+
+# Documents written before the numeric fields existed, or by replicas still
+# running an older version; served by the start_ts index
+MISSING_TIME_FIELDS = {"start_ts": {"$exists": False}}
+
+# Server-side computation of start_ts/end_ts from the string fields, used to
+# backfill documents written before the numeric fields existed
+BACKFILL_PIPELINE = [
+    {"$set": {
+        "start_ts": {"$add": [
+            {"$toLong": {"$divide": [
+                {"$toLong": {"$dateFromString": {"dateString": "$date", "format": "%Y-%m-%d"}}},
+                60000
+            ]}},
+            {"$multiply": [{"$toInt": {"$substrBytes": ["$start_time", 0, 2]}}, 60]},
+            {"$toInt": {"$substrBytes": ["$start_time", 3, 2]}}
+        ]},
+        "end_ts": {"$add": [
+            {"$toLong": {"$divide": [
+                {"$toLong": {"$dateFromString": {"dateString": "$date", "format": "%Y-%m-%d"}}},
+                60000
+            ]}},
+            {"$multiply": [{"$toInt": {"$substrBytes": ["$end_time", 0, 2]}}, 60]},
+            {"$toInt": {"$substrBytes": ["$end_time", 3, 2]}}
+        ]}
+    }}
+]
+
+
+def day_start(date: str) -> int:
+    """Epoch minute at which a "YYYY-MM-DD" date starts"""
+    return (date_type.fromisoformat(date) - EPOCH).days * MINUTES_PER_DAY
+
+
+def epoch_minutes(date: str, time: str) -> int:
+    """Convert a "YYYY-MM-DD" date and "HH:MM" time to minutes since the Unix epoch"""
+    return day_start(date) + time_to_minutes(time)
+
+
+def day_range(first_date: str, last_date: str) -> Tuple[int, int]:
+    """Half-open epoch-minute range covering first_date through last_date"""
+    return day_start(first_date), day_start(last_date) + MINUTES_PER_DAY
+
+
+def time_fields(date: str, start_time: str, end_time: str) -> Dict[str, int]:
+    """Numeric start_ts/end_ts fields stored next to the string fields"""
+    return {
+        "start_ts": epoch_minutes(date, start_time),
+        "end_ts": epoch_minutes(date, end_time)
+    }
+
+
+async def backfill_time_fields(collection) -> int:
+    """
+    Add start_ts/end_ts to documents missing them, returning how many were updated.
+    
+    An indexed probe makes this a single lookup when nothing is missing.
+    Otherwise the update is repeated until the probe comes back empty, since
+    replicas still on an older version may insert documents without the
+    fields during a rolling deploy; run it again once the rollout finishes.
+    """
+    updated = 0
+    while await collection.find_one(MISSING_TIME_FIELDS, {"_id": 1}):
+        result = await collection.update_many(MISSING_TIME_FIELDS, BACKFILL_PIPELINE)
+        if not result.modified_count:
+            break
+        updated += result.modified_count
+    return updated
+
+
+async def main():
+    """Run the backfill against MONGODB_URL/MONGODB_DB, e.g. once a rollout has finished"""
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    try:
+        updated = await backfill_time_fields(client[settings.MONGODB_DB]["reservations"])
+        print(f"Backfilled start_ts/end_ts on {updated} reservations")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    # Usage (from services/reservation-service): python -m app.timestamps
+    asyncio.run(main())
@@ -17,11 +17,14 @@ class TestHealthEndpoints:
         assert data["service"] == "reservation-service"
     
     def test_readiness_check(self):
-        """Test readiness endpoint returns ready status"""
+        """Test readiness endpoint returns ready status with the details behind it"""
         response = client.get("/ready")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "ready"
+        assert data["reasons"] == []
+        assert "event_loop_lag_seconds" in data
+        assert "requests_in_flight" in data
     
     def test_root_endpoint(self):
         """Test root endpoint returns service info"""
@@ -54,3 +57,140 @@ class TestReservationEndpoints:
         """Test getting availability without token"""
         response = client.get("/api/v1/availability/123?date=2024-01-15")
         assert response.status_code == 403
+
+
+class TestConditionalAvailability:
+    """Test availability ETags follow the shared slot ledger versions"""
+    
+    def setup_method(self):
+        from app.auth import TokenData, get_current_user
+        app.dependency_overrides[get_current_user] = lambda: TokenData(user_id=1, username="user1", role="student")
+    
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+    
+    def test_resource_availability_revalidates(self, monkeypatch):
+        """Test a 304 until another replica's write bumps the day's version"""
+        from app.services import ReservationService
+        from app.slots import SlotLedger
+        versions = {("r1", "2024-01-15"): 1}
+        reads = []
+        
+        async def get_versions(resource_ids, first_date, last_date):
+            return dict(versions)
+        
+        async def get_resource_reservations(resource_id, date=None):
+            reads.append(resource_id)
+            return [{"start_time": "09:00", "end_time": "10:00", "status": "confirmed"}]
+        
+        monkeypatch.setattr(SlotLedger, "versions", get_versions)
+        monkeypatch.setattr(ReservationService, "get_resource_reservations", get_resource_reservations)
+        url = "/api/v1/availability/r1?date=2024-01-15"
+        
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert reads == ["r1"]
+        
+        versions[("r1", "2024-01-15")] = 2
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+    
+    def test_availability_grid_revalidates(self, monkeypatch):
+        """Test the grid answers 304 until a day in its range changes"""
+        from app.services import ReservationService
+        from app.slots import SlotLedger
+        versions = {}
+        
+        async def get_versions(resource_ids, first_date, last_date):
+            return dict(versions)
+        
+        async def get_availability_grid(resource_ids, start_date, end_date, token):
+            return [{"resource_id": resource_id, "days": []} for resource_id in resource_ids]
+        
+        monkeypatch.setattr(SlotLedger, "versions", get_versions)
+        monkeypatch.setattr(ReservationService, "get_availability_grid", get_availability_grid)
+        url = "/api/v1/availability?resource_ids=r1&start_date=2024-01-15&end_date=2024-01-16"
+        headers = {"Authorization": "Bearer token"}
+        
+        etag = client.get(url, headers=headers).headers["etag"]
+        response = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        
+        versions[("r1", "2024-01-16")] = 1
+        response = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+
+
+class TestAvailabilityGrid:
+    """Test batch availability grid"""
+    
+    def test_get_availability_grid_unauthorized(self):
+        """Test getting the availability grid without token"""
+        response = client.get(
+            "/api/v1/availability?resource_ids=123&start_date=2024-01-15&end_date=2024-01-16"
+        )
+        assert response.status_code == 403
+    
+    def test_availability_bitmap(self):
+        """Test sweep-line bitmap honors slot duration and overlapping bookings"""
+        from app.services import ReservationService
+        
+        # 08:00-12:00 in 30 minute slots, booked 08:30-09:15 and 10:00-10:30
+        bitmap = ReservationService._availability_bitmap(
+            480, 720, 30, [(600, 630), (510, 555)]
+        )
+        assert bitmap == "10010111"
+    
+    def test_availability_bitmap_drops_partial_slot(self):
+        """Test a trailing slot shorter than slot duration is not offered"""
+        from app.services import ReservationService
+        
+        assert ReservationService._availability_bitmap(480, 600, 90, []) == "1"
+    
+    def test_availability_bitmap_invalid_slot_duration(self):
+        """Test a non-positive slot duration falls back to the default instead of looping"""
+        from app.services import ReservationService
+        
+        assert ReservationService._availability_bitmap(480, 720, 0, []) == "1111"
+        assert ReservationService._availability_bitmap(480, 720, -30, [(480, 540)]) == "0111"
+    
+    def test_unknown_resource_is_marked_unavailable(self, monkeypatch):
+        """Test a resource without a schedule gets an error entry instead of open slots"""
+        import asyncio
+        from app import database
+        from app.services import RESOURCE_UNAVAILABLE, ReservationService
+        
+        class NoReservations:
+            async def __aiter__(self):
+                return
+                yield
+        
+        class FakeCollection:
+            def aggregate(self, pipeline):
+                return NoReservations()
+        
+        async def get_resource_info(resource_id, token):
+            if resource_id == "known":
+                return {
+                    "available_days": [0, 1, 2, 3, 4, 5, 6],
+                    "available_hours": {"start_time": "08:00", "end_time": "10:00"},
+                    "slot_duration_minutes": 60
+                }
+            return None
+        
+        monkeypatch.setattr(database.db, "db", {"reservations": FakeCollection()})
+        monkeypatch.setattr(ReservationService, "get_resource_info", get_resource_info)
+        known, unknown = asyncio.run(ReservationService.get_availability_grid(
+            ["known", "typo"], "2024-01-15", "2024-01-15", token="token"
+        ))
+        assert known["days"] == [{"date": "2024-01-15", "bitmap": "11"}]
+        assert "error" not in known
+        assert unknown["days"] == []
+        assert unknown["opening_time"] is None
+        assert unknown["error"] == RESOURCE_UNAVAILABLE
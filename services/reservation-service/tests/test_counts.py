@@ -0,0 +1,49 @@
+import asyncio
+from app.counts import CountCache
+
+
+class FakeCollection:
+    """Records which count method was used"""
+    
+    name = "reservations"
+    
+    def __init__(self):
+        self.calls = []
+    
+    async def count_documents(self, query):
+        self.calls.append(("count_documents", query))
+        return 3
+    
+    async def estimated_document_count(self):
+        self.calls.append(("estimated_document_count", None))
+        return 42
+
+
+class TestCountCache:
+    """Test cached listing totals"""
+    
+    def setup_method(self):
+        self.cache = CountCache(ttl_seconds=60, max_entries=10)
+        self.collection = FakeCollection()
+    
+    def count(self, query):
+        return asyncio.run(self.cache.count(self.collection, query))
+    
+    def test_unfiltered_uses_estimate(self):
+        """Test unfiltered totals come from collection metadata"""
+        assert self.count({}) == 42
+        assert self.collection.calls == [("estimated_document_count", None)]
+    
+    def test_filtered_total_is_cached_per_filter(self):
+        """Test repeated filters hit the cache and distinct filters do not"""
+        assert self.count({"status": "pending"}) == 3
+        assert self.count({"status": "pending"}) == 3
+        assert self.count({"status": "confirmed"}) == 3
+        assert len(self.collection.calls) == 2
+    
+    def test_invalidate_on_write(self):
+        """Test invalidation forces a fresh count"""
+        self.count({"status": "pending"})
+        self.cache.invalidate("reservations")
+        self.count({"status": "pending"})
+        assert len(self.collection.calls) == 2
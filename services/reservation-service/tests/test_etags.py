@@ -0,0 +1,53 @@
+from starlette.requests import Request
+from app.etags import VersionCounters, cache_headers, etag_matches, make_etag
+
+
+def make_request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+class TestVersionCounters:
+    """Test ETags derived from in-process write counters"""
+    
+    def setup_method(self):
+        self.versions = VersionCounters(window_seconds=0)
+    
+    def test_bump_changes_only_affected_tags(self):
+        """Test a write changes the tags covering its key and no others"""
+        before_r1 = self.versions.etag("r1", scope="2024-01-15")
+        before_r2 = self.versions.etag("r2", scope="2024-01-15")
+        self.versions.bump("r1")
+        assert self.versions.etag("r1", scope="2024-01-15") != before_r1
+        assert self.versions.etag("r2", scope="2024-01-15") == before_r2
+    
+    def test_scope_separates_callers(self):
+        """Test the same versions give different tags per user or date"""
+        assert self.versions.etag("reservations", scope="1") != self.versions.etag("reservations", scope="2")
+    
+    def test_window_rolls_tags_over(self, monkeypatch):
+        """Test tags change once the staleness window passes"""
+        versions = VersionCounters(window_seconds=30)
+        monkeypatch.setattr("app.etags.time.time", lambda: 1000.0)
+        first = versions.etag("r1")
+        monkeypatch.setattr("app.etags.time.time", lambda: 1031.0)
+        assert versions.etag("r1") != first
+
+
+class TestConditionalRequests:
+    """Test If-None-Match handling"""
+    
+    def test_etag_matches(self):
+        """Test weak comparison, lists and the * wildcard"""
+        etag = make_etag("r1", 3)
+        assert etag_matches(make_request(etag), etag)
+        assert etag_matches(make_request(etag.removeprefix("W/")), etag)
+        assert etag_matches(make_request(f'"other", {etag}'), etag)
+        assert etag_matches(make_request("*"), etag)
+        assert not etag_matches(make_request('"other"'), etag)
+        assert not etag_matches(make_request(), etag)
+    
+    def test_cache_headers(self):
+        """Test Cache-Control is only sent when configured"""
+        assert cache_headers('W/"x"', None) == {"ETag": 'W/"x"'}
+        assert cache_headers('W/"x"', "private, no-cache")["Cache-Control"] == "private, no-cache"
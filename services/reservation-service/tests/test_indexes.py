@@ -0,0 +1,218 @@
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+from app import database
+from app.config import get_settings
+from app.indexes import INDEXES, reconcile_indexes
+from app.interval_index import interval_index
+from app.pagination import next_cursor
+from app.resource_client import ResourceClient
+from app.services import ReservationService
+from app.slots import SlotLedger
+from app.timestamps import backfill_time_fields, time_fields
+
+settings = get_settings()
+MONGODB_URL = os.getenv("TEST_MONGODB_URL", settings.MONGODB_URL)
+# CI sets TEST_MONGODB_URL and must not silently skip these tests
+REQUIRE_MONGODB = "TEST_MONGODB_URL" in os.environ
+
+# Stages that mean the query was answered by an index
+INDEX_STAGES = {"IXSCAN", "EXPRESS_IXSCAN", "IDHACK", "EXPRESS_IDHACK", "COUNT_SCAN"}
+
+
+class QueryRecorder(monitoring.CommandListener):
+    """Record every find and aggregate the service sends"""
+    
+    def __init__(self):
+        self.commands = []
+        self.recording = False
+    
+    def started(self, event):
+        if self.recording and event.command_name in ("find", "aggregate"):
+            self.commands.append({
+                key: value for key, value in event.command.items()
+                if not key.startswith("$") and key not in ("lsid", "txnNumber")
+            })
+    
+    def succeeded(self, event):
+        pass
+    
+    def failed(self, event):
+        pass
+
+
+def plan_stages(explain):
+    """Collect the stage names of the winning plan(s) of an explain result"""
+    stages = []
+    if isinstance(explain, dict):
+        if "stage" in explain:
+            stages.append(explain["stage"])
+        for key, value in explain.items():
+            if key != "rejectedPlans":
+                stages.extend(plan_stages(value))
+    elif isinstance(explain, list):
+        for value in explain:
+            stages.extend(plan_stages(value))
+    return stages
+
+
+def scan_bounds(explain, field):
+    """Collect the index bounds on field of every index scan in the winning plan(s)"""
+    bounds = []
+    if isinstance(explain, dict):
+        if field in explain.get("indexBounds", {}):
+            bounds.extend(explain["indexBounds"][field])
+        for key, value in explain.items():
+            if key != "rejectedPlans":
+                bounds.extend(scan_bounds(value, field))
+    elif isinstance(explain, list):
+        for value in explain:
+            bounds.extend(scan_bounds(value, field))
+    return bounds
+
+
+def make_reservations():
+    today = datetime.utcnow().date()
+    reservations = []
+    for day in range(-3, 4):
+        date = (today + timedelta(days=day)).isoformat()
+        for hour, status in [(9, "confirmed"), (11, "pending"), (14, "cancelled")]:
+            for user_id, resource_id in [(1, "r1"), (2, "r2")]:
+                reservations.append({
+                    "user_id": user_id,
+                    "username": f"user{user_id}",
+                    "resource_id": resource_id,
+                    "date": date,
+                    "start_time": f"{hour:02d}:00",
+                    "end_time": f"{hour + 1:02d}:00",
+                    **time_fields(date, f"{hour:02d}:00", f"{hour + 1:02d}:00"),
+                    "status": status,
+                    "created_at": datetime.utcnow()
+                })
+    return reservations
+
+
+async def run_service_queries():
+    today = datetime.utcnow().date().isoformat()
+    
+    page, _ = await ReservationService.get_user_reservations(user_id=1, limit=5)
+    cursor = next_cursor(page, 5, ReservationService.SORT)
+    await ReservationService.get_user_reservations(user_id=1, limit=5, cursor=cursor)
+    await ReservationService.get_user_reservations(user_id=1, status="confirmed", upcoming_only=True)
+    await ReservationService.get_user_reservations(user_id=1, exact_total=True)
+    await ReservationService.get_user_reservations_count(user_id=1, status="pending")
+    
+    page, _ = await ReservationService.get_all_reservations(limit=5)
+    cursor = next_cursor(page, 5, ReservationService.ADMIN_SORT)
+    await ReservationService.get_all_reservations(limit=5, cursor=cursor)
+    await ReservationService.get_all_reservations(status="pending")
+    await ReservationService.get_all_reservations(date=today)
+    await ReservationService.get_all_reservations(status="pending", date=today, exact_total=True)
+    await ReservationService.get_all_reservations_count(status="confirmed")
+    
+    page = await ReservationService.get_resource_reservations(resource_id="r1", limit=5)
+    cursor = next_cursor(page, 5, ReservationService.SORT)
+    await ReservationService.get_resource_reservations(resource_id="r1", limit=5, cursor=cursor)
+    await ReservationService.get_resource_reservations(resource_id="r1", date=today)
+    await ReservationService.get_reservation_by_id(page[0]["id"])
+    
+    interval_index.clear()
+    await ReservationService._check_availability_indexed("r1", today, "09:30", "10:30")
+    enabled = settings.INTERVAL_INDEX_ENABLED
+    settings.INTERVAL_INDEX_ENABLED = False
+    try:
+        await ReservationService.check_availability("r1", today, "09:30", "10:30", str(ObjectId()))
+    finally:
+        settings.INTERVAL_INDEX_ENABLED = enabled
+    
+    for resource_id in ("r1", "r2"):
+        ResourceClient.cache.set(resource_id, {
+            "available_days": list(range(7)),
+            "available_hours": {"start_time": "08:00", "end_time": "18:00"},
+            "slot_duration_minutes": 60
+        })
+    await ReservationService.get_availability_grid(["r1", "r2"], today, today, token="")
+    await SlotLedger.versions(["r1", "r2"], today, today)
+    
+    await backfill_time_fields(database.db.db.reservations)
+
+
+async def explain_service_queries():
+    """
+    Run the service queries against a throwaway database and explain each.
+    
+    Returns None when MongoDB is not reachable.
+    """
+    recorder = QueryRecorder()
+    client = AsyncIOMotorClient(
+        MONGODB_URL, serverSelectionTimeoutMS=1000, event_listeners=[recorder]
+    )
+    try:
+        await client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        return None
+    
+    db = client[f"reservation_index_test_{uuid.uuid4().hex[:8]}"]
+    previous = database.db.client, database.db.db
+    database.db.client, database.db.db = client, db
+    try:
+        report = await reconcile_indexes(db)
+        await db.reservations.insert_many(make_reservations())
+        
+        recorder.recording = True
+        await run_service_queries()
+        recorder.recording = False
+        
+        plans = []
+        for command in recorder.commands:
+            explain = await db.command("explain", command, verbosity="queryPlanner")
+            plans.append((command, plan_stages(explain), scan_bounds(explain, "start_ts")))
+        return report, plans
+    finally:
+        database.db.client, database.db.db = previous
+        await client.drop_database(db.name)
+        client.close()
+
+
+class TestIndexes:
+    """Test every service query is served by an index"""
+    
+    def test_queries_use_indexes(self):
+        """Test explain() shows an index scan and no in-memory SORT for each query"""
+        result = asyncio.run(explain_service_queries())
+        if result is None:
+            if REQUIRE_MONGODB:
+                pytest.fail(f"MongoDB not available at {MONGODB_URL}")
+            pytest.skip(f"MongoDB not available at {MONGODB_URL}")
+        report, plans = result
+        
+        assert report["reservations"]["created"] == [
+            model.document["name"] for model in INDEXES["reservations"]
+        ]
+        assert plans
+        for command, stages, _ in plans:
+            assert INDEX_STAGES & set(stages), f"no index scan for {command}: {stages}"
+            assert "COLLSCAN" not in stages, f"collection scan for {command}"
+            assert "SORT" not in stages, f"in-memory sort for {command}"
+    
+    def test_start_ts_ranges_are_bounded(self):
+        """Test no query scans start_ts from the beginning of a resource's history"""
+        result = asyncio.run(explain_service_queries())
+        if result is None:
+            if REQUIRE_MONGODB:
+                pytest.fail(f"MongoDB not available at {MONGODB_URL}")
+            pytest.skip(f"MongoDB not available at {MONGODB_URL}")
+        _, plans = result
+        
+        bounded = [(command, bounds) for command, _, bounds in plans if bounds]
+        assert bounded
+        for command, bounds in bounded:
+            for bound in bounds:
+                assert "inf" not in bound and "Key" not in bound, f"open start_ts bound {bound} for {command}"
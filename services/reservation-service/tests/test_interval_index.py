@@ -0,0 +1,79 @@
+from bson import ObjectId
+from app.interval_index import IntervalIndex, time_to_minutes, minutes_to_time
+
+
+def make_reservation(start_time, end_time, reservation_id=None):
+    return {
+        "_id": reservation_id or ObjectId(),
+        "start_time": start_time,
+        "end_time": end_time
+    }
+
+
+class TestTimeConversion:
+    """Test HH:MM <-> minute conversion"""
+    
+    def test_round_trip(self):
+        """Test conversion in both directions"""
+        assert time_to_minutes("09:30") == 570
+        assert minutes_to_time(570) == "09:30"
+
+
+class TestIntervalIndex:
+    """Test in-memory overlap checks"""
+    
+    def setup_method(self):
+        self.index = IntervalIndex(ttl_seconds=60, max_entries=2)
+    
+    def test_overlap_checks(self):
+        """Test overlapping, touching and containing intervals"""
+        entry = self.index.populate("r1", "2024-01-15", [
+            make_reservation("09:00", "10:00"),
+            make_reservation("12:00", "14:00"),
+        ], self.index.version)
+        
+        assert entry.overlaps(time_to_minutes("09:30"), time_to_minutes("10:30"))
+        assert entry.overlaps(time_to_minutes("11:00"), time_to_minutes("15:00"))
+        assert entry.overlaps(time_to_minutes("12:30"), time_to_minutes("13:00"))
+        assert not entry.overlaps(time_to_minutes("10:00"), time_to_minutes("12:00"))
+        assert not entry.overlaps(time_to_minutes("14:00"), time_to_minutes("15:00"))
+    
+    def test_exclude_reservation(self):
+        """Test that a reservation does not conflict with itself"""
+        reservation_id = ObjectId()
+        entry = self.index.populate("r1", "2024-01-15", [
+            make_reservation("09:00", "10:00", reservation_id),
+        ], self.index.version)
+        
+        assert not entry.overlaps(540, 600, exclude_id=str(reservation_id))
+    
+    def test_write_through(self):
+        """Test add and remove keep a loaded entry coherent"""
+        self.index.populate("r1", "2024-01-15", [], self.index.version)
+        self.index.add("a", "r1", "2024-01-15", "09:00", "10:00")
+        assert self.index.get("r1", "2024-01-15").overlaps(540, 600)
+        
+        self.index.remove("a")
+        assert not self.index.get("r1", "2024-01-15").overlaps(540, 600)
+    
+    def test_racing_load_is_not_cached(self):
+        """Test that a load started before a write is not cached"""
+        version = self.index.version
+        self.index.remove("a")
+        self.index.populate("r1", "2024-01-15", [], version)
+        assert self.index.get("r1", "2024-01-15") is None
+    
+    def test_overlapping_documents_fall_back(self):
+        """Test legacy overlapping data is reported as not indexable"""
+        entry = self.index.populate("r1", "2024-01-15", [
+            make_reservation("09:00", "11:00"),
+            make_reservation("10:00", "12:00"),
+        ], self.index.version)
+        assert entry is None
+    
+    def test_lru_eviction(self):
+        """Test the index is bounded by max_entries"""
+        for date in ["2024-01-15", "2024-01-16", "2024-01-17"]:
+            self.index.populate("r1", date, [], self.index.version)
+        assert self.index.get("r1", "2024-01-15") is None
+        assert self.index.get("r1", "2024-01-17") is not None
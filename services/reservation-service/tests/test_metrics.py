@@ -0,0 +1,62 @@
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from app.main import app
+from app.metrics import UNMATCHED_ROUTE
+
+client = TestClient(app)
+
+
+def request_count(method, endpoint, status):
+    labels = {"method": method, "endpoint": endpoint, "status": str(status)}
+    return REGISTRY.get_sample_value("http_requests_total", labels) or 0
+
+
+class TestRouteLabels:
+    """Test request metrics are labelled by route template"""
+    
+    def test_path_parameters_share_one_series(self):
+        """Test requests for different ids are counted under the template"""
+        endpoint = "/api/v1/reservations/{reservation_id}"
+        before = request_count("GET", endpoint, 403)
+        client.get("/api/v1/reservations/65a000000000000000000001")
+        client.get("/api/v1/reservations/65a000000000000000000002")
+        assert request_count("GET", endpoint, 403) == before + 2
+        assert request_count("GET", "/api/v1/reservations/65a000000000000000000001", 403) == 0
+    
+    def test_unmatched_paths_share_one_series(self):
+        """Test unknown paths go to the unmatched bucket"""
+        before = request_count("GET", UNMATCHED_ROUTE, 404)
+        client.get("/no/such/path/1")
+        client.get("/no/such/path/2")
+        assert request_count("GET", UNMATCHED_ROUTE, 404) == before + 2
+    
+    def test_non_api_routes_keep_their_path(self):
+        """Test routes FastAPI does not wrap, like the docs, are still labelled"""
+        before = request_count("GET", "/openapi.json", 200)
+        client.get("/openapi.json")
+        assert request_count("GET", "/openapi.json", 200) == before + 1
+
+
+class TestMetricsMiddleware:
+    """Test the pure ASGI metrics middleware"""
+    
+    def test_records_sizes_and_first_byte(self):
+        """Test response size, time to first byte and in-flight tracking"""
+        labels = {"method": "GET", "endpoint": "/health"}
+        size_before = REGISTRY.get_sample_value("http_response_size_bytes_sum", labels) or 0
+        ttfb_before = REGISTRY.get_sample_value("http_time_to_first_byte_seconds_count", labels) or 0
+        
+        response = client.get("/health")
+        
+        size_after = REGISTRY.get_sample_value("http_response_size_bytes_sum", labels)
+        assert size_after - size_before == len(response.content)
+        assert REGISTRY.get_sample_value("http_time_to_first_byte_seconds_count", labels) == ttfb_before + 1
+        assert REGISTRY.get_sample_value("http_requests_in_flight") == 0
+    
+    def test_request_size_from_content_length(self):
+        """Test bodies rejected before being read are still sized"""
+        labels = {"method": "POST", "endpoint": "/api/v1/reservations"}
+        before = REGISTRY.get_sample_value("http_request_size_bytes_sum", labels) or 0
+        client.post("/api/v1/reservations", content=b'{"resource_id": "r1"}',
+                    headers={"Content-Type": "application/json"})
+        assert REGISTRY.get_sample_value("http_request_size_bytes_sum", labels) - before == 21
@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from prometheus_client import REGISTRY
+from app.mongo_monitoring import CommandMetrics, PoolMetrics
+
+ADDRESS = ("mongo-test", 27017)
+LABEL = "mongo-test:27017"
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def event(**fields):
+    return SimpleNamespace(address=ADDRESS, **fields)
+
+
+class TestCommandMetrics:
+    """Test command latencies are recorded by command name and outcome"""
+    
+    def test_succeeded_and_failed(self):
+        """Test both outcomes are observed in seconds"""
+        listener = CommandMetrics()
+        before_ok = sample("mongodb_command_duration_seconds_count", command="find", status="succeeded")
+        before_failed = sample("mongodb_command_duration_seconds_count", command="insert", status="failed")
+        before_sum = sample("mongodb_command_duration_seconds_sum", command="find", status="succeeded")
+        
+        listener.succeeded(event(command_name="find", duration_micros=2500))
+        listener.failed(event(command_name="insert", duration_micros=1000))
+        
+        assert sample("mongodb_command_duration_seconds_count", command="find", status="succeeded") == before_ok + 1
+        assert sample("mongodb_command_duration_seconds_count", command="insert", status="failed") == before_failed + 1
+        assert sample("mongodb_command_duration_seconds_sum", command="find", status="succeeded") == (
+            before_sum + 0.0025
+        )
+
+
+class TestPoolMetrics:
+    """Test pool size, usage and checkout wait tracking"""
+    
+    def test_checkout_lifecycle(self):
+        """Test a checkout moves from waiting to checked out and back"""
+        listener = PoolMetrics(max_pool_size=50)
+        listener.pool_created(event(options={}))
+        listener.connection_created(event(connection_id=1))
+        open_before = sample("mongodb_pool_open_connections", address=LABEL)
+        waits_before = sample("mongodb_pool_checkout_wait_seconds_count", address=LABEL)
+        
+        listener.connection_check_out_started(event())
+        assert sample("mongodb_pool_waiting_checkouts", address=LABEL) == 1
+        listener.connection_checked_out(event(connection_id=1))
+        assert sample("mongodb_pool_waiting_checkouts", address=LABEL) == 0
+        assert sample("mongodb_pool_checked_out_connections", address=LABEL) == 1
+        assert sample("mongodb_pool_checkout_wait_seconds_count", address=LABEL) == waits_before + 1
+        
+        listener.connection_checked_in(event(connection_id=1))
+        listener.connection_closed(event(connection_id=1, reason="idle"))
+        assert sample("mongodb_pool_checked_out_connections", address=LABEL) == 0
+        assert sample("mongodb_pool_open_connections", address=LABEL) == open_before - 1
+        assert sample("mongodb_pool_max_connections", address=LABEL) == 50
+    
+    def test_failed_checkout(self):
+        """Test a failed checkout is counted by reason and leaves the wait queue"""
+        listener = PoolMetrics(max_pool_size=50)
+        before = sample("mongodb_pool_checkout_failures_total", address=LABEL, reason="timeout")
+        waiting = sample("mongodb_pool_waiting_checkouts", address=LABEL)
+        
+        listener.connection_check_out_started(event())
+        listener.connection_check_out_failed(event(reason="timeout"))
+        
+        assert sample("mongodb_pool_checkout_failures_total", address=LABEL, reason="timeout") == before + 1
+        assert sample("mongodb_pool_waiting_checkouts", address=LABEL) == waiting
+    
+    def test_wait_is_timed_per_thread(self):
+        """Test concurrent checkouts from executor threads each get one wait sample"""
+        listener = PoolMetrics(max_pool_size=50)
+        before = sample("mongodb_pool_checkout_wait_seconds_count", address=LABEL)
+        
+        def checkout(_):
+            listener.connection_check_out_started(event())
+            listener.connection_checked_out(event(connection_id=2))
+            listener.connection_checked_in(event(connection_id=2))
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(checkout, range(20)))
+        
+        assert sample("mongodb_pool_checkout_wait_seconds_count", address=LABEL) == before + 20
+        assert sample("mongodb_pool_checked_out_connections", address=LABEL) == 0
@@ -0,0 +1,75 @@
+import pytest
+from bson import ObjectId
+from app.pagination import (
+    InvalidCursorError, decode_cursor, encode_cursor, keyset_query, next_cursor
+)
+
+ADMIN_SORT = [("date", -1), ("start_time", 1), ("_id", 1)]
+
+
+def matches(document, query):
+    """Evaluate the subset of MongoDB query operators keyset_query produces"""
+    for field, condition in query.items():
+        if field == "$or":
+            if not any(matches(document, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            if "$gt" in condition and not document[field] > condition["$gt"]:
+                return False
+            if "$lt" in condition and not document[field] < condition["$lt"]:
+                return False
+        elif document[field] != condition:
+            return False
+    return True
+
+
+def sort_documents(documents, sort):
+    ordered = list(documents)
+    for field, direction in reversed(sort):
+        ordered.sort(key=lambda d: d[field], reverse=direction == -1)
+    return ordered
+
+
+class TestCursorEncoding:
+    """Test opaque cursor encoding"""
+    
+    def test_round_trip(self):
+        """Test sort values survive encoding, with _id restored as ObjectId"""
+        object_id = ObjectId()
+        cursor = encode_cursor(["2024-01-15", "09:00", object_id])
+        assert decode_cursor(cursor, ADMIN_SORT) == ["2024-01-15", "09:00", object_id]
+    
+    @pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor(["2024-01-15"]), encode_cursor(["a", "b", "c"])])
+    def test_invalid_cursor(self, cursor):
+        """Test malformed or mismatched cursors are rejected"""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor, ADMIN_SORT)
+
+
+class TestKeysetPagination:
+    """Test keyset queries page through documents exactly once"""
+    
+    def test_pages_match_sorted_order(self):
+        """Test walking cursors yields the full sort order without gaps or repeats"""
+        documents = [
+            {"_id": ObjectId(), "date": date, "start_time": start_time}
+            for date in ["2024-01-14", "2024-01-15", "2024-01-16"]
+            for start_time in ["09:00", "10:00", "10:00", "11:00"]
+        ]
+        expected = sort_documents(documents, ADMIN_SORT)
+        
+        seen, cursor = [], None
+        while True:
+            query = keyset_query({}, ADMIN_SORT, decode_cursor(cursor, ADMIN_SORT)) if cursor else {}
+            page = [d for d in expected if matches(d, query)][:5]
+            seen.extend(page)
+            cursor = next_cursor([{**d, "id": str(d["_id"])} for d in page], 5, ADMIN_SORT)
+            if cursor is None:
+                break
+        
+        assert seen == expected
+    
+    def test_existing_or_is_preserved(self):
+        """Test a query that already uses $or is combined with $and"""
+        query = keyset_query({"$or": [{"status": "pending"}]}, ADMIN_SORT, ["2024-01-15", "09:00", ObjectId()])
+        assert set(query) == {"$and"}
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from fastapi.testclient import TestClient
+from app.main import app
+from app.readiness import OK, PENDING, ReadinessMonitor, readiness
+
+client = TestClient(app)
+
+
+def make_monitor(**overrides):
+    options = {"check_interval": 5.0, "check_timeout": 0.05, "max_loop_lag": 0.5, "max_in_flight": 200}
+    options.update(overrides)
+    return ReadinessMonitor(**options)
+
+
+async def healthy():
+    pass
+
+
+async def unreachable():
+    raise ConnectionError("connection refused")
+
+
+async def hanging():
+    await asyncio.sleep(10)
+
+
+class TestDependencyChecks:
+    """Test cached dependency checks"""
+    
+    def test_pending_until_checked(self):
+        """Test a registered dependency is not ready before its first check"""
+        monitor = make_monitor()
+        monitor.register("mongodb", healthy)
+        ready, details = monitor.status()
+        assert not ready
+        assert details["checks"] == {"mongodb": PENDING}
+        
+        asyncio.run(monitor.check_dependencies())
+        ready, details = monitor.status()
+        assert ready
+        assert details["checks"] == {"mongodb": OK}
+        assert details["reasons"] == []
+    
+    def test_critical_failure(self):
+        """Test a failing critical dependency makes the service not ready"""
+        monitor = make_monitor()
+        monitor.register("mongodb", unreachable)
+        asyncio.run(monitor.check_dependencies())
+        ready, details = monitor.status()
+        assert not ready
+        assert details["reasons"] == ["mongodb: connection refused"]
+    
+    def test_non_critical_failure_is_only_reported(self):
+        """Test a failing non-critical dependency is listed but keeps the service ready"""
+        monitor = make_monitor()
+        monitor.register("mongodb", healthy)
+        monitor.register("rabbitmq", unreachable, critical=False)
+        asyncio.run(monitor.check_dependencies())
+        ready, details = monitor.status()
+        assert ready
+        assert details["checks"]["rabbitmq"] == "connection refused"
+    
+    def test_check_timeout(self):
+        """Test a hanging check fails after the timeout"""
+        monitor = make_monitor()
+        monitor.register("mongodb", hanging)
+        start = time.perf_counter()
+        asyncio.run(monitor.check_dependencies())
+        assert time.perf_counter() - start < 1
+        ready, details = monitor.status()
+        assert not ready
+        assert "timed out" in details["checks"]["mongodb"]
+    
+    def test_status_does_not_run_checks(self):
+        """Test probes read the cached outcome instead of pinging"""
+        calls = []
+        
+        async def counted():
+            calls.append(1)
+        
+        monitor = make_monitor()
+        monitor.register("mongodb", counted)
+        asyncio.run(monitor.check_dependencies())
+        for _ in range(10):
+            monitor.status()
+        assert len(calls) == 1
+
+
+class TestLoadThresholds:
+    """Test shedding traffic when overloaded"""
+    
+    def test_event_loop_lag(self):
+        """Test a blocked event loop is measured and makes the service not ready"""
+        monitor = make_monitor(max_loop_lag=0.05)
+        
+        async def block_loop():
+            monitor.start()
+            await asyncio.sleep(0)
+            time.sleep(0.4)  # hold the loop past the lag sampler's wake-up
+            await asyncio.sleep(0.05)
+            await monitor.stop()
+        
+        asyncio.run(block_loop())
+        ready, details = monitor.status()
+        assert details["event_loop_lag_seconds"] > 0.05
+        assert not ready
+    
+    def test_requests_in_flight(self, monkeypatch):
+        """Test /ready returns 503 above the in-flight threshold"""
+        assert client.get("/ready").status_code == 200
+        
+        # The probe itself is in flight
+        monkeypatch.setattr(readiness, "max_in_flight", 0)
+        response = client.get("/ready")
+        assert response.status_code == 503
+        data = response.json()
+        assert data["status"] == "not_ready"
+        assert data["reasons"] == ["1 requests in flight"]
@@ -0,0 +1,80 @@
+import json
+from datetime import datetime
+import pytest
+from app.schemas import ReservationListResponse, ReservationResponse
+from app.serialization import InvalidFieldsError, RowEncoder, json_response
+from app.services import ReservationService
+
+ROWS = RowEncoder(ReservationResponse)
+
+
+def make_reservation(**overrides):
+    reservation = {
+        "id": "65a000000000000000000001",
+        "user_id": 1,
+        "username": "user1",
+        "resource_id": "r1",
+        "resource_name": "Room 1",
+        "date": "2024-01-15",
+        "start_time": "10:00",
+        "end_time": "11:00",
+        "purpose": None,
+        "notes": "bring a laptop",
+        "status": "confirmed",
+        "created_at": datetime(2024, 1, 10, 9, 30, 15, 123000),
+        "updated_at": None,
+        "cancelled_at": None,
+        "cancellation_reason": None
+    }
+    reservation.update(overrides)
+    return reservation
+
+
+class TestRowEncoder:
+    """Test list rows encoded without per-row Pydantic models"""
+    
+    def test_matches_pydantic_output(self):
+        """Test the orjson fast path produces the same JSON as the response model"""
+        rows = [make_reservation(), make_reservation(id="65a000000000000000000002", status="pending")]
+        expected = ReservationListResponse(reservations=rows, total=2).model_dump(mode="json")
+        
+        response = json_response({"reservations": ROWS.rows(rows, ROWS.fields), "total": 2, "next_cursor": None})
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == expected
+    
+    def test_missing_fields_are_null(self):
+        """Test fields absent from a document are emitted as null"""
+        row = make_reservation()
+        del row["cancellation_reason"]
+        assert ROWS.rows([row], ROWS.fields)[0]["cancellation_reason"] is None
+    
+    def test_missing_fields_use_defaults(self):
+        """Test fields absent from a document fall back to model and creation defaults"""
+        from typing import List
+        from pydantic import BaseModel
+        
+        class Row(BaseModel):
+            id: str
+            tags: List[str]
+            kind: str = "room"
+        
+        class RowCreate(BaseModel):
+            tags: List[str] = []
+        
+        rows = RowEncoder(Row, defaults=RowCreate)
+        assert rows.rows([{"id": "a"}], rows.fields) == [{"id": "a", "tags": [], "kind": "room"}]
+        assert rows.rows([{"id": "b", "tags": None}], ["tags"]) == [{"tags": None}]
+        assert RowEncoder(Row).rows([{"id": "c"}], ["tags"]) == [{"tags": None}]
+    
+    def test_select_fields(self):
+        """Test fields= keeps model order and always includes id"""
+        assert ROWS.select(None) == ROWS.fields
+        assert ROWS.select("start_time, date") == ["id", "date", "start_time"]
+        with pytest.raises(InvalidFieldsError):
+            ROWS.select("date,start_ts")
+    
+    def test_projection_includes_sort_keys(self):
+        """Test the projection fetches what next_cursor needs"""
+        projection = ROWS.projection(ROWS.select("status"), ReservationService.SORT)
+        assert projection == {"_id": 1, "status": 1, "date": 1, "start_time": 1}
+        assert "start_ts" not in ROWS.projection(ROWS.fields)
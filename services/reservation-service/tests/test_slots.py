@@ -0,0 +1,135 @@
+import asyncio
+import os
+import uuid
+import pytest
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
+from app import database
+from app.config import get_settings
+from app.indexes import reconcile_indexes
+from app.slots import SlotLedger
+
+settings = get_settings()
+MONGODB_URL = os.getenv("TEST_MONGODB_URL", settings.MONGODB_URL)
+# CI sets TEST_MONGODB_URL and must not silently skip these tests
+REQUIRE_MONGODB = "TEST_MONGODB_URL" in os.environ
+
+RESOURCE_ID = "65a0000000000000000000aa"
+DATE = "2030-01-07"
+
+
+def run_with_mongo(scenario):
+    """Run scenario() against a throwaway database, skipping without MongoDB"""
+    async def run():
+        client = AsyncIOMotorClient(MONGODB_URL, serverSelectionTimeoutMS=1000)
+        try:
+            await client.admin.command("ping")
+        except PyMongoError:
+            client.close()
+            return None
+        
+        db = client[f"reservation_slots_test_{uuid.uuid4().hex[:8]}"]
+        previous = database.db.client, database.db.db
+        database.db.client, database.db.db = client, db
+        try:
+            await reconcile_indexes(db)
+            return await scenario(db)
+        finally:
+            database.db.client, database.db.db = previous
+            await client.drop_database(db.name)
+            client.close()
+    
+    result = asyncio.run(run())
+    if result is None:
+        if REQUIRE_MONGODB:
+            pytest.fail(f"MongoDB not available at {MONGODB_URL}")
+        pytest.skip(f"MongoDB not available at {MONGODB_URL}")
+    return result
+
+
+async def ledger_intervals(db):
+    ledger = await db[SlotLedger.COLLECTION].find_one({"resource_id": RESOURCE_ID, "date": DATE})
+    return sorted((i["start"], i["end"], i["reservation_id"], "claimed_at" in i) for i in ledger["intervals"])
+
+
+class TestSlotLedger:
+    """Test the slot ledger accounts for existing bookings"""
+    
+    def test_seed_intervals(self):
+        """Test reservations become ledger intervals in minutes"""
+        reservation_id = ObjectId()
+        reservations = [{"_id": reservation_id, "start_time": "09:00", "end_time": "10:30"}]
+        assert SlotLedger.intervals(reservations) == [
+            {"start": 540, "end": 630, "reservation_id": str(reservation_id)}
+        ]
+    
+    def test_legacy_booking_blocks_overlapping_claim(self):
+        """Test a booking made before the ledger existed is seeded into it"""
+        async def scenario(db):
+            # Booked directly, as before the ledger existed
+            await db.reservations.insert_one({
+                "resource_id": RESOURCE_ID, "date": DATE,
+                "start_time": "09:00", "end_time": "10:00", "status": "confirmed"
+            })
+            overlapping = await SlotLedger.claim(RESOURCE_ID, DATE, "09:30", "10:30", str(ObjectId()))
+            free = await SlotLedger.claim(RESOURCE_ID, DATE, "10:00", "11:00", str(ObjectId()))
+            return overlapping, free
+        
+        overlapping, free = run_with_mongo(scenario)
+        assert overlapping is False
+        assert free is True
+    
+    def test_concurrent_claims_book_once(self):
+        """Test concurrent overlapping claims on an empty day succeed exactly once"""
+        async def scenario(db):
+            return await asyncio.gather(*(
+                SlotLedger.claim(RESOURCE_ID, DATE, "09:00", "10:00", str(ObjectId()))
+                for _ in range(20)
+            ))
+        
+        results = run_with_mongo(scenario)
+        assert results.count(True) == 1
+    
+    def test_sweep_drops_orphan_claims(self):
+        """Test a claim whose reservation was never written frees its slot"""
+        booked, orphan = ObjectId(), ObjectId()
+        
+        async def scenario(db):
+            await SlotLedger.claim(RESOURCE_ID, DATE, "09:00", "10:00", str(booked))
+            await db.reservations.insert_one({
+                "_id": booked, "resource_id": RESOURCE_ID, "date": DATE,
+                "start_time": "09:00", "end_time": "10:00", "status": "confirmed"
+            })
+            # The request died between the claim and the insert
+            await SlotLedger.claim(RESOURCE_ID, DATE, "11:00", "12:00", str(orphan))
+            
+            assert await SlotLedger.sweep(grace_seconds=60) == 0
+            resynced = await SlotLedger.sweep(grace_seconds=0)
+            intervals = await ledger_intervals(db)
+            rebooked = await SlotLedger.claim(RESOURCE_ID, DATE, "11:00", "12:00", str(ObjectId()))
+            return resynced, intervals, rebooked
+        
+        resynced, intervals, rebooked = run_with_mongo(scenario)
+        assert resynced == 2
+        # The real booking is kept and settled, the orphan is gone
+        assert intervals == [(540, 600, str(booked), False)]
+        assert rebooked is True
+    
+    def test_touch_bumps_day_version(self):
+        """Test writes bump only their day's version and seed the day first"""
+        async def scenario(db):
+            await db.reservations.insert_one({
+                "resource_id": RESOURCE_ID, "date": DATE,
+                "start_time": "09:00", "end_time": "10:00", "status": "confirmed"
+            })
+            before = await SlotLedger.versions([RESOURCE_ID], DATE, DATE)
+            await SlotLedger.touch(RESOURCE_ID, DATE)
+            await SlotLedger.touch(RESOURCE_ID, DATE)
+            after = await SlotLedger.versions([RESOURCE_ID], "2030-01-01", "2030-01-31")
+            return before, after, await ledger_intervals(db)
+        
+        before, after, intervals = run_with_mongo(scenario)
+        assert before == {}
+        assert after == {(RESOURCE_ID, DATE): 2}
+        assert [(start, end) for start, end, _, _ in intervals] == [(540, 600)]
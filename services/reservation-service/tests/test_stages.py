@@ -0,0 +1,79 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from app.stages import ServerTimingMiddleware, server_timing, stage
+
+
+def stage_count(name):
+    labels = {"stage": name}
+    return REGISTRY.get_sample_value("reservation_stage_duration_seconds_count", labels) or 0
+
+
+def make_app():
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware)
+    
+    @app.get("/timed")
+    async def timed():
+        with stage("test_lookup"):
+            pass
+        with stage("test_write"):
+            pass
+        return {"ok": True}
+    
+    @app.get("/untimed")
+    async def untimed():
+        return {"ok": True}
+    
+    return app
+
+
+class TestStage:
+    """Test stage timing"""
+    
+    def test_observes_histogram(self):
+        """Test every stage is recorded in the histogram by name"""
+        before = stage_count("test_block")
+        with stage("test_block"):
+            pass
+        assert stage_count("test_block") == before + 1
+    
+    def test_observes_on_error(self):
+        """Test a stage that raises is still recorded"""
+        before = stage_count("test_failing")
+        try:
+            with stage("test_failing"):
+                raise ValueError("boom")
+        except ValueError:
+            pass
+        assert stage_count("test_failing") == before + 1
+    
+    def test_server_timing_format(self):
+        """Test durations are rendered in milliseconds"""
+        assert server_timing([("insert_one", 0.0125), ("claim_slot", 0.002)]) == (
+            "insert_one;dur=12.5, claim_slot;dur=2.0"
+        )
+
+
+class TestServerTimingMiddleware:
+    """Test the Server-Timing header"""
+    
+    def test_lists_request_stages(self):
+        """Test the stages timed by a request are sent in order"""
+        response = TestClient(make_app()).get("/timed")
+        assert response.status_code == 200
+        names = [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+        assert names == ["test_lookup", "test_write"]
+    
+    def test_no_header_without_stages(self):
+        """Test requests that timed nothing get no header"""
+        response = TestClient(make_app()).get("/untimed")
+        assert response.status_code == 200
+        assert "server-timing" not in response.headers
+    
+    def test_stages_do_not_leak_between_requests(self):
+        """Test each request only reports its own stages"""
+        client = TestClient(make_app())
+        client.get("/timed")
+        response = client.get("/timed")
+        assert response.headers["server-timing"].count("test_lookup") == 1
@@ -0,0 +1,59 @@
+import asyncio
+from types import SimpleNamespace
+from app.timestamps import MINUTES_PER_DAY, backfill_time_fields, day_range, epoch_minutes, time_fields
+
+
+class FakeReservations:
+    """Documents missing the time fields, some inserted while backfilling"""
+    
+    def __init__(self, missing, arriving=()):
+        self.missing = missing
+        self.arriving = list(arriving)
+        self.probes = 0
+        self.updates = 0
+    
+    async def find_one(self, query, projection=None):
+        self.probes += 1
+        return {"_id": 1} if self.missing else None
+    
+    async def update_many(self, query, pipeline):
+        self.updates += 1
+        modified, self.missing = self.missing, self.arriving.pop(0) if self.arriving else 0
+        return SimpleNamespace(modified_count=modified)
+
+
+class TestTimestamps:
+    """Test epoch-minute time fields"""
+    
+    def test_epoch_minutes(self):
+        """Test dates and times convert to minutes since the Unix epoch"""
+        assert epoch_minutes("1970-01-01", "00:00") == 0
+        assert epoch_minutes("1970-01-02", "01:30") == MINUTES_PER_DAY + 90
+        assert epoch_minutes("2024-01-15", "09:00") == 28421280 + 540
+    
+    def test_time_fields_compare_across_midnight(self):
+        """Test numeric fields order correctly across days, unlike HH:MM strings"""
+        late = time_fields("2024-01-15", "23:00", "23:59")
+        early = time_fields("2024-01-16", "00:30", "01:00")
+        assert late["end_ts"] < early["start_ts"]
+    
+    def test_day_range_is_half_open(self):
+        """Test a date range covers whole days"""
+        first, last = day_range("2024-01-15", "2024-01-16")
+        assert first == epoch_minutes("2024-01-15", "00:00")
+        assert last == epoch_minutes("2024-01-17", "00:00")
+    
+    def test_backfill_skips_update_when_nothing_missing(self):
+        """Test a backfilled collection costs one probe and no update"""
+        collection = FakeReservations(missing=0)
+        assert asyncio.run(backfill_time_fields(collection)) == 0
+        assert (collection.probes, collection.updates) == (1, 0)
+    
+    def test_backfill_repeats_until_nothing_missing(self):
+        """Test documents inserted during the backfill by older replicas are covered"""
+        collection = FakeReservations(missing=3, arriving=[2])
+        assert asyncio.run(backfill_time_fields(collection)) == 5
+        assert collection.updates == 2
+        assert collection.missing == 0
+        assert asyncio.run(backfill_time_fields(collection)) == 0
+        assert collection.updates == 2
@@ -0,0 +1,179 @@
+import asyncio
+import bisect
+import time
+from typing import Dict, List, Optional, Set
+from prometheus_client import Counter, Gauge
+from app.config import get_settings
+
+settings = get_settings()
+
+CATALOG_SIZE = Gauge(
+    'resource_catalog_size',
+    'Resources held in the in-memory catalog'
+)
+CATALOG_RELOADS = Counter(
+    'resource_catalog_reloads_total',
+    'Full reloads of the in-memory catalog from MongoDB'
+)
+
+# Fields listings filter on, each with a secondary index
+INDEXED_FIELDS = ("resource_type", "status", "building")
+
+
+class ResourceCatalog:
+    """
+    In-memory copy of the whole resources collection.
+    
+    The catalog is small and read-mostly, so listings filtered by
+    type/status/building are answered from secondary indexes instead of
+    MongoDB. Writes through ResourceService update it immediately; writes
+    by other replicas arrive through the optional change stream or, at the
+    latest, with the next full reload after CATALOG_TTL_SECONDS.
+    Documents are stored serialized (with `id`) and shared between
+    callers, so they must not be mutated.
+    """
+    
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._resources: Dict[str, dict] = {}
+        # ObjectId hex strings sort like the ObjectIds, i.e. like SORT
+        self._ids: List[str] = []
+        self._indexes: Dict[str, Dict[object, Set[str]]] = {field: {} for field in INDEXED_FIELDS}
+        self._loaded_at: Optional[float] = None
+        # Bumped on every change, so equal versions mean equal contents
+        self.version = 0
+        # Writes made while a reload is reading, replayed onto its snapshot
+        self._pending: Optional[list] = None
+        self._lock = asyncio.Lock()
+    
+    @property
+    def fresh(self) -> bool:
+        """Whether the catalog was loaded less than ttl_seconds ago"""
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+    
+    async def ensure_loaded(self, collection) -> None:
+        """Reload from collection if never loaded or older than the TTL"""
+        if self.fresh:
+            return
+        async with self._lock:
+            if not self.fresh:
+                await self.load(collection)
+    
+    async def load(self, collection) -> None:
+        """Replace the catalog with the current contents of collection"""
+        self._pending = []
+        try:
+            documents = await collection.find({}).to_list(length=None)
+        except Exception:
+            self._pending = None
+            raise
+        
+        pending, self._pending = self._pending, None
+        self._resources, self._ids = {}, []
+        self._indexes = {field: {} for field in INDEXED_FIELDS}
+        for document in documents:
+            document["id"] = str(document.pop("_id"))
+            self._put(document)
+        for operation, value in pending:
+            if operation == "put":
+                self._put(value)
+            else:
+                self._remove(value)
+        self._loaded_at = time.monotonic()
+        self.version += 1
+        CATALOG_RELOADS.inc()
+        CATALOG_SIZE.set(len(self._resources))
+    
+    def put(self, resource: dict) -> None:
+        """Insert or replace a serialized resource after a write"""
+        if self._pending is not None:
+            self._pending.append(("put", resource))
+        self._put(resource)
+        CATALOG_SIZE.set(len(self._resources))
+    
+    def remove(self, resource_id: str) -> None:
+        """Drop a resource after it was deleted"""
+        if self._pending is not None:
+            self._pending.append(("remove", resource_id))
+        self._remove(resource_id)
+        CATALOG_SIZE.set(len(self._resources))
+    
+    def get(self, resource_id: str) -> Optional[dict]:
+        """Return the resource with resource_id, or None if not in the catalog"""
+        return self._resources.get(resource_id)
+    
+    def query(
+        self,
+        resource_type: Optional[str] = None,
+        status: Optional[str] = None,
+        building: Optional[str] = None
+    ) -> List[dict]:
+        """Resources matching every given filter, in SORT (_id) order"""
+        candidates = None
+        for field, value in (("resource_type", resource_type), ("status", status), ("building", building)):
+            if value is None:
+                continue
+            ids = self._indexes[field].get(value, set())
+            candidates = ids if candidates is None else candidates & ids
+        ids = self._ids if candidates is None else sorted(candidates)
+        return [self._resources[resource_id] for resource_id in ids]
+    
+    def clear(self) -> None:
+        """Forget everything; the next read reloads"""
+        self._resources, self._ids = {}, []
+        self._indexes = {field: {} for field in INDEXED_FIELDS}
+        self._loaded_at = None
+        self.version += 1
+        CATALOG_SIZE.set(0)
+    
+    def _put(self, resource: dict) -> None:
+        resource_id = resource["id"]
+        if resource_id in self._resources:
+            self._unindex(self._resources[resource_id])
+        else:
+            bisect.insort(self._ids, resource_id)
+        self._resources[resource_id] = resource
+        self.version += 1
+        for field in INDEXED_FIELDS:
+            self._indexes[field].setdefault(resource.get(field), set()).add(resource_id)
+    
+    def _remove(self, resource_id: str) -> None:
+        resource = self._resources.pop(resource_id, None)
+        if resource is None:
+            return
+        self._unindex(resource)
+        self.version += 1
+        del self._ids[bisect.bisect_left(self._ids, resource_id)]
+    
+    def _unindex(self, resource: dict) -> None:
+        for field in INDEXED_FIELDS:
+            ids = self._indexes[field].get(resource.get(field))
+            if ids is not None:
+                ids.discard(resource["id"])
+                if not ids:
+                    del self._indexes[field][resource.get(field)]
+
+
+resource_catalog = ResourceCatalog(ttl_seconds=settings.CATALOG_TTL_SECONDS)
+
+
+async def watch_resource_changes(collection) -> None:
+    """
+    Apply changes from a MongoDB change stream to the catalog.
+    
+    Keeps the catalog coherent with writes made by other replicas. Requires
+    MongoDB to run as a replica set; on a standalone server the stream
+    fails to open and the catalog relies on write-through plus TTL.
+    """
+    try:
+        async with collection.watch(full_document="updateLookup") as stream:
+            print("Watching resource changes for the catalog")
+            async for change in stream:
+                document = change.get("fullDocument")
+                if document:
+                    document["id"] = str(document.pop("_id"))
+                    resource_catalog.put(document)
+                else:
+                    resource_catalog.remove(str(change["documentKey"]["_id"]))
+    except Exception as e:
+        print(f"Resource change stream unavailable: {e}")
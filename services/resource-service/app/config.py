@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from typing import Dict
 from functools import lru_cache
 
 
@@ -11,13 +12,49 @@ class Settings(BaseSettings):
     # MongoDB
     MONGODB_URL: str = "mongodb://mongodb:27017"
     MONGODB_DB: str = "resourcedb"
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 5  # kept open so bursts skip the connection handshake
+    MONGODB_MAX_IDLE_SECONDS: float = 300.0  # idle connections above the minimum are closed
+    MONGODB_WAIT_QUEUE_TIMEOUT_SECONDS: float = 10.0  # fail instead of queueing forever, 0 waits
+    MONGODB_COMPRESSORS: str = ""  # e.g. "zstd,zlib"; zstd and snappy need their python packages
+    # List endpoints may read from secondaries, e.g. "secondaryPreferred";
+    # pages can then lag the primary by the replication delay
+    MONGODB_LIST_READ_PREFERENCE: str = "primary"
+    MONGODB_COMMAND_METRICS: bool = True
     
     # JWT Settings (for token validation)
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     
+    # Cached listing totals
+    COUNT_CACHE_TTL_SECONDS: float = 10.0
+    COUNT_CACHE_MAX_ENTRIES: int = 1000
+    
+    # In-memory resource catalog serving listings; lookups by id read MongoDB
+    CATALOG_ENABLED: bool = True
+    CATALOG_TTL_SECONDS: float = 60.0
+    CATALOG_CHANGE_STREAM: bool = False  # Requires a replica set
+    
+    # Cache-Control per read route (route function name -> header value);
+    # ETags are sent regardless so clients can revalidate
+    CACHE_CONTROL: Dict[str, str] = {
+        "get_resources": "public, no-cache",
+        "get_available_resources": "public, no-cache",
+        "search_resources": "public, no-cache",
+        "get_resource": "public, no-cache",
+        "get_resource_types": "public, max-age=3600",
+    }
+    
     # Service URLs
     USER_SERVICE_URL: str = "http://user-service:8000"
+    RESERVATION_SERVICE_URL: str = "http://reservation-service:8002"
+    
+    # Readiness probe: dependencies are checked in the background, and the
+    # service reports not ready above these load thresholds
+    READY_CHECK_INTERVAL_SECONDS: float = 5.0
+    READY_CHECK_TIMEOUT_SECONDS: float = 2.0
+    READY_MAX_LOOP_LAG_SECONDS: float = 0.5
+    READY_MAX_IN_FLIGHT: int = 200
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,101 @@
+from typing import Dict, List, Optional, Tuple
+from bson import json_util
+from prometheus_client import Counter
+from app.cache import TTLCache
+from app.config import get_settings
+
+settings = get_settings()
+
+COUNT_REQUESTS = Counter(
+    'list_count_requests_total',
+    'Listing totals by how they were obtained',
+    ['collection', 'source']
+)
+
+
+class CountCache:
+    """
+    Short-lived cache of listing totals per collection and filter.
+    
+    Unfiltered totals come from collection metadata
+    (estimated_document_count) instead of scanning; filtered totals run
+    count_documents once per COUNT_CACHE_TTL_SECONDS. Writes through this
+    service invalidate a collection's totals, other replicas catch up
+    within the TTL.
+    """
+    
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._caches: Dict[str, TTLCache] = {}
+    
+    async def count(self, collection, query: dict) -> int:
+        """Return the number of documents matching query"""
+        cache = self._cache(collection.name)
+        key = json_util.dumps(query, sort_keys=True)
+        total = cache.get(key)
+        if total is not None:
+            COUNT_REQUESTS.labels(collection=collection.name, source="cache").inc()
+            return total
+        
+        if query:
+            total = await collection.count_documents(query)
+            COUNT_REQUESTS.labels(collection=collection.name, source="count").inc()
+        else:
+            total = await collection.estimated_document_count()
+            COUNT_REQUESTS.labels(collection=collection.name, source="estimate").inc()
+        cache.set(key, total)
+        return total
+    
+    def invalidate(self, collection_name: str) -> None:
+        """Drop all cached totals of a collection after a write"""
+        cache = self._caches.get(collection_name)
+        if cache is not None:
+            cache.clear()
+    
+    def _cache(self, collection_name: str) -> TTLCache:
+        cache = self._caches.get(collection_name)
+        if cache is None:
+            cache = self._caches[collection_name] = TTLCache(self.ttl_seconds, self.max_entries)
+        return cache
+
+
+count_cache = CountCache(
+    ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS,
+    max_entries=settings.COUNT_CACHE_MAX_ENTRIES
+)
+
+
+async def find_with_total(
+    collection,
+    query: dict,
+    sort: List[Tuple[str, int]],
+    skip: int,
+    limit: int,
+    after: Optional[dict] = None,
+    projection: Optional[dict] = None
+) -> Tuple[List[dict], int]:
+    """
+    Fetch one page and the exact total of query in a single $facet round trip.
+    
+    `after` further restricts the page (a keyset filter) without affecting
+    the total and `projection` trims the returned documents. Used when
+    callers need a total that is exact right now rather than cached.
+    """
+    # Sorting before $facet lets the query layer walk an index in order
+    page = [{"$match": after}] if after else []
+    if skip:
+        page.append({"$skip": skip})
+    page.append({"$limit": limit})
+    if projection:
+        page.append({"$project": projection})
+    pipeline = [
+        {"$match": query},
+        {"$sort": dict(sort)},
+        {"$facet": {"items": page, "total": [{"$count": "count"}]}}
+    ]
+    result = await collection.aggregate(pipeline).to_list(length=1)
+    COUNT_REQUESTS.labels(collection=collection.name, source="facet").inc()
+    facet = result[0] if result else {"items": [], "total": []}
+    total = facet["total"][0]["count"] if facet["total"] else 0
+    return facet["items"], total
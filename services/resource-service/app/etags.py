@@ -0,0 +1,37 @@
+import hashlib
+import secrets
+from typing import Dict, Optional
+from fastapi import Request, Response
+# Tells this process's catalog versions apart from another replica's
+BOOT_ID = secrets.token_hex(4)
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag derived from parts"""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match names etag (weak comparison) or is *"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tag = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == tag for candidate in header.split(","))
+
+
+def cache_headers(etag: Optional[str], cache_control: Optional[str]) -> Dict[str, str]:
+    """ETag and Cache-Control headers of a read response, each when available"""
+    headers = {"ETag": etag} if etag else {}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return headers
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    """Empty 304 response carrying the validators"""
+    return Response(status_code=304, headers=headers)
+
@@ -0,0 +1,81 @@
+from typing import Dict, List
+from pymongo import ASCENDING, TEXT, IndexModel
+
+TEXT_INDEX = "resources_text"
+
+# Indexes per collection, each declared next to the queries it serves
+INDEXES: Dict[str, List[IndexModel]] = {
+    "resources": [
+        # search_resources: one weighted text index over every searchable
+        # field, so a name match ranks above an amenity or description match
+        IndexModel(
+            [
+                ("name", TEXT), ("description", TEXT), ("location", TEXT),
+                ("building", TEXT), ("amenities", TEXT)
+            ],
+            name=TEXT_INDEX,
+            weights={"name": 10, "amenities": 5, "building": 3, "location": 3, "description": 1},
+            default_language="english"
+        ),
+        # Listing filters
+        IndexModel([("resource_type", ASCENDING)]),
+        IndexModel([("location", ASCENDING)]),
+        IndexModel([("status", ASCENDING)]),
+        IndexModel([("building", ASCENDING)]),
+        IndexModel([("capacity", ASCENDING)]),
+    ],
+}
+
+# Indexes replaced by a declared one. A collection may only have a single
+# text index, so the old name-only index must go before TEXT_INDEX is built.
+SUPERSEDED: Dict[str, List[str]] = {
+    "resources": ["name_text"],
+}
+
+
+async def reconcile_indexes(database) -> Dict[str, dict]:
+    """
+    Drop superseded indexes, create missing declared ones and report the rest.
+    
+    Only indexes listed in SUPERSEDED are dropped. `$indexStats` counters
+    reset on server restart, so an index is only reported as unused for review.
+    Returns {collection: {"dropped": [...], "created": [...], "undeclared": [...], "unused": [...]}}.
+    """
+    report = {}
+    for collection_name, models in INDEXES.items():
+        collection = database[collection_name]
+        declared = {model.document["name"] for model in models}
+        existing = await collection.index_information()
+        
+        dropped = [name for name in SUPERSEDED.get(collection_name, []) if name in existing]
+        for name in dropped:
+            await collection.drop_index(name)
+        
+        missing = [model for model in models if model.document["name"] not in existing]
+        if missing:
+            await collection.create_indexes(missing)
+        
+        created = [model.document["name"] for model in missing]
+        undeclared, unused = [], []
+        try:
+            async for stats in collection.aggregate([{"$indexStats": {}}]):
+                name = stats["name"]
+                if name == "_id_":
+                    continue
+                if name not in declared:
+                    undeclared.append(name)
+                if stats["accesses"]["ops"] == 0 and name not in created:
+                    unused.append(name)
+        except Exception as e:
+            print(f"Index usage stats unavailable for {collection_name}: {e}")
+        
+        report[collection_name] = {
+            "dropped": dropped,
+            "created": created,
+            "undeclared": sorted(undeclared),
+            "unused": sorted(unused)
+        }
+        for key, names in report[collection_name].items():
+            if names:
+                print(f"Indexes {key} on {collection_name}: {', '.join(names)}")
+    return report
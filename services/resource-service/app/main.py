@@ -1,27 +1,18 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
-from fastapi.responses import Response
-import time
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from fastapi.responses import JSONResponse, Response
+import asyncio
 from app.config import get_settings
-from app.database import connect_to_mongo, close_mongo_connection
+from app.metrics import MetricsMiddleware
+from app.database import connect_to_mongo, close_mongo_connection, get_database, ping_mongo
+from app.catalog import resource_catalog, watch_resource_changes
+from app.readiness import readiness
 from app.routes import router
 
 settings = get_settings()
 
-# Prometheus metrics
-REQUEST_COUNT = Counter(
-    'http_requests_total',
-    'Total HTTP requests',
-    ['method', 'endpoint', 'status']
-)
-REQUEST_LATENCY = Histogram(
-    'http_request_duration_seconds',
-    'HTTP request latency',
-    ['method', 'endpoint']
-)
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -29,9 +20,25 @@ async def lifespan(app: FastAPI):
     # Startup
     print("Starting Resource Service...")
     await connect_to_mongo()
+    watcher_task = None
+    if settings.CATALOG_ENABLED:
+        await resource_catalog.load(get_database().resources)
+        if settings.CATALOG_CHANGE_STREAM:
+            watcher_task = asyncio.create_task(
+                watch_resource_changes(get_database().resources)
+            )
+    readiness.register("mongodb", ping_mongo)
+    readiness.start()
     yield
     # Shutdown
     print("Shutting down Resource Service...")
+    await readiness.stop()
+    if watcher_task:
+        watcher_task.cancel()
+        try:
+            await watcher_task
+        except asyncio.CancelledError:
+            pass
     await close_mongo_connection()
 
 
@@ -52,24 +59,8 @@ app.add_middleware(
 )
 
 
-# Metrics middleware
-@app.middleware("http")
-async def metrics_middleware(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    duration = time.time() - start_time
-    
-    REQUEST_COUNT.labels(
-        method=request.method,
-        endpoint=request.url.path,
-        status=response.status_code
-    ).inc()
-    REQUEST_LATENCY.labels(
-        method=request.method,
-        endpoint=request.url.path
-    ).observe(duration)
-    
-    return response
+# Metrics middleware (pure ASGI, outermost so it also times CORS handling)
+app.add_middleware(MetricsMiddleware)
 
 
 # Include routes
@@ -85,8 +76,12 @@ async def health_check():
 
 @app.get("/ready")
 async def readiness_check():
-    """Readiness check endpoint for Kubernetes"""
-    return {"status": "ready", "service": "resource-service"}
+    """Readiness check endpoint for Kubernetes, from cached dependency checks and current load"""
+    ready, details = readiness.status()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "service": "resource-service", **details}
+    )
 
 
 @app.get("/metrics")
@@ -0,0 +1,130 @@
+# MongoDB driver metrics shared by the Mongo-backed services; keep the copies identical.
+import threading
+import time
+from pymongo import monitoring
+from prometheus_client import Counter, Gauge, Histogram
+
+# Driver round trips are mostly sub-millisecond to tens of milliseconds
+COMMAND_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+MONGO_COMMAND_LATENCY = Histogram(
+    'mongodb_command_duration_seconds',
+    'MongoDB command round trip time',
+    ['command', 'status'],
+    buckets=COMMAND_BUCKETS
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    'mongodb_pool_checkout_wait_seconds',
+    'Time spent waiting for a pooled connection',
+    ['address'],
+    buckets=COMMAND_BUCKETS
+)
+POOL_CHECKOUT_FAILURES = Counter(
+    'mongodb_pool_checkout_failures_total',
+    'Connection checkouts that failed',
+    ['address', 'reason']
+)
+POOL_OPEN = Gauge(
+    'mongodb_pool_open_connections',
+    'Connections open in the pool',
+    ['address']
+)
+POOL_CHECKED_OUT = Gauge(
+    'mongodb_pool_checked_out_connections',
+    'Connections currently in use',
+    ['address']
+)
+POOL_WAITING = Gauge(
+    'mongodb_pool_waiting_checkouts',
+    'Operations waiting for a connection',
+    ['address']
+)
+POOL_MAX = Gauge(
+    'mongodb_pool_max_connections',
+    'Configured maximum pool size',
+    ['address']
+)
+
+
+def _address(address) -> str:
+    host, port = address
+    return f"{host}:{port}"
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Records the latency of every command the driver sends, by command name"""
+    
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+    
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        MONGO_COMMAND_LATENCY.labels(command=event.command_name, status="succeeded").observe(
+            event.duration_micros / 1e6
+        )
+    
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        MONGO_COMMAND_LATENCY.labels(command=event.command_name, status="failed").observe(
+            event.duration_micros / 1e6
+        )
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Tracks pool size, connections in use, waiting operations and checkout
+    wait time.
+    
+    checked_out / max close to 1 with a growing wait queue means the pool
+    is saturated. Motor runs each operation in one executor thread and the
+    driver publishes a checkout's start and end from it, so the start time
+    is kept per thread.
+    """
+    
+    def __init__(self, max_pool_size: int):
+        self.max_pool_size = max_pool_size
+        self._checkout = threading.local()
+    
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        POOL_MAX.labels(address=_address(event.address)).set(self.max_pool_size)
+    
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+    
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        pass
+    
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        POOL_MAX.labels(address=_address(event.address)).set(0)
+    
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        POOL_OPEN.labels(address=_address(event.address)).inc()
+    
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+    
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        POOL_OPEN.labels(address=_address(event.address)).dec()
+    
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        POOL_WAITING.labels(address=_address(event.address)).inc()
+        self._checkout.started = time.perf_counter()
+    
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        address = _address(event.address)
+        POOL_WAITING.labels(address=address).dec()
+        POOL_CHECKOUT_FAILURES.labels(address=address, reason=event.reason).inc()
+        self._observe_wait(address)
+    
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        address = _address(event.address)
+        POOL_WAITING.labels(address=address).dec()
+        POOL_CHECKED_OUT.labels(address=address).inc()
+        self._observe_wait(address)
+    
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        POOL_CHECKED_OUT.labels(address=_address(event.address)).dec()
+    
+    def _observe_wait(self, address: str) -> None:
+        started = getattr(self._checkout, "started", None)
+        if started is not None:
+            POOL_CHECKOUT_WAIT.labels(address=address).observe(time.perf_counter() - started)
+            self._checkout.started = None
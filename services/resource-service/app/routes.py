@@ -1,66 +1,135 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import Optional, List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status, Query
+from fastapi.security import HTTPAuthorizationCredentials
+from typing import Dict, Optional, List
 from app.schemas import (
     ResourceCreate, ResourceUpdate, ResourceResponse, 
-    ResourceListResponse, MessageResponse, ResourceType, ResourceStatus
+    ResourceListResponse, MessageResponse, ResourceType, ResourceStatus, SearchMode
 )
 from app.services import ResourceService
-from app.auth import get_current_user, get_current_admin_user, TokenData
+from app.pagination import InvalidCursorError, next_cursor
+from app.serialization import InvalidFieldsError, RowEncoder, json_response
+from app.etags import cache_headers, etag_matches, make_etag, not_modified
+from app.auth import get_current_user, get_current_admin_user, TokenData, security
+from app.config import get_settings
 
+settings = get_settings()
 router = APIRouter()
 
+# List routes encode rows directly instead of validating a model per row
+RESOURCE_ROWS = RowEncoder(ResourceResponse, defaults=ResourceCreate)
+
+
+def _bad_request(error: ValueError) -> HTTPException:
+    # Built here because list routes shadow `status` with a query parameter
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+
+
+def _cache_headers(etag: Optional[str], route: str) -> Dict[str, str]:
+    return cache_headers(etag, settings.CACHE_CONTROL.get(route))
+
 
 # ==================== Protected Routes (Require Authentication) ====================
 
 @router.get("/resources", response_model=ResourceListResponse)
 async def get_resources(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; replaces skip"),
     resource_type: Optional[ResourceType] = None,
     status: Optional[ResourceStatus] = None,
-    building: Optional[str] = None
+    building: Optional[str] = None,
+    include_total: bool = Query(True, description="Set false to skip computing total"),
+    exact_total: bool = Query(False, description="Compute total exactly, with the page in one query"),
+    fields: Optional[str] = Query(None, description="Comma-separated resource fields to return; id is always included")
 ):
     """Get list of resources with optional filtering - Public endpoint for browsing"""
+    etag = await ResourceService.catalog_etag()
+    headers = _cache_headers(etag, "get_resources")
+    if etag and etag_matches(request, etag):
+        return not_modified(headers)
+    
     type_value = resource_type.value if resource_type else None
     status_value = status.value if status else None
     
-    resources = await ResourceService.get_resources(
-        skip=skip, limit=limit, 
-        resource_type=type_value, 
-        status=status_value,
-        building=building
-    )
-    total = await ResourceService.get_resources_count(
-        resource_type=type_value,
-        status=status_value,
-        building=building
-    )
-    return ResourceListResponse(resources=resources, total=total)
+    try:
+        selected = RESOURCE_ROWS.select(fields)
+        resources, total = await ResourceService.get_resources(
+            skip=skip, limit=limit, 
+            resource_type=type_value, 
+            status=status_value,
+            building=building,
+            cursor=cursor,
+            exact_total=include_total and exact_total,
+            projection=RESOURCE_ROWS.projection(selected, ResourceService.SORT)
+        )
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise _bad_request(e)
+    if include_total and total is None:
+        total = await ResourceService.get_resources_count(
+            resource_type=type_value,
+            status=status_value,
+            building=building
+        )
+    return json_response({
+        "resources": RESOURCE_ROWS.rows(resources, selected),
+        "total": total,
+        "next_cursor": next_cursor(resources, limit, ResourceService.SORT)
+    }, headers)
 
 
 @router.get("/resources/available", response_model=List[ResourceResponse])
 async def get_available_resources(
+    request: Request,
+    response: Response,
     resource_type: Optional[ResourceType] = None
 ):
     """Get all available resources - Public endpoint for browsing"""
+    etag = await ResourceService.catalog_etag()
+    headers = _cache_headers(etag, "get_available_resources")
+    if etag and etag_matches(request, etag):
+        return not_modified(headers)
+    response.headers.update(headers)
+    
     type_value = resource_type.value if resource_type else None
     return await ResourceService.get_available_resources(resource_type=type_value)
 
 
 @router.get("/resources/search", response_model=ResourceListResponse)
 async def search_resources(
+    request: Request,
     q: str = Query(..., min_length=1),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=100)
+    limit: int = Query(100, ge=1, le=100),
+    mode: SearchMode = Query(SearchMode.CONTAINS, description="contains: substring match, works on partial input; text: ranked word search"),
+    fields: Optional[str] = Query(None, description="Comma-separated resource fields to return; id is always included")
 ):
-    """Search resources by name, description, or location - Public endpoint"""
-    resources = await ResourceService.search_resources(q, skip=skip, limit=limit)
-    return ResourceListResponse(resources=resources, total=len(resources))
+    """Search resources by name, description, location, building or amenities - Public endpoint"""
+    try:
+        selected = RESOURCE_ROWS.select(fields)
+    except InvalidFieldsError as e:
+        raise _bad_request(e)
+    
+    etag = await ResourceService.catalog_etag()
+    headers = _cache_headers(etag, "search_resources")
+    if etag and etag_matches(request, etag):
+        return not_modified(headers)
+    resources, total = await ResourceService.search_resources(
+        q, skip=skip, limit=limit, mode=mode.value,
+        projection=RESOURCE_ROWS.projection(selected)
+    )
+    return json_response({
+        "resources": RESOURCE_ROWS.rows(resources, selected),
+        "total": total,
+        "next_cursor": None
+    }, headers)
 
 
 @router.get("/resources/{resource_id}", response_model=ResourceResponse)
 async def get_resource(
-    resource_id: str
+    resource_id: str,
+    request: Request,
+    response: Response
 ):
     """Get resource by ID - Public endpoint"""
     resource = await ResourceService.get_resource_by_id(resource_id)
@@ -69,6 +138,12 @@ async def get_resource(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Resource not found"
         )
+    
+    etag = make_etag(resource["id"], resource.get("updated_at") or resource["created_at"])
+    headers = _cache_headers(etag, "get_resource")
+    if etag_matches(request, etag):
+        return not_modified(headers)
+    response.headers.update(headers)
     return resource
 
 
@@ -88,6 +163,8 @@ async def create_resource(
 async def update_resource(
     resource_id: str,
     resource_data: ResourceUpdate,
+    background_tasks: BackgroundTasks,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
     current_user: TokenData = Depends(get_current_admin_user)
 ):
     """Update a resource (admin only)"""
@@ -97,12 +174,17 @@ async def update_resource(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Resource not found"
         )
+    background_tasks.add_task(
+        ResourceService.notify_resource_changed, resource_id, credentials.credentials
+    )
     return resource
 
 
 @router.delete("/resources/{resource_id}", response_model=MessageResponse)
 async def delete_resource(
     resource_id: str,
+    background_tasks: BackgroundTasks,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
     current_user: TokenData = Depends(get_current_admin_user)
 ):
     """Delete a resource (admin only)"""
@@ -112,6 +194,9 @@ async def delete_resource(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Resource not found"
         )
+    background_tasks.add_task(
+        ResourceService.notify_resource_changed, resource_id, credentials.credentials
+    )
     return MessageResponse(message="Resource deleted successfully")
 
 
@@ -119,6 +204,8 @@ async def delete_resource(
 async def update_resource_status(
     resource_id: str,
     new_status: ResourceStatus,
+    background_tasks: BackgroundTasks,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
     current_user: TokenData = Depends(get_current_admin_user)
 ):
     """Update resource status (admin only)"""
@@ -129,15 +216,26 @@ async def update_resource_status(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Resource not found"
         )
+    background_tasks.add_task(
+        ResourceService.notify_resource_changed, resource_id, credentials.credentials
+    )
     return resource
 
 
 # ==================== Resource Types Endpoint ====================
 
+RESOURCE_TYPES = [
+    {"value": t.value, "label": t.value.replace("_", " ").title()}
+    for t in ResourceType
+]
+RESOURCE_TYPES_ETAG = make_etag(*(t["value"] for t in RESOURCE_TYPES))
+
+
 @router.get("/resource-types", response_model=List[dict])
-async def get_resource_types():
+async def get_resource_types(request: Request, response: Response):
     """Get all available resource types"""
-    return [
-        {"value": t.value, "label": t.value.replace("_", " ").title()}
-        for t in ResourceType
-    ]
+    headers = _cache_headers(RESOURCE_TYPES_ETAG, "get_resource_types")
+    if etag_matches(request, RESOURCE_TYPES_ETAG):
+        return not_modified(headers)
+    response.headers.update(headers)
+    return RESOURCE_TYPES
@@ -19,6 +19,11 @@ class ResourceStatus(str, Enum):
     UNAVAILABLE = "unavailable"
 
 
+class SearchMode(str, Enum):
+    TEXT = "text"          # Ranked whole-word search served by the text index
+    CONTAINS = "contains"  # Case-insensitive substring match; scans the collection
+
+
 class PyObjectId(ObjectId):
     @classmethod
     def __get_validators__(cls):
@@ -69,8 +74,8 @@ class ResourceUpdate(BaseModel):
     amenities: Optional[List[str]] = None
     available_days: Optional[List[int]] = None
     available_hours: Optional[TimeSlot] = None
-    slot_duration_minutes: Optional[int] = None
-    max_booking_hours: Optional[int] = None
+    slot_duration_minutes: Optional[int] = Field(default=None, ge=15, le=480)
+    max_booking_hours: Optional[int] = Field(default=None, ge=1, le=24)
     requires_approval: Optional[bool] = None
     status: Optional[ResourceStatus] = None
 
@@ -101,7 +106,8 @@ class ResourceResponse(BaseModel):
 
 class ResourceListResponse(BaseModel):
     resources: List[ResourceResponse]
-    total: int
+    total: Optional[int] = None  # None when requested with include_total=false
+    next_cursor: Optional[str] = None
 
 
 class AvailableSlot(BaseModel):
@@ -0,0 +1,66 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Type
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when a fields= selection names fields the response does not have"""
+
+
+class RowEncoder:
+    """
+    Projection and JSON encoding of list rows for one response model.
+    
+    List routes fetch only the fields the response (or the client's
+    `fields=` selection) needs and encode rows straight from the driver
+    documents with orjson instead of building a Pydantic model per row.
+    Rows come from this service's own collection, so they are trusted to
+    match the model. Fields a document lacks get the model's default, else
+    the default of the `defaults` model the documents were created from
+    (e.g. amenities: []), else null.
+    """
+    
+    def __init__(
+        self,
+        model: Type[BaseModel],
+        always: Sequence[str] = ("id",),
+        defaults: Optional[Type[BaseModel]] = None
+    ):
+        self.fields = list(model.model_fields)
+        self.always = set(always)
+        self.defaults = {}
+        for name, field in model.model_fields.items():
+            if field.is_required() and defaults is not None and name in defaults.model_fields:
+                field = defaults.model_fields[name]
+            if not field.is_required():
+                self.defaults[name] = to_jsonable_python(field.get_default(call_default_factory=True))
+    
+    def select(self, fields: Optional[str]) -> List[str]:
+        """Parse a comma-separated fields= value into response fields, in model order"""
+        if not fields:
+            return self.fields
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested.difference(self.fields)
+        if unknown:
+            raise InvalidFieldsError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        requested |= self.always
+        return [name for name in self.fields if name in requested]
+    
+    @staticmethod
+    def projection(fields: Iterable[str], sort: Sequence[Tuple[str, int]] = ()) -> dict:
+        """MongoDB projection of `fields` plus the sort keys next_cursor reads"""
+        projection = {("_id" if name == "id" else name): 1 for name in fields}
+        for field, _ in sort:
+            projection[field] = 1
+        return projection
+    
+    def rows(self, items: List[dict], fields: List[str]) -> List[dict]:
+        """Serialized documents reduced to `fields`, in response order"""
+        return [{name: item.get(name, self.defaults.get(name)) for name in fields} for item in items]
+
+
+def json_response(content, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Encode already-shaped content with orjson, bypassing response_model validation"""
+    return Response(content=orjson.dumps(content), media_type="application/json", headers=headers)
@@ -1,14 +1,28 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
+import bisect
+import re
 from bson import ObjectId
-from app.database import get_database
+import httpx
+from app.config import get_settings
+from app.database import get_database, get_list_database
 from app.schemas import ResourceCreate, ResourceUpdate, ResourceResponse
+from app.pagination import decode_cursor, keyset_query
+from app.counts import count_cache, find_with_total
+from app.catalog import ResourceCatalog, resource_catalog
+from app.etags import BOOT_ID, make_etag
+
+settings = get_settings()
 
 
 class ResourceService:
     """Service class for resource operations"""
     
     COLLECTION = "resources"
+    SORT = [("_id", 1)]
+    # Text search ranks by relevance, _id keeps equal scores in a stable order
+    TEXT_SORT = [("score", {"$meta": "textScore"}), ("_id", 1)]
+    CONTAINS_FIELDS = ["name", "description", "location"]
     
     @staticmethod
     def _serialize_resource(resource: dict) -> dict:
@@ -17,6 +31,22 @@ class ResourceService:
             resource["id"] = str(resource.pop("_id"))
         return resource
     
+    @staticmethod
+    async def _catalog() -> Optional[ResourceCatalog]:
+        """The in-memory catalog, loaded and within its TTL, or None when disabled"""
+        if not settings.CATALOG_ENABLED:
+            return None
+        await resource_catalog.ensure_loaded(get_database()[ResourceService.COLLECTION])
+        return resource_catalog
+    
+    @staticmethod
+    async def catalog_etag() -> Optional[str]:
+        """ETag of responses derived from the whole collection, None when the catalog is disabled"""
+        catalog = await ResourceService._catalog()
+        if not catalog:
+            return None
+        return make_etag(BOOT_ID, catalog.version)
+    
     @staticmethod
     async def create_resource(resource_data: ResourceCreate) -> dict:
         """Create a new resource"""
@@ -26,19 +56,34 @@ class ResourceService:
         resource_dict["updated_at"] = None
         
         result = await db[ResourceService.COLLECTION].insert_one(resource_dict)
+        count_cache.invalidate(ResourceService.COLLECTION)
         resource_dict["_id"] = result.inserted_id
-        return ResourceService._serialize_resource(resource_dict)
+        resource = ResourceService._serialize_resource(resource_dict)
+        resource_catalog.put(dict(resource))
+        return resource
     
     @staticmethod
     async def get_resource_by_id(resource_id: str) -> Optional[dict]:
-        """Get resource by ID"""
+        """
+        Get resource by ID.
+        
+        Always read from MongoDB, since callers such as the reservation
+        service act on the current status; a catalog copy that differs
+        (e.g. written by another replica) is replaced on the way.
+        """
         db = get_database()
         if not ObjectId.is_valid(resource_id):
             return None
         resource = await db[ResourceService.COLLECTION].find_one(
             {"_id": ObjectId(resource_id)}
         )
-        return ResourceService._serialize_resource(resource) if resource else None
+        resource = ResourceService._serialize_resource(resource)
+        if settings.CATALOG_ENABLED and resource_catalog.get(resource_id) != resource:
+            if resource:
+                resource_catalog.put(dict(resource))
+            else:
+                resource_catalog.remove(resource_id)
+        return resource
     
     @staticmethod
     async def get_resources(
@@ -46,10 +91,29 @@ class ResourceService:
         limit: int = 100,
         resource_type: Optional[str] = None,
         status: Optional[str] = None,
-        building: Optional[str] = None
-    ) -> List[dict]:
-        """Get list of resources with filtering"""
-        db = get_database()
+        building: Optional[str] = None,
+        cursor: Optional[str] = None,
+        exact_total: bool = False,
+        projection: Optional[dict] = None
+    ) -> Tuple[List[dict], Optional[int]]:
+        """
+        Get list of resources with filtering, after `cursor` when given (skip is then ignored).
+        
+        Served from the in-memory catalog when enabled, with an exact total.
+        Otherwise returns the page and, with exact_total, the exact total
+        from the same $facet aggregation (else None), and `projection`
+        limits the fields fetched.
+        """
+        catalog = await ResourceService._catalog()
+        if catalog:
+            resources = catalog.query(resource_type or None, status or None, building or None)
+            start = skip
+            if cursor:
+                after = str(decode_cursor(cursor, ResourceService.SORT)[0])
+                start = bisect.bisect_right(resources, after, key=lambda resource: resource["id"])
+            return resources[start:start + limit], len(resources)
+        
+        collection = get_list_database()[ResourceService.COLLECTION]
         query = {}
         
         if resource_type:
@@ -59,9 +123,21 @@ class ResourceService:
         if building:
             query["building"] = building
         
-        cursor = db[ResourceService.COLLECTION].find(query).skip(skip).limit(limit)
-        resources = await cursor.to_list(length=limit)
-        return [ResourceService._serialize_resource(r) for r in resources]
+        page_query, after, total = query, None, None
+        if cursor:
+            values = decode_cursor(cursor, ResourceService.SORT)
+            page_query = keyset_query(query, ResourceService.SORT, values)
+            after = keyset_query({}, ResourceService.SORT, values)
+            skip = 0
+        
+        if exact_total:
+            resources, total = await find_with_total(
+                collection, query, ResourceService.SORT, skip, limit, after, projection
+            )
+        else:
+            documents = collection.find(page_query, projection).sort(ResourceService.SORT).skip(skip).limit(limit)
+            resources = await documents.to_list(length=limit)
+        return [ResourceService._serialize_resource(r) for r in resources], total
     
     @staticmethod
     async def get_resources_count(
@@ -69,7 +145,10 @@ class ResourceService:
         status: Optional[str] = None,
         building: Optional[str] = None
     ) -> int:
-        """Get total count of resources"""
+        """Get total count of resources (from the catalog, else cached briefly)"""
+        catalog = await ResourceService._catalog()
+        if catalog:
+            return len(catalog.query(resource_type or None, status or None, building or None))
         db = get_database()
         query = {}
         
@@ -80,7 +159,7 @@ class ResourceService:
         if building:
             query["building"] = building
         
-        return await db[ResourceService.COLLECTION].count_documents(query)
+        return await count_cache.count(db[ResourceService.COLLECTION], query)
     
     @staticmethod
     async def update_resource(resource_id: str, update_data: ResourceUpdate) -> Optional[dict]:
@@ -101,7 +180,12 @@ class ResourceService:
             {"$set": update_dict},
             return_document=True
         )
-        return ResourceService._serialize_resource(result) if result else None
+        count_cache.invalidate(ResourceService.COLLECTION)
+        if not result:
+            return None
+        resource = ResourceService._serialize_resource(result)
+        resource_catalog.put(dict(resource))
+        return resource
     
     @staticmethod
     async def delete_resource(resource_id: str) -> bool:
@@ -113,33 +197,54 @@ class ResourceService:
         result = await db[ResourceService.COLLECTION].delete_one(
             {"_id": ObjectId(resource_id)}
         )
+        count_cache.invalidate(ResourceService.COLLECTION)
+        resource_catalog.remove(resource_id)
         return result.deleted_count > 0
     
     @staticmethod
     async def search_resources(
         query: str,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[dict]:
-        """Search resources by name or description"""
-        db = get_database()
-        search_query = {
-            "$or": [
-                {"name": {"$regex": query, "$options": "i"}},
-                {"description": {"$regex": query, "$options": "i"}},
-                {"location": {"$regex": query, "$options": "i"}}
-            ]
-        }
-        cursor = db[ResourceService.COLLECTION].find(search_query).skip(skip).limit(limit)
-        resources = await cursor.to_list(length=limit)
-        return [ResourceService._serialize_resource(r) for r in resources]
+        limit: int = 100,
+        mode: str = "contains",
+        projection: Optional[dict] = None
+    ) -> Tuple[List[dict], int]:
+        """
+        Search resources, returning one page and the exact number of matches.
+        
+        "text" mode matches whole (stemmed) words of name, description,
+        location, building and amenities through the weighted text index and
+        ranks by score. "contains" mode matches a literal substring of name,
+        description or location for partial input, but scans the collection.
+        """
+        collection = get_list_database()[ResourceService.COLLECTION]
+        if mode == "contains":
+            pattern = re.escape(query)
+            search_query = {
+                "$or": [
+                    {field: {"$regex": pattern, "$options": "i"}}
+                    for field in ResourceService.CONTAINS_FIELDS
+                ]
+            }
+            sort = ResourceService.SORT
+        else:
+            search_query = {"$text": {"$search": query}}
+            sort = ResourceService.TEXT_SORT
+        
+        resources, total = await find_with_total(
+            collection, search_query, sort, skip, limit, projection=projection
+        )
+        return [ResourceService._serialize_resource(r) for r in resources], total
     
     @staticmethod
     async def get_available_resources(
         resource_type: Optional[str] = None
     ) -> List[dict]:
         """Get all available resources"""
-        db = get_database()
+        catalog = await ResourceService._catalog()
+        if catalog:
+            return catalog.query(resource_type or None, "available")
+        db = get_list_database()
         query = {"status": "available"}
         if resource_type:
             query["resource_type"] = resource_type
@@ -147,3 +252,16 @@ class ResourceService:
         cursor = db[ResourceService.COLLECTION].find(query)
         resources = await cursor.to_list(length=1000)
         return [ResourceService._serialize_resource(r) for r in resources]
+    
+    @staticmethod
+    async def notify_resource_changed(resource_id: str, token: str) -> None:
+        """Ask reservation-service to drop its cached copy of a resource (best effort)"""
+        try:
+            async with httpx.AsyncClient() as client:
+                await client.delete(
+                    f"{settings.RESERVATION_SERVICE_URL}/api/v1/cache/resources/{resource_id}",
+                    headers={"Authorization": f"Bearer {token}"},
+                    timeout=2.0
+                )
+        except Exception as e:
+            print(f"Failed to invalidate reservation-service cache: {e}")
@@ -0,0 +1,172 @@
+"""
+Metrics middleware benchmark
+
+Compares request throughput of /health and the /api/v1/resources listing
+with no metrics middleware, the previous @app.middleware("http")
+(BaseHTTPMiddleware) version and the pure ASGI MetricsMiddleware. Requests
+are sent straight to the ASGI app, so the numbers show the app and
+middleware cost without any server or network. The listing is served from
+an in-memory catalog of --resources fake resources, no MongoDB needed.
+
+Usage (from services/resource-service):
+    python -m benchmarks.bench_middleware [--requests 5000] [--concurrency 20]
+                                          [--resources 100]
+"""
+
+import argparse
+import asyncio
+import math
+import time
+from bson import ObjectId
+from fastapi import FastAPI, Request
+from app import database
+from app.catalog import resource_catalog
+from app.metrics import REQUEST_COUNT, REQUEST_LATENCY, MetricsMiddleware, route_template
+from app.routes import router
+
+VARIANTS = ["none", "http", "asgi"]
+PATHS = [("/health", b""), ("/api/v1/resources", b"limit=20")]
+
+
+class FakeCollection:
+    """Serves the catalog load"""
+    
+    def __init__(self, documents):
+        self.documents = documents
+    
+    def find(self, query):
+        return self
+    
+    async def to_list(self, length=None):
+        return [dict(document) for document in self.documents]
+
+
+def make_resources(count: int) -> list:
+    return [{
+        "_id": ObjectId(),
+        "name": f"Study Room {i}",
+        "resource_type": "study_room",
+        "description": "Quiet room with a whiteboard",
+        "location": "Library",
+        "building": f"Building {i % 4}",
+        "floor": i % 5,
+        "capacity": 4,
+        "amenities": ["whiteboard", "power outlets"],
+        "available_days": [0, 1, 2, 3, 4],
+        "available_hours": {"start_time": "08:00", "end_time": "22:00"},
+        "slot_duration_minutes": 60,
+        "max_booking_hours": 4,
+        "requires_approval": False,
+        "status": "available",
+        "created_at": None,
+        "updated_at": None
+    } for i in range(count)]
+
+
+def build_app(variant: str) -> FastAPI:
+    """The service's routes behind one middleware variant"""
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy", "service": "resource-service"}
+    
+    if variant == "http":
+        # The middleware as it was before, with route-template labels
+        @app.middleware("http")
+        async def metrics_middleware(request: Request, call_next):
+            start_time = time.time()
+            response = await call_next(request)
+            endpoint = route_template(request.scope)
+            REQUEST_COUNT.labels(method=request.method, endpoint=endpoint, status=response.status_code).inc()
+            REQUEST_LATENCY.labels(method=request.method, endpoint=endpoint).observe(time.time() - start_time)
+            return response
+    elif variant == "asgi":
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+def percentile(samples: list, q: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+async def call(app: FastAPI, path: str, query_string: bytes) -> float:
+    """Send one GET to app and return its latency"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query_string, "root_path": "", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80)
+    }
+    
+    received = False
+    
+    async def receive():
+        # Like a server: the body once, then wait until the client disconnects
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+    
+    status = []
+    
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+    
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    latency = time.perf_counter() - start
+    assert status == [200], f"{path} returned {status}"
+    return latency
+
+
+async def run(app: FastAPI, path: str, query_string: bytes, requests: int, concurrency: int):
+    """Return (requests per second, latencies) with `concurrency` requests in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def one() -> float:
+        async with semaphore:
+            return await call(app, path, query_string)
+    
+    for _ in range(min(requests, 100)):  # warm up
+        await call(app, path, query_string)
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - start), latencies
+
+
+async def main_async(args):
+    database.db.db = {"resources": FakeCollection(make_resources(args.resources))}
+    resource_catalog.ttl_seconds = math.inf
+    await resource_catalog.load(database.db.db["resources"])
+    
+    print(f"{args.requests} requests per run, {args.concurrency} in flight, {args.resources} resources")
+    print(f"{'path':<22}{'middleware':<12}{'req/s':>10}{'p50 us':>10}{'p99 us':>10}")
+    for path, query_string in PATHS:
+        baseline = None
+        for variant in VARIANTS:
+            app = build_app(variant)
+            throughput, latencies = await run(app, path, query_string, args.requests, args.concurrency)
+            baseline = baseline or throughput
+            print(
+                f"{path:<22}{variant:<12}{throughput:>10.0f}{percentile(latencies, 0.5) * 1e6:>10.0f}"
+                f"{percentile(latencies, 0.99) * 1e6:>10.0f}  ({throughput / baseline:.0%} of none)"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000, help="requests per path and middleware")
+    parser.add_argument("--concurrency", type=int, default=20, help="requests in flight")
+    parser.add_argument("--resources", type=int, default=100, help="resources in the catalog")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
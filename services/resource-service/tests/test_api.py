@@ -17,11 +17,14 @@ class TestHealthEndpoints:
         assert data["service"] == "resource-service"
     
     def test_readiness_check(self):
-        """Test readiness endpoint returns ready status"""
+        """Test readiness endpoint returns ready status with the details behind it"""
         response = client.get("/ready")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "ready"
+        assert data["reasons"] == []
+        assert "event_loop_lag_seconds" in data
+        assert "requests_in_flight" in data
     
     def test_root_endpoint(self):
         """Test root endpoint returns service info"""
@@ -60,3 +63,43 @@ class TestResourceEndpoints:
             "location": "Building A"
         })
         assert response.status_code == 403
+    
+    def test_search_rejects_unknown_mode(self):
+        """Test search only accepts the text and contains modes"""
+        response = client.get("/api/v1/resources/search", params={"q": "room", "mode": "regex"})
+        assert response.status_code == 422
+    
+    def test_search_defaults_to_contains(self, monkeypatch):
+        """Test partial input keeps matching by substring unless text mode is requested"""
+        from app.services import ResourceService
+        modes = []
+        
+        async def no_etag():
+            return None
+        
+        async def search(query, skip=0, limit=100, mode="contains", projection=None):
+            modes.append(mode)
+            return [], 0
+        
+        monkeypatch.setattr(ResourceService, "catalog_etag", staticmethod(no_etag))
+        monkeypatch.setattr(ResourceService, "search_resources", staticmethod(search))
+        assert client.get("/api/v1/resources/search", params={"q": "roo"}).status_code == 200
+        assert client.get("/api/v1/resources/search", params={"q": "room", "mode": "text"}).status_code == 200
+        assert modes == ["contains", "text"]
+    
+    def test_search_rejects_unknown_fields(self):
+        """Test search validates the fields selection before querying"""
+        response = client.get("/api/v1/resources/search", params={"q": "room", "fields": "name,secret"})
+        assert response.status_code == 400
+    
+    def test_resource_types_conditional_get(self):
+        """Test resource types carry an ETag and revalidate with 304"""
+        response = client.get("/api/v1/resource-types")
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "public, max-age=3600"
+        etag = response.headers["etag"]
+        
+        response = client.get("/api/v1/resource-types", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
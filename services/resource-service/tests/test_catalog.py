@@ -0,0 +1,116 @@
+import asyncio
+from bson import ObjectId
+from app import services
+from app.catalog import ResourceCatalog
+from app.services import ResourceService
+
+IDS = [ObjectId() for _ in range(4)]
+
+
+def make_resource(index, resource_type="study_room", status="available", building="A"):
+    return {
+        "_id": IDS[index],
+        "name": f"Room {index}",
+        "resource_type": resource_type,
+        "status": status,
+        "building": building
+    }
+
+
+class FakeCollection:
+    """Returns fixed documents, optionally running a write mid-read"""
+    
+    def __init__(self, documents, during_find=None):
+        self.documents = documents
+        self.during_find = during_find
+        self.finds = 0
+    
+    def find(self, query):
+        self.finds += 1
+        return self
+    
+    async def find_one(self, query):
+        for document in self.documents:
+            if document["_id"] == query["_id"]:
+                return dict(document)
+        return None
+    
+    async def to_list(self, length=None):
+        if self.during_find:
+            self.during_find()
+        return [dict(document) for document in self.documents]
+
+
+class TestResourceCatalog:
+    """Test the in-memory resource catalog"""
+    
+    def setup_method(self):
+        self.catalog = ResourceCatalog(ttl_seconds=60)
+        self.documents = [
+            make_resource(2, "meeting_room", building="B"),
+            make_resource(0),
+            make_resource(1, status="maintenance"),
+            make_resource(3, building="B")
+        ]
+    
+    def load(self, during_find=None):
+        asyncio.run(self.catalog.load(FakeCollection(self.documents, during_find)))
+    
+    def ids(self, resources):
+        return [resource["id"] for resource in resources]
+    
+    def test_query_filters_in_id_order(self):
+        """Test filtered listings intersect the indexes and keep _id order"""
+        self.load()
+        assert self.ids(self.catalog.query()) == [str(i) for i in IDS]
+        assert self.ids(self.catalog.query(status="available", building="B")) == [str(IDS[2]), str(IDS[3])]
+        assert self.ids(self.catalog.query(resource_type="study_room", status="available")) == [str(IDS[0]), str(IDS[3])]
+        assert self.catalog.query(building="Z") == []
+    
+    def test_write_through_reindexes(self):
+        """Test put and remove keep the secondary indexes current"""
+        self.load()
+        updated = {**self.catalog.get(str(IDS[1])), "status": "available"}
+        self.catalog.put(updated)
+        assert str(IDS[1]) in self.ids(self.catalog.query(status="available"))
+        assert self.catalog.query(status="maintenance") == []
+        
+        self.catalog.remove(str(IDS[0]))
+        assert self.catalog.get(str(IDS[0])) is None
+        assert str(IDS[0]) not in self.ids(self.catalog.query(resource_type="study_room"))
+    
+    def test_write_during_reload_is_kept(self):
+        """Test a write racing a reload is replayed onto the new snapshot"""
+        self.load()
+        self.load(during_find=lambda: self.catalog.remove(str(IDS[3])))
+        assert self.catalog.get(str(IDS[3])) is None
+        assert len(self.catalog.query()) == 3
+    
+    def test_reload_after_ttl(self):
+        """Test ensure_loaded only reloads once the TTL has passed"""
+        collection = FakeCollection(self.documents)
+        asyncio.run(self.catalog.ensure_loaded(collection))
+        asyncio.run(self.catalog.ensure_loaded(collection))
+        assert collection.finds == 1
+        
+        self.documents[1]["status"] = "maintenance"
+        self.catalog.ttl_seconds = 0
+        assert not self.catalog.fresh
+        asyncio.run(self.catalog.ensure_loaded(collection))
+        assert collection.finds == 2
+        assert self.catalog.get(str(IDS[0]))["status"] == "maintenance"
+    
+    def test_lookup_by_id_reads_current_document(self, monkeypatch):
+        """Test a lookup returns MongoDB's copy and refreshes a stale catalog entry"""
+        self.load()
+        self.documents[1]["status"] = "maintenance"
+        del self.documents[0]
+        collection = FakeCollection(self.documents)
+        monkeypatch.setattr(services, "resource_catalog", self.catalog)
+        monkeypatch.setattr(services, "get_database", lambda: {ResourceService.COLLECTION: collection})
+        
+        resource = asyncio.run(ResourceService.get_resource_by_id(str(IDS[0])))
+        assert resource["status"] == "maintenance"
+        assert self.catalog.get(str(IDS[0]))["status"] == "maintenance"
+        assert asyncio.run(ResourceService.get_resource_by_id(str(IDS[2]))) is None
+        assert self.catalog.get(str(IDS[2])) is None
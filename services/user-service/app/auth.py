@@ -1,28 +1,77 @@
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache import TTLCache
 from app.config import get_settings
 from app.database import get_db
 from app.models import User
+from app.passwords import PasswordPoolSaturated, password_pool
 from app.schemas import TokenData
 
 settings = get_settings()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
+# Verified tokens (token -> (user_id, exp)) and user snapshots (user_id -> UserSnapshot)
+token_cache = TTLCache(settings.AUTH_CACHE_TTL_SECONDS, settings.AUTH_CACHE_MAX_ENTRIES)
+user_cache = TTLCache(settings.AUTH_CACHE_TTL_SECONDS, settings.AUTH_CACHE_MAX_ENTRIES)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
 
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Detached, read-only view of the authenticated user"""
+    id: int
+    email: str
+    username: str
+    full_name: Optional[str]
+    role: str
+    is_active: bool
+    created_at: datetime
+    
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            full_name=user.full_name,
+            role=user.role,
+            is_active=user.is_active,
+            created_at=user.created_at
+        )
+
+
+def invalidate_user_cache(user_id: int) -> None:
+    """Drop a cached user snapshot after the user changed"""
+    user_cache.delete(user_id)
+
+
+def _password_pool_saturated() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many password operations in progress, please retry",
+        headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+    )
 
-def get_password_hash(password: str) -> str:
-    """Generate password hash"""
-    return pwd_context.hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the hashing process pool"""
+    try:
+        return await password_pool.verify(plain_password, hashed_password)
+    except PasswordPoolSaturated:
+        raise _password_pool_saturated()
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate a password hash in the hashing process pool"""
+    try:
+        return await password_pool.hash(password)
+    except PasswordPoolSaturated:
+        raise _password_pool_saturated()
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -37,51 +86,78 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def decode_token(token: str) -> TokenData:
-    """Decode and validate JWT token"""
+def _decode_payload(token: str) -> dict:
+    """Decode and verify a JWT, returning its payload"""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        username: str = payload.get("username")
-        role: str = payload.get("role")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        return TokenData(user_id=int(user_id), username=username, role=role)
     except JWTError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid token: {str(e)}",
             headers={"WWW-Authenticate": "Bearer"},
         )
-
-
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user"""
-    token = credentials.credentials
-    token_data = decode_token(token)
-    user = db.query(User).filter(User.id == token_data.user_id).first()
-    if user is None:
+    if payload.get("sub") is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
+            detail="Invalid token",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    if not user.is_active:
+    return payload
+
+
+def decode_token(token: str) -> TokenData:
+    """Decode and validate JWT token"""
+    payload = _decode_payload(token)
+    return TokenData(
+        user_id=int(payload["sub"]),
+        username=payload.get("username"),
+        role=payload.get("role")
+    )
+
+
+def _verified_user_id(token: str) -> int:
+    """Return the user ID of a valid token, skipping signature checks for cached tokens"""
+    cached = token_cache.get(token)
+    if cached is not None:
+        user_id, exp = cached
+        if exp is None or exp > time.time():
+            return user_id
+        token_cache.delete(token)
+    
+    payload = _decode_payload(token)
+    user_id = int(payload["sub"])
+    exp = payload.get("exp")
+    # Never keep a token cached past its own expiry
+    token_cache.set(token, (user_id, exp), ttl_seconds=exp - time.time() if exp else None)
+    return user_id
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> UserSnapshot:
+    """Get current authenticated user"""
+    user_id = _verified_user_id(credentials.credentials)
+    snapshot = user_cache.get(user_id)
+    if snapshot is None:
+        user = await db.get(User, user_id)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        snapshot = UserSnapshot.from_user(user)
+        user_cache.set(user_id, snapshot)
+    if not snapshot.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User is inactive"
         )
-    return user
+    return snapshot
 
 
-def get_current_admin_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_admin_user(current_user: UserSnapshot = Depends(get_current_user)) -> UserSnapshot:
     """Verify user has admin role"""
     if current_user.role != "admin":
         raise HTTPException(
@@ -1,25 +1,56 @@
-from sqlalchemy import create_engine
+from typing import AsyncIterator
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 from app.config import get_settings
 
 settings = get_settings()
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def get_async_database_url(url: str) -> str:
+    """Point a postgresql:// URL at the asyncpg driver"""
+    database_url = make_url(url)
+    if database_url.drivername in ("postgresql", "postgresql+psycopg2"):
+        database_url = database_url.set(drivername="postgresql+asyncpg")
+    if database_url.drivername == "postgresql+asyncpg":
+        database_url = database_url.update_query_dict({
+            "prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)
+        })
+    return database_url.render_as_string(hide_password=False)
+
+
+engine = create_async_engine(
+    get_async_database_url(settings.DATABASE_URL),
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=settings.DB_POOL_PRE_PING
+)
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
 
-def get_db():
+async def get_db() -> AsyncIterator[AsyncSession]:
     """Dependency to get database session"""
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def init_db():
+async def init_db():
     """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def ping_db():
+    """Raise unless PostgreSQL answers a trivial query"""
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def close_db():
+    """Dispose of pooled database connections"""
+    await engine.dispose()
@@ -1,38 +1,35 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
-from fastapi.responses import Response
-import time
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from fastapi.responses import JSONResponse, Response
 from app.config import get_settings
-from app.database import init_db
+from app.metrics import MetricsMiddleware
+from app.database import init_db, close_db, ping_db
+from app.passwords import password_pool
+from app.readiness import readiness
 from app.routes import router
 
 settings = get_settings()
 
-# Prometheus metrics
-REQUEST_COUNT = Counter(
-    'http_requests_total',
-    'Total HTTP requests',
-    ['method', 'endpoint', 'status']
-)
-REQUEST_LATENCY = Histogram(
-    'http_request_duration_seconds',
-    'HTTP request latency',
-    ['method', 'endpoint']
-)
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     print("Starting User Service...")
-    init_db()
+    await init_db()
     print("Database initialized")
+    password_pool.start()
+    print(f"Password hashing pool started with {password_pool.workers} workers")
+    readiness.register("postgres", ping_db)
+    readiness.start()
     yield
     # Shutdown
     print("Shutting down User Service...")
+    await readiness.stop()
+    password_pool.shutdown()
+    await close_db()
 
 
 app = FastAPI(
@@ -52,24 +49,8 @@ app.add_middleware(
 )
 
 
-# Metrics middleware
-@app.middleware("http")
-async def metrics_middleware(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    duration = time.time() - start_time
-    
-    REQUEST_COUNT.labels(
-        method=request.method,
-        endpoint=request.url.path,
-        status=response.status_code
-    ).inc()
-    REQUEST_LATENCY.labels(
-        method=request.method,
-        endpoint=request.url.path
-    ).observe(duration)
-    
-    return response
+# Metrics middleware (pure ASGI, outermost so it also times CORS handling)
+app.add_middleware(MetricsMiddleware)
 
 
 # Include routes
@@ -84,9 +65,13 @@ def health_check():
 
 
 @app.get("/ready")
-def readiness_check():
-    """Readiness check endpoint for Kubernetes"""
-    return {"status": "ready", "service": "user-service"}
+async def readiness_check():
+    """Readiness check endpoint for Kubernetes, from cached dependency checks and current load"""
+    ready, details = readiness.status()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "service": "user-service", **details}
+    )
 
 
 @app.get("/metrics")
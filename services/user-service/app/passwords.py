@@ -0,0 +1,124 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from passlib.context import CryptContext
+from prometheus_client import Counter, Gauge, Histogram
+from app.config import get_settings
+
+settings = get_settings()
+# Hashes with any other cost are flagged by needs_update and upgraded on login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS
+)
+
+PASSWORD_QUEUE_DEPTH = Gauge(
+    'password_hash_queue_depth',
+    'Password hash operations queued or running in the process pool'
+)
+PASSWORD_HASH_LATENCY = Histogram(
+    'password_hash_duration_seconds',
+    'Password hash operation latency, including time spent queued',
+    ['operation']
+)
+PASSWORD_REJECTED = Counter(
+    'password_hash_rejected_total',
+    'Password hash operations rejected because the pool was saturated',
+    ['operation']
+)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash"""
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def get_password_hash(password: str) -> str:
+    """Generate password hash"""
+    return pwd_context.hash(password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a hash was made with outdated settings"""
+    return pwd_context.needs_update(hashed_password)
+
+
+class PasswordPoolSaturated(Exception):
+    """Raised when too many password operations are already pending"""
+
+
+class PasswordHasherPool:
+    """
+    Size-bounded process pool for bcrypt work.
+    
+    Hashing runs in PASSWORD_HASH_WORKERS separate processes, so a burst of
+    logins scales across cores instead of contending for the GIL and the
+    request threadpool. At most PASSWORD_HASH_MAX_PENDING operations may be
+    queued or running; beyond that callers are rejected immediately.
+    """
+    
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor: ProcessPoolExecutor = None
+    
+    def start(self) -> None:
+        """Start the worker processes"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                # Never fork the running event loop and its threads
+                mp_context=multiprocessing.get_context("spawn")
+            )
+    
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+    
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password in the pool"""
+        return await self._run("verify", verify_password, plain_password, hashed_password)
+    
+    async def hash(self, password: str) -> str:
+        """Hash a password in the pool"""
+        return await self._run("hash", get_password_hash, password)
+    
+    async def _run(self, operation: str, func, *args):
+        if self.pending >= self.max_pending:
+            PASSWORD_REJECTED.labels(operation=operation).inc()
+            raise PasswordPoolSaturated(f"{self.pending} password operations pending")
+        self.start()
+        
+        self.pending += 1
+        PASSWORD_QUEUE_DEPTH.inc()
+        start_time = time.perf_counter()
+        executor = self._executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            # A worker died; reap the broken pool and start a fresh one for
+            # the next caller, unless a concurrent failure already did
+            executor.shutdown(wait=False, cancel_futures=True)
+            if self._executor is executor:
+                self._executor = None
+            raise
+        finally:
+            self.pending -= 1
+            PASSWORD_QUEUE_DEPTH.dec()
+            PASSWORD_HASH_LATENCY.labels(operation=operation).observe(
+                time.perf_counter() - start_time
+            )
+
+
+password_pool = PasswordHasherPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
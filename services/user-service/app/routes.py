@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from app.database import get_db
 from app.schemas import (
@@ -8,9 +8,9 @@ from app.schemas import (
 )
 from app.services import UserService
 from app.auth import (
-    create_access_token, get_current_user, get_current_admin_user, verify_password
+    create_access_token, get_current_user, get_current_admin_user, verify_password_async,
+    UserSnapshot
 )
-from app.models import User
 from app.config import get_settings
 
 settings = get_settings()
@@ -20,28 +20,34 @@ router = APIRouter()
 # ==================== Authentication Routes ====================
 
 @router.post("/auth/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user"""
     # Check if email exists
-    if UserService.get_user_by_email(db, user_data.email):
+    if await UserService.get_user_by_email(db, user_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     # Check if username exists
-    if UserService.get_user_by_username(db, user_data.username):
+    if await UserService.get_user_by_username(db, user_data.username):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
         )
-    user = UserService.create_user(db, user_data)
+    user = await UserService.create_user(db, user_data)
     return user
 
 
 @router.post("/auth/login", response_model=Token)
-def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(
+    credentials: UserLogin,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db)
+):
     """Login and get access token"""
-    user = UserService.authenticate_user(db, credentials.username, credentials.password)
+    user = await UserService.authenticate_user(
+        db, credentials.username, credentials.password, background_tasks
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -64,16 +70,16 @@ def login(credentials: UserLogin, db: Session = Depends(get_db)):
 # ==================== User Profile Routes ====================
 
 @router.get("/users/me", response_model=UserResponse)
-def get_current_user_profile(current_user: User = Depends(get_current_user)):
+async def get_current_user_profile(current_user: UserSnapshot = Depends(get_current_user)):
     """Get current user profile"""
     return current_user
 
 
 @router.put("/users/me", response_model=UserResponse)
-def update_current_user_profile(
+async def update_current_user_profile(
     user_data: UserUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update current user profile"""
     # Don't allow users to change their own role
@@ -82,54 +88,68 @@ def update_current_user_profile(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Cannot change own role"
         )
-    if user_data.email and UserService.get_user_by_email(db, user_data.email):
+    if user_data.email and await UserService.get_user_by_email(db, user_data.email):
         if user_data.email != current_user.email:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already in use"
             )
-    return UserService.update_user(db, current_user, user_data)
+    user = await UserService.get_user_by_id(db, current_user.id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return await UserService.update_user(db, user, user_data)
 
 
 @router.post("/users/me/change-password", response_model=MessageResponse)
-def change_password(
+async def change_password(
     password_data: PasswordChange,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Change current user password"""
-    if not verify_password(password_data.current_password, current_user.hashed_password):
+    user = await UserService.get_user_by_id(db, current_user.id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    if not await verify_password_async(password_data.current_password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
-    UserService.change_password(db, current_user, password_data.new_password)
+    await UserService.change_password(db, user, password_data.new_password)
     return MessageResponse(message="Password changed successfully")
 
 
 # ==================== Admin Routes ====================
 
 @router.get("/users", response_model=UserListResponse)
-def get_all_users(
+async def get_all_users(
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all users (admin only)"""
-    users = UserService.get_users(db, skip=skip, limit=limit)
-    total = UserService.get_users_count(db)
+    users = await UserService.get_users(db, skip=skip, limit=limit)
+    total = await UserService.get_users_count(db)
     return UserListResponse(users=users, total=total)
 
 
 @router.get("/users/{user_id}", response_model=UserResponse)
-def get_user(
+async def get_user(
     user_id: int,
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get user by ID (admin only)"""
-    user = UserService.get_user_by_id(db, user_id)
+    user = await UserService.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -139,27 +159,27 @@ def get_user(
 
 
 @router.put("/users/{user_id}", response_model=UserResponse)
-def update_user(
+async def update_user(
     user_id: int,
     user_data: UserUpdate,
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update user by ID (admin only)"""
-    user = UserService.get_user_by_id(db, user_id)
+    user = await UserService.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return UserService.update_user(db, user, user_data)
+    return await UserService.update_user(db, user, user_data)
 
 
 @router.delete("/users/{user_id}", response_model=MessageResponse)
-def delete_user(
+async def delete_user(
     user_id: int,
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete user by ID (admin only)"""
     if user_id == current_user.id:
@@ -167,43 +187,43 @@ def delete_user(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete yourself"
         )
-    user = UserService.get_user_by_id(db, user_id)
+    user = await UserService.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    UserService.delete_user(db, user)
+    await UserService.delete_user(db, user)
     return MessageResponse(message="User deleted successfully")
 
 
 @router.post("/users/{user_id}/deactivate", response_model=UserResponse)
-def deactivate_user(
+async def deactivate_user(
     user_id: int,
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Deactivate user (admin only)"""
-    user = UserService.get_user_by_id(db, user_id)
+    user = await UserService.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return UserService.deactivate_user(db, user)
+    return await UserService.deactivate_user(db, user)
 
 
 @router.post("/users/{user_id}/activate", response_model=UserResponse)
-def activate_user(
+async def activate_user(
     user_id: int,
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Activate user (admin only)"""
-    user = UserService.get_user_by_id(db, user_id)
+    user = await UserService.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return UserService.activate_user(db, user)
+    return await UserService.activate_user(db, user)
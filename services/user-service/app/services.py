@@ -1,42 +1,49 @@
-from sqlalchemy.orm import Session
+from fastapi import BackgroundTasks
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
+from app.database import SessionLocal
 from app.models import User
 from app.schemas import UserCreate, UserUpdate
-from app.auth import get_password_hash, verify_password
+from app.auth import get_password_hash_async, verify_password_async, invalidate_user_cache
+from app.passwords import PasswordPoolSaturated, password_needs_rehash, password_pool
 
 
 class UserService:
     """Service class for user operations"""
     
     @staticmethod
-    def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
+    async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
         """Get user by ID"""
-        return db.query(User).filter(User.id == user_id).first()
+        return await db.get(User, user_id)
     
     @staticmethod
-    def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
         """Get user by email"""
-        return db.query(User).filter(User.email == email).first()
+        result = await db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
     
     @staticmethod
-    def get_user_by_username(db: Session, username: str) -> Optional[User]:
+    async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
         """Get user by username"""
-        return db.query(User).filter(User.username == username).first()
+        result = await db.execute(select(User).where(User.username == username))
+        return result.scalars().first()
     
     @staticmethod
-    def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
+    async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[User]:
         """Get list of users with pagination"""
-        return db.query(User).offset(skip).limit(limit).all()
+        result = await db.execute(select(User).order_by(User.id).offset(skip).limit(limit))
+        return list(result.scalars().all())
     
     @staticmethod
-    def get_users_count(db: Session) -> int:
+    async def get_users_count(db: AsyncSession) -> int:
         """Get total number of users"""
-        return db.query(User).count()
+        return await db.scalar(select(func.count()).select_from(User))
     
     @staticmethod
-    def create_user(db: Session, user_data: UserCreate) -> User:
+    async def create_user(db: AsyncSession, user_data: UserCreate) -> User:
         """Create a new user"""
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         db_user = User(
             email=user_data.email,
             username=user_data.username,
@@ -45,12 +52,12 @@ class UserService:
             role=user_data.role.value
         )
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
         return db_user
     
     @staticmethod
-    def update_user(db: Session, user: User, user_data: UserUpdate) -> User:
+    async def update_user(db: AsyncSession, user: User, user_data: UserUpdate) -> User:
         """Update user information"""
         update_data = user_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
@@ -59,46 +66,78 @@ class UserService:
                     setattr(user, field, value.value)
                 else:
                     setattr(user, field, value)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        invalidate_user_cache(user.id)
+        await db.refresh(user)
         return user
     
     @staticmethod
-    def delete_user(db: Session, user: User) -> None:
+    async def delete_user(db: AsyncSession, user: User) -> None:
         """Delete a user"""
-        db.delete(user)
-        db.commit()
+        user_id = user.id
+        await db.delete(user)
+        await db.commit()
+        invalidate_user_cache(user_id)
     
     @staticmethod
-    def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+    async def authenticate_user(
+        db: AsyncSession,
+        username: str,
+        password: str,
+        background_tasks: Optional[BackgroundTasks] = None
+    ) -> Optional[User]:
         """Authenticate user with username and password"""
-        user = UserService.get_user_by_username(db, username)
+        user = await UserService.get_user_by_username(db, username)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return None
+        # Upgrade hashes made with an old cost after the response is sent
+        if background_tasks is not None and password_needs_rehash(user.hashed_password):
+            background_tasks.add_task(
+                UserService.rehash_password, user.id, user.hashed_password, password
+            )
         return user
     
     @staticmethod
-    def change_password(db: Session, user: User, new_password: str) -> User:
+    async def rehash_password(user_id: int, old_hash: str, password: str) -> None:
+        """Store a hash with the current cost, unless the password changed meanwhile"""
+        try:
+            new_hash = await password_pool.hash(password)
+        except PasswordPoolSaturated:
+            # Login traffic comes first; try again on the next login
+            return
+        async with SessionLocal() as db:
+            await db.execute(
+                update(User)
+                .where(User.id == user_id, User.hashed_password == old_hash)
+                .values(hashed_password=new_hash)
+            )
+            await db.commit()
+    
+    @staticmethod
+    async def change_password(db: AsyncSession, user: User, new_password: str) -> User:
         """Change user password"""
-        user.hashed_password = get_password_hash(new_password)
-        db.commit()
-        db.refresh(user)
+        user.hashed_password = await get_password_hash_async(new_password)
+        await db.commit()
+        invalidate_user_cache(user.id)
+        await db.refresh(user)
         return user
     
     @staticmethod
-    def deactivate_user(db: Session, user: User) -> User:
+    async def deactivate_user(db: AsyncSession, user: User) -> User:
         """Deactivate a user"""
         user.is_active = False
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        invalidate_user_cache(user.id)
+        await db.refresh(user)
         return user
     
     @staticmethod
-    def activate_user(db: Session, user: User) -> User:
+    async def activate_user(db: AsyncSession, user: User) -> User:
         """Activate a user"""
         user.is_active = True
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        invalidate_user_cache(user.id)
+        await db.refresh(user)
         return user
@@ -0,0 +1,79 @@
+"""
+bcrypt cost benchmark
+
+Measures login latency (password verification) at each bcrypt cost on the
+current host, with logins verified concurrently in a process pool like the
+service's PASSWORD_HASH_WORKERS pool. Use it to choose BCRYPT_ROUNDS.
+
+Usage (from services/user-service):
+    python -m benchmarks.bench_bcrypt [--rounds 10 11 12 13] [--logins 40]
+                                      [--concurrency 8] [--workers 2]
+"""
+
+import argparse
+import asyncio
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from passlib.hash import bcrypt
+
+PASSWORD = "correct horse battery staple"
+
+
+def verify(password: str, hashed_password: str) -> bool:
+    """Verify in a worker process"""
+    return bcrypt.verify(password, hashed_password)
+
+
+def percentile(samples: list, q: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+async def run_logins(executor, hashed_password: str, logins: int, concurrency: int) -> list:
+    """Return per-login latencies with `concurrency` logins in flight"""
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def login() -> float:
+        async with semaphore:
+            start = time.perf_counter()
+            assert await loop.run_in_executor(executor, verify, PASSWORD, hashed_password)
+            return time.perf_counter() - start
+    
+    return await asyncio.gather(*(login() for _ in range(logins)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12, 13], help="bcrypt costs to compare")
+    parser.add_argument("--logins", type=int, default=40, help="logins per cost")
+    parser.add_argument("--concurrency", type=int, default=8, help="logins in flight")
+    parser.add_argument("--workers", type=int, default=2, help="hashing worker processes")
+    args = parser.parse_args()
+    
+    executor = ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"))
+    print(f"{args.workers} workers, {args.concurrency} concurrent logins, {args.logins} logins per cost")
+    print(f"{'rounds':<8}{'single ms':>12}{'p50 ms':>10}{'p99 ms':>10}{'logins/s':>10}")
+    try:
+        for rounds in args.rounds:
+            hashed_password = bcrypt.using(rounds=rounds).hash(PASSWORD)
+            start = time.perf_counter()
+            verify(PASSWORD, hashed_password)
+            single = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            latencies = asyncio.run(run_logins(executor, hashed_password, args.logins, args.concurrency))
+            throughput = args.logins / (time.perf_counter() - start)
+            print(
+                f"{rounds:<8}{single * 1000:>12.1f}{percentile(latencies, 0.5) * 1000:>10.1f}"
+                f"{percentile(latencies, 0.99) * 1000:>10.1f}{throughput:>10.1f}"
+            )
+    finally:
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
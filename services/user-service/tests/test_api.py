@@ -17,11 +17,14 @@ class TestHealthEndpoints:
         assert data["service"] == "user-service"
     
     def test_readiness_check(self):
-        """Test readiness endpoint returns ready status"""
+        """Test readiness endpoint returns ready status with the details behind it"""
         response = client.get("/ready")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "ready"
+        assert data["reasons"] == []
+        assert "event_loop_lag_seconds" in data
+        assert "requests_in_flight" in data
     
     def test_root_endpoint(self):
         """Test root endpoint returns service info"""
@@ -61,3 +64,133 @@ class TestUserEndpoints:
         """Test getting all users without admin token"""
         response = client.get("/api/v1/users")
         assert response.status_code == 403
+
+
+class TestAuthCache:
+    """Test token verification and user snapshot caching"""
+    
+    def test_cached_user_served_without_database(self):
+        """Test /users/me is answered from the user cache"""
+        from datetime import datetime
+        from app.auth import create_access_token, user_cache, UserSnapshot
+        user_cache.set(4242, UserSnapshot(
+            id=4242, email="cached@example.com", username="cached", full_name=None,
+            role="student", is_active=True, created_at=datetime(2024, 1, 1)
+        ))
+        token = create_access_token({"sub": "4242", "username": "cached", "role": "student"})
+        response = client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        assert response.json()["username"] == "cached"
+    
+    def test_invalidate_user_cache(self):
+        """Test invalidation drops the user snapshot"""
+        from datetime import datetime
+        from app.auth import invalidate_user_cache, user_cache, UserSnapshot
+        user_cache.set(4343, UserSnapshot(
+            id=4343, email="gone@example.com", username="gone", full_name=None,
+            role="student", is_active=False, created_at=datetime(2024, 1, 1)
+        ))
+        invalidate_user_cache(4343)
+        assert user_cache.get(4343) is None
+    
+    def test_deleted_cached_user_rejected(self):
+        """Test a cached user removed from the database gets 401 on writes"""
+        from datetime import datetime
+        from app.auth import create_access_token, user_cache, UserSnapshot
+        from app.database import get_db
+        from app.services import UserService
+        user_cache.set(4444, UserSnapshot(
+            id=4444, email="deleted@example.com", username="deleted", full_name=None,
+            role="student", is_active=True, created_at=datetime(2024, 1, 1)
+        ))
+        token = create_access_token({"sub": "4444", "username": "deleted", "role": "student"})
+        headers = {"Authorization": f"Bearer {token}"}
+        
+        async def no_db():
+            yield None
+        
+        async def missing_user(db, user_id):
+            return None
+        
+        original = UserService.get_user_by_id
+        app.dependency_overrides[get_db] = no_db
+        UserService.get_user_by_id = staticmethod(missing_user)
+        try:
+            response = client.post("/api/v1/users/me/change-password", headers=headers, json={
+                "current_password": "oldpassword", "new_password": "newpassword123"
+            })
+            assert response.status_code == 401
+            response = client.put("/api/v1/users/me", headers=headers, json={"full_name": "Gone"})
+            assert response.status_code == 401
+        finally:
+            UserService.get_user_by_id = original
+            app.dependency_overrides.pop(get_db, None)
+    
+    def test_invalid_token_not_cached(self):
+        """Test an invalid token is rejected and never cached"""
+        from app.auth import token_cache
+        response = client.get("/api/v1/users/me", headers={"Authorization": "Bearer not-a-jwt"})
+        assert response.status_code == 401
+        assert token_cache.get("not-a-jwt") is None
+
+
+class TestPasswordPool:
+    """Test the password hashing process pool"""
+    
+    def test_hash_and_verify(self):
+        """Test hashing and verification round trip through worker processes"""
+        import asyncio
+        from app.passwords import PasswordHasherPool
+        
+        async def round_trip():
+            pool = PasswordHasherPool(workers=1, max_pending=4)
+            try:
+                hashed = await pool.hash("secret1")
+                return await pool.verify("secret1", hashed), await pool.verify("wrong", hashed)
+            finally:
+                pool.shutdown()
+        
+        assert asyncio.run(round_trip()) == (True, False)
+    
+    def test_broken_pool_is_replaced(self):
+        """Test a crashed worker pool is shut down and replaced on the next call"""
+        import asyncio
+        import os
+        from concurrent.futures.process import BrokenProcessPool
+        from app.passwords import PasswordHasherPool
+        
+        async def crash_then_hash():
+            pool = PasswordHasherPool(workers=1, max_pending=4)
+            try:
+                with pytest.raises(BrokenProcessPool):
+                    await pool._run("hash", os._exit, 1)
+                assert pool._executor is None
+                return await pool.verify("secret1", await pool.hash("secret1"))
+            finally:
+                pool.shutdown()
+        
+        assert asyncio.run(crash_then_hash())
+    
+    def test_saturated_pool_returns_429(self):
+        """Test password operations are rejected with 429 when the queue is full"""
+        import asyncio
+        from fastapi import HTTPException
+        from app.auth import get_password_hash_async
+        from app.passwords import password_pool
+        
+        max_pending = password_pool.max_pending
+        password_pool.max_pending = 0
+        try:
+            with pytest.raises(HTTPException) as exc_info:
+                asyncio.run(get_password_hash_async("secret1"))
+        finally:
+            password_pool.max_pending = max_pending
+        assert exc_info.value.status_code == 429
+        assert "Retry-After" in exc_info.value.headers
+    
+    def test_outdated_cost_needs_rehash(self):
+        """Test hashes with a different bcrypt cost are flagged for upgrade"""
+        from passlib.hash import bcrypt
+        from app.passwords import password_needs_rehash, get_password_hash
+        assert password_needs_rehash(bcrypt.using(rounds=4).hash("secret1"))
+        assert not password_needs_rehash(get_password_hash("secret1"))